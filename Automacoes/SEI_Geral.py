@@ -10,6 +10,7 @@ import locale
 import logging
 import pandas as pd
 from enum import Enum
+from contextlib import contextmanager
 from tenacity import retry, stop_after_attempt, wait_fixed, wait_exponential, retry_if_exception_type, retry_if_result
 
 from datetime import datetime
@@ -22,13 +23,16 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 from selenium.common.exceptions import NoAlertPresentException
 from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchFrameException, NoSuchWindowException
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.select import Select
+from .comandos_driver import ORDEM_FRAMES, interceptar_comandos
 from .classesApoio import (MesIniMesFin, PrimeiroPlanoNavegador,
                           ExtraiNumerais, ProcessaValores, NormalizaValoresMonetarios,
-                          DivideValorParaSIAPE, VerificaSequenciaMesAno, TempoAleatorio,
+                          DivideValorParaSIAPE, VerificaSequenciaMesAno,
                           GerenciadorArquivos)
+from .ritmo import governador
 
 class TotalNotFoundException(Exception):
     pass
@@ -229,13 +233,13 @@ class SelecaoUnidade:
                     WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(
                         (By.CSS_SELECTOR, 'div.nav-item:nth-child(3) > div:nth-child(1) > a:nth-child(1)'))).click()
                     logging.info('Campo de seleção de unidade clicado.')
-                    time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+                    governador().aguardar()
                     # Escolhe o MGI como órgão
                     WebDriverWait(self.driver, 10).until(
                         EC.element_to_be_clickable((By.XPATH, '//*[@id="selInfraOrgaoUnidade"]'))).send_keys(
                         'MGI')  # Escolhe Unidade
                     logging.info('Órgão MGI selecionado.')
-                    time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+                    governador().aguardar()
                 except TimeoutException:
                     logging.warning('Timeout ao tentar clicar no campo de seleção de unidade.')
                     pass
@@ -274,7 +278,7 @@ class SelecaoUnidade:
                     self.janela.message_handler.add_message("Unidade não encontrada, verifique sua habilitação",
                                                             "error")
 
-                time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+                governador().aguardar()
         except TimeoutException:
             logging.error('Timeout ao tentar localizar o elemento de seleção de unidade.')
             return
@@ -285,13 +289,13 @@ class VisualizacaoDetalhada:
 
     def visualizar_detalhado(self):
         logging.info('Iniciando o processo de visualização detalhada.')
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
 
         try:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//a[contains(text(), "Visualização detalhada")]'))).click()
             logging.info('Botão de visualização detalhada clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error("Elemento de visualização detalhada não encontrado ou não clicável dentro do tempo limite.")
 
@@ -307,7 +311,7 @@ class PaginaControleProcessos:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//*[@id="lnkControleProcessos"]/img'))).click()
             logging.info('Link de controle de processos clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error("Elemento de controle de processos não foi encontrado ou não era clicável dentro do tempo limite.")
 
@@ -331,7 +335,7 @@ class IconesBarraProcessoSei:
                 EC.presence_of_element_located((By.CLASS_NAME, 'infraArvoreNoSelecionado')))
             process.click()
             logging.info('Elemento de processo na árvore selecionado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error("Um dos elementos não foi encontrado dentro do tempo limite ao tentar clicar no processo na árvore.")
             return
@@ -348,7 +352,7 @@ class IconesBarraProcessoSei:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, f'//img[@title="{self.cod_icone}"]'))).click()
             logging.info(f'Ícone com título "{self.cod_icone}" clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error("Elemento do ícone não foi encontrado ou não era clicável dentro do tempo limite.")
 
@@ -386,14 +390,14 @@ class ControlePrazosSei:
 
         logging.info('Iniciando o clique no ícone de controle de prazo.')
         IconesBarraProcessoSei(self.driver, "Controle de Prazo").clicar_icone_barra()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
 
         if self.prazo == "0":
             try:
                 WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, '//*[@id="btnExcluir"]'))).click()
                 logging.info('Botão excluir clicado com sucesso.')
-                time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+                governador().aguardar()
                 alert = wait.until(EC.alert_is_present())
                 alert.accept()
                 logging.info('Alerta de exclusão aceito.')
@@ -406,7 +410,7 @@ class ControlePrazosSei:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//*[@id="divOptDias"]/div/label'))).click()
             logging.info('Opção de definir prazo em dias clicada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error('Elemento para definir prazo em dias não foi encontrado ou não era clicável dentro do tempo limite.')
             return
@@ -415,7 +419,7 @@ class ControlePrazosSei:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//*[@id="txtDias"]'))).click()
             logging.info('Campo de dias do prazo clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error('Campo de dias do prazo não foi encontrado ou não era clicável dentro do tempo limite.')
             return
@@ -433,7 +437,7 @@ class ControlePrazosSei:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//*[@id="sbmDefinirControlePrazo"]'))).click()
             logging.info('Botão para definir o controle de prazo clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error('Botão para definir o controle de prazo não foi encontrado ou não era clicável dentro do tempo limite.')
 
@@ -451,13 +455,13 @@ class MarcadorSei:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.LINK_TEXT, "Ver por marcadores"))).click()
             logging.info('Link "Ver por marcadores" clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, f'//*[@onclick="filtrarMarcador({self.marcador})"]'))).click()
             logging.info(f'Marcador "{self.marcador}" selecionado com sucesso.')
             self.integrador.log(f'Marcador "{self.marcador}" selecionado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except TimeoutException:
             logging.error(f'Não foi possível encontrar ou clicar no marcador "{self.marcador}" dentro do tempo limite.')
             self.integrador.log("Não há processos para o marcador")
@@ -476,11 +480,11 @@ class ProcessoSei:
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//*[@id="txtPesquisaRapida"]'))).click()
             logging.info('Campo de pesquisa rápida clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
             busca_proc = self.driver.find_element(By.XPATH, '//*[@id="txtPesquisaRapida"]')
             busca_proc.send_keys(self.processo)
             logging.info(f'Número do processo "{self.processo}" inserido com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
             busca_proc.send_keys(Keys.ENTER)
             logging.info('Comando ENTER enviado para iniciar a busca pelo processo.')
             # Confirmação se está na pagina do processo
@@ -621,7 +625,7 @@ class NumeroProcesso:
             WebDriverWait(self.driver, 5).until(EC.frame_to_be_available_and_switch_to_it((By.NAME, 'ifrArvore')))
             process = WebDriverWait(self.driver, 5).until(
                 EC.presence_of_element_located((By.CLASS_NAME, 'infraArvoreNoSelecionado'))).text.strip()
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
             return process
         except TimeoutException:
             print("Um dos elementos não foi encontrado dentro do tempo limite.")
@@ -638,7 +642,7 @@ class NumeroProcesso:
             process.click()
 
             # Simula comportamento humano
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             # Navega para o frame de documentos
             IframesSei(self.driver, 'Exibe frame documentos').navegar_iframes_sei()
@@ -678,10 +682,10 @@ class TodasPastasArvoreDocumentos:
         logging.info('Iniciando a expansão de todas as pastas na árvore de documentos.')
         try:
             self.driver.switch_to.default_content()
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
             IframesSei(self.driver, 'Arvore documentos').navegar_iframes_sei()
             logging.info('Navegação para o iframe "Arvore documentos" realizada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             # Espera até que o elemento com o XPath especificado esteja presente. O tempo máximo de espera é 10 segundos.
             elemento = WebDriverWait(self.driver, 3).until(
@@ -719,7 +723,7 @@ class PlanilhaCalculoExante:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divArvoreAcoes"]/a[1]/img').click()
             logging.info('Botão para iniciar a criação da planilha de cálculo clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except Exception as e:
             logging.error(f'Erro ao clicar no botão de criação da planilha de cálculo: {str(e)}')
             return
@@ -727,12 +731,12 @@ class PlanilhaCalculoExante:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="txtFiltro"]').send_keys('Planilha de Cálculo (Exercícios Anteriores)', Keys.TAB)
             logging.info('Filtro "Planilha de Cálculo (Exercícios Anteriores)" inserido com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             elemento = self.driver.find_element(By.XPATH, "//span[contains(text(), 'Planilha de Cálculo (Exercícios Anteriores)')]")
             elemento.click()
             logging.info('Elemento "Planilha de Cálculo (Exercícios Anteriores)" clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except Exception as e:
             logging.error(f'Erro ao selecionar a planilha de cálculo: {str(e)}')
             return
@@ -740,15 +744,15 @@ class PlanilhaCalculoExante:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptProtocoloDocumentoTextoBase"]/div/label').click()
             logging.info('Opção de protocolo de documento base selecionada.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             self.driver.find_element(By.XPATH, '//*[@id="txtProtocoloDocumentoTextoBase"]').send_keys("35549491")
             logging.info('Número do protocolo de documento base inserido com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             self.driver.find_element(By.XPATH, '//*[@id="divOptRestrito"]/div/label').click()
             logging.info('Opção de restrição selecionada.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             drop = Select(self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]'))
             drop.select_by_visible_text("Informação Pessoal (Art. 31 da Lei nº 12.527/2011)")
@@ -763,7 +767,7 @@ class PlanilhaCalculoExante:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="btnSalvar"]').click()
             logging.info('Botão "Salvar" clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
         except Exception as e:
             logging.error(f'Erro ao clicar no botão "Salvar": {str(e)}')
             return
@@ -787,7 +791,7 @@ class PlanilhaCalculoExante:
             frame = self.driver.find_elements(By.CLASS_NAME, 'cke_wysiwyg_frame')
             self.driver.switch_to.frame(frame[2])
             logging.info('Switch para o frame de edição da planilha realizado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             # Preenchendo os campos na planilha
             self.driver.find_element(By.XPATH, '/html/body/table[1]/tbody/tr[3]/td[2]').send_keys(self.processo)
@@ -872,6 +876,131 @@ def _before_retry(retry_state, method_name):
     logging.info(f"Tentativa {attempt} falhou para o método '{method_name}'. "
                  f"Próxima tentativa em {retry_state.next_action.sleep} segundos.")
 
+class GerenciadorFrames:
+    """
+    Acompanha o frame em que o driver está para evitar trocas redundantes.
+
+    O caminho atual é uma tupla de localizadores a partir do conteúdo
+    principal (() = fora de qualquer iframe; None = desconhecido). Todos os
+    comandos do driver passam por aqui (interceptador em comandos_driver), de
+    forma que também as chamadas diretas a switch_to.default_content() são
+    puladas quando o driver já está no conteúdo principal.
+
+    O caminho só deixa de ser conhecido com os comandos que trocam o contexto
+    de navegação: navegação da janela (get, refresh, voltar/avançar), troca
+    ou fechamento de janela e troca de frame feita por fora. Cliques,
+    digitação e scripts o preservam: no SEI eles recarregam o conteúdo dos
+    iframes, não os próprios iframes, e é depois de um clique que quase
+    sempre vem a próxima troca de frame. Se um clique ainda assim levar a
+    janela para outra página, o comando seguinte falha com NoSuchFrame ou
+    NoSuchWindow (o que também invalida o caminho) ou a espera do page
+    object esgota e ele recarrega a página, o que o invalida.
+
+    Uso:
+        frames = gerenciador_frames(driver)
+        frames.ir_para('Arvore documentos')
+        with frames.em('Exibe documentos'):
+            ...
+    """
+    FRAMES = {
+        "Arvore documentos": ((By.NAME, 'ifrArvore'),),
+        "Exibe frame documentos": ((By.NAME, 'ifrVisualizacao'),),
+        "Exibe documentos": ((By.NAME, 'ifrVisualizacao'), (By.ID, 'ifrArvoreHtml')),
+    }
+    TIMEOUT = 10
+
+    # Comandos que trocam o contexto de navegação (a troca de frame para um
+    # elemento, switchToFrame com id, também; as feitas por ir_para são
+    # registradas ao final dela)
+    COMANDOS_TROCAM_CONTEXTO = frozenset({
+        'get', 'refresh', 'goBack', 'goForward',
+        'switchToWindow', 'closeWindow', 'newWindow', 'quit',
+    })
+
+    def __init__(self, navegador):
+        self.driver = navegador
+        self.caminho = None
+        self.trocas_evitadas = 0
+        interceptar_comandos(navegador, 'frames', self._executar, ORDEM_FRAMES)
+
+    def _executar(self, comando, params, prosseguir):
+        if comando == 'switchToFrame' and (params or {}).get('id') is None:
+            if self.caminho == ():
+                self.trocas_evitadas += 1
+                return {'value': None}
+            resposta = prosseguir(comando, params)
+            self.caminho = ()
+            return resposta
+
+        if comando == 'switchToParentFrame':
+            if self.caminho == ():
+                self.trocas_evitadas += 1
+                return {'value': None}
+            resposta = prosseguir(comando, params)
+            self.caminho = self.caminho[:-1] if self.caminho else None
+            return resposta
+
+        if comando in self.COMANDOS_TROCAM_CONTEXTO or comando == 'switchToFrame':
+            self.caminho = None
+        try:
+            return prosseguir(comando, params)
+        except (NoSuchFrameException, NoSuchWindowException):
+            self.caminho = None
+            raise
+
+    def invalidar(self):
+        self.caminho = None
+
+    def ir_para(self, iframe):
+        """Entra no iframe do SEI pelo nome (ver FRAMES) ou volta ao conteúdo principal com None."""
+        destino = () if iframe is None else self.FRAMES[iframe]
+        self._ir_para_caminho(destino)
+
+    def _ir_para_caminho(self, destino):
+        atual = self.caminho
+        if atual == destino:
+            self.trocas_evitadas += 1
+            return
+
+        if atual is not None and atual[:len(destino)] == destino:
+            # Destino é um frame acima do atual: sobe sem procurar os frames de novo
+            for _ in range(len(atual) - len(destino)):
+                self.driver.switch_to.parent_frame()
+            restantes = ()
+        elif atual is not None and destino[:len(atual)] == atual:
+            restantes = destino[len(atual):]
+        else:
+            self.driver.switch_to.default_content()
+            restantes = destino
+
+        for localizador in restantes:
+            WebDriverWait(self.driver, self.TIMEOUT).until(EC.frame_to_be_available_and_switch_to_it(localizador))
+        self.caminho = destino
+
+    @contextmanager
+    def em(self, iframe):
+        """Executa o bloco dentro do iframe e volta ao frame anterior, se ele era conhecido."""
+        anterior = self.caminho
+        self.ir_para(iframe)
+        try:
+            yield self
+        finally:
+            if anterior is not None:
+                self._ir_para_caminho(anterior)
+
+
+def gerenciador_frames(navegador):
+    """
+    GerenciadorFrames do driver, criado no primeiro uso e guardado no próprio
+    driver: os dois se referenciam e são coletados juntos quando o driver sai
+    de uso.
+    """
+    gerenciador = getattr(navegador, '_gerenciador_frames', None)
+    if gerenciador is None:
+        gerenciador = navegador._gerenciador_frames = GerenciadorFrames(navegador)
+    return gerenciador
+
+
 class IframesSei:
     def __init__(self, navegador, iframe):
         self.driver = navegador
@@ -881,21 +1010,14 @@ class IframesSei:
     def navegar_iframes_sei(self):
         logging.info(f'Iniciando a navegação para o iframe: {self.iframe}')
 
-        if self.iframe == "Arvore documentos":
-            self.driver.switch_to.default_content()
-            WebDriverWait(self.driver, 10).until(EC.frame_to_be_available_and_switch_to_it((By.NAME, 'ifrArvore')))
-            logging.info('Switch para o iframe "Arvore documentos" realizado com sucesso.')
-            return True
-
-        elif self.iframe == "Exibe frame documentos":
-            self.driver.switch_to.default_content()
-            WebDriverWait(self.driver, 10).until(
-                EC.frame_to_be_available_and_switch_to_it((By.NAME, 'ifrVisualizacao')))
-            logging.info('Switch para o iframe "Exibe frame documentos" realizado com sucesso.')
+        if self.iframe not in GerenciadorFrames.FRAMES:
+            logging.warning(f'Iframe desconhecido: {self.iframe}')
+            return False
 
-        elif self.iframe == "Exibe documentos":
-            WebDriverWait(self.driver, 10).until(EC.frame_to_be_available_and_switch_to_it((By.ID, 'ifrArvoreHtml')))
-            logging.info('Switch para o iframe "Exibe documentos" realizado com sucesso.')
+        # Se o driver já está no iframe a troca (e a espera) é pulada
+        gerenciador_frames(self.driver).ir_para(self.iframe)
+        logging.info(f'Switch para o iframe "{self.iframe}" realizado com sucesso.')
+        return True
 
 class PaginaMovimentacoes:
     def __init__(self, navegador, processo):
@@ -904,7 +1026,7 @@ class PaginaMovimentacoes:
 
     def acessar_movimentacoes(self):
         ProcessoSei(self.driver, self.processo).acessa_processo_sei_especifico()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         IframesSei(self.driver, "Arvore documentos").navegar_iframes_sei()
         try:
             WebDriverWait(self.driver, 10).until(
@@ -971,7 +1093,7 @@ class DocumentoExternoSei:
             logging.error(f'Erro ao clicar no ícone "Incluir Documento": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
 
         try:
             # Clica no elemento para selecionar a série do documento
@@ -1023,7 +1145,7 @@ class DocumentoExternoSei:
             )
             element.click()
             logging.info('Opção de restrição selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             # Seleciona a hipótese legal
             element = WebDriverWait(self.driver, 30).until(
@@ -1041,17 +1163,17 @@ class DocumentoExternoSei:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="lblArquivo"]').click()
             logging.info('Botão para incluir arquivo clicado com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             inclui_arquivo = AnexoSei(self.arquivo)
             inclui_arquivo.inserir_anexo()
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
             logging.info(f'Arquivo "{self.arquivo}" anexado com sucesso.')
         except Exception as e:
             logging.error(f'Erro ao anexar o arquivo "{self.arquivo}": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
 
         try:
             # Aguardar até que o elemento com a classe 'infraTd' esteja presente (até 30 segundos)
@@ -1060,7 +1182,7 @@ class DocumentoExternoSei:
             # Clicar no botão "Salvar"
             self.driver.find_element(By.XPATH, '//*[@id="btnSalvar"]').click()
             logging.info('Botão "Salvar" clicado com sucesso para incluir o documento externo.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
             # Aguardar até que o elemento com o ID 'divArvoreInformacao' esteja presente (até 30 segundos)
             element = WebDriverWait(self.driver, 30).until(
                 EC.presence_of_element_located((By.ID, 'divArvoreInformacao'))
@@ -1138,7 +1260,7 @@ class DocumentosArvoreSei:
                 # Clica no último elemento encontrado
                 elementos_filtrados[-1].click()
                 logging.info(f'Documento com texto parcial "{self.texto_parcial}" clicado com sucesso.')
-                time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+                governador().aguardar()
                 return True
             except Exception as e:
                 logging.error(f'Erro ao clicar no documento com texto parcial "{self.texto_parcial}": {str(e)}')
@@ -1286,7 +1408,7 @@ class TrocaMarcadorSEi:
             logging.error(f'Erro ao clicar no ícone "Gerenciar Marcador": {str(e)}')
             return False
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         # Remover marcador existente se especificado
         if self.remover != "":
@@ -1308,7 +1430,7 @@ class TrocaMarcadorSEi:
                             if self.inserir == "":
                                 return True
 
-                            time.sleep(TempoAleatorio().tempo_aleatorio())
+                            governador().aguardar()
                             break
                     except Exception as e:
                         logging.debug(f'Erro ao processar linha da tabela: {str(e)}')
@@ -1328,7 +1450,7 @@ class TrocaMarcadorSEi:
                 except:
                     logging.warning('Botão "Adicionar" não encontrado, tentando continuar...')
 
-                time.sleep(TempoAleatorio().tempo_aleatorio())
+                governador().aguardar()
 
                 # Selecionar marcador no dropdown
                 dropdown = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".dd-select")))
@@ -1357,7 +1479,7 @@ class TrocaMarcadorSEi:
 
             # Inserir mensagem e salvar
             try:
-                time.sleep(TempoAleatorio().tempo_aleatorio())
+                governador().aguardar()
                 wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="txaTexto"]'))).send_keys(self.mensagem)
                 logging.info(f'Mensagem "{self.mensagem}" inserida com sucesso.')
 
@@ -1407,7 +1529,7 @@ class IncluiNotaTecnicaExante:
         self.driver.switch_to.default_content()
         self.driver.switch_to.frame('ifrArvore')
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             # Espera até que o elemento com o XPath especificado esteja presente. O tempo máximo de espera é 10 segundos.
             elemento = WebDriverWait(self.driver, 3).until(
@@ -1432,7 +1554,7 @@ class IncluiNotaTecnicaExante:
             logging.error('Erro ao buscar os últimos comprovantes ou planilhas disponíveis. Verifique se eles estão presentes.')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             protocol = ExtraiNumerais(protocol_txt).extrair_numerais()
@@ -1442,7 +1564,7 @@ class IncluiNotaTecnicaExante:
             logging.error(f'Erro ao extrair numerais dos textos obtidos: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         self.driver.switch_to.default_content()
         self.driver.switch_to.frame('ifrVisualizacao')
         try:
@@ -1452,7 +1574,7 @@ class IncluiNotaTecnicaExante:
             logging.error(f'Erro ao clicar no ícone para incluir Nota Técnica: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="txtFiltro"]').send_keys('Nota Técnica', Keys.TAB, Keys.ENTER)
             logging.info('Filtro "Nota Técnica" aplicado com sucesso.')
@@ -1466,7 +1588,7 @@ class IncluiNotaTecnicaExante:
 
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptProtocoloDocumentoTextoBase"]/div/label').click()
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             if soma_total < 30000:
                 self.driver.find_element(By.XPATH, '//*[@id="txtProtocoloDocumentoTextoBase"]').send_keys("35550049")
             elif soma_total >= 30000:
@@ -1479,7 +1601,7 @@ class IncluiNotaTecnicaExante:
         try:
             self.driver.find_element(By.ID, 'txtNomeArvore').send_keys(' de Exercícios Anteriores')
             self.driver.find_element(By.XPATH, '//*[@id="divOptRestrito"]/div/label').click()
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             drop = Select(self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]'))
             drop.select_by_visible_text("Informação Pessoal (Art. 31 da Lei nº 12.527/2011)")
             logging.info('Campos da Nota Técnica preenchidos com sucesso.')
@@ -1666,7 +1788,7 @@ class IncluiDocumentoInternoSei:
         self.driver.implicitly_wait(5)
         self.driver.switch_to.default_content()
         self.driver.switch_to.frame('ifrArvore')
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             IconesBarraProcessoSei(self.driver, "Incluir Documento").clicar_icone_barra()
@@ -1675,7 +1797,7 @@ class IncluiDocumentoInternoSei:
             logging.error(f'Erro ao clicar no ícone "Incluir Documento": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="txtFiltro"]').send_keys(self.tipo_doc, Keys.TAB, Keys.ENTER)
             logging.info(f'Documento do tipo "{self.tipo_doc}" filtrado com sucesso.')
@@ -1683,18 +1805,18 @@ class IncluiDocumentoInternoSei:
             logging.error(f'Erro ao filtrar documento do tipo "{self.tipo_doc}": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptProtocoloDocumentoTextoBase"]/div/label').click()
             logging.info('Opção de protocolo de documento base selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.driver.find_element(By.XPATH, '//*[@id="txtProtocoloDocumentoTextoBase"]').send_keys(self.protocolo)
             logging.info(f'Protocolo "{self.protocolo}" inserido com sucesso.')
         except Exception as e:
             logging.error(f'Erro ao inserir protocolo do documento base: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.ID, 'txtNomeArvore').send_keys(self.nome_arvore)
             logging.info(f'Nome da árvore "{self.nome_arvore}" inserido com sucesso.')
@@ -1705,14 +1827,14 @@ class IncluiDocumentoInternoSei:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptRestrito"]/div/label').click()
             logging.info('Opção de restrição selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             drop = Select(self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]'))
             drop.select_by_visible_text("Informação Pessoal (Art. 31 da Lei nº 12.527/2011)")
             logging.info('Hipótese legal "Informação Pessoal" selecionada com sucesso.')
         except Exception as e:
             logging.error(f'Erro ao selecionar a hipótese legal: {str(e)}')
             return
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Armazena as janelas abertas antes de clicar no botão "Salvar"
         janelas_antes = set(self.driver.window_handles)
 
@@ -1739,9 +1861,9 @@ class IncluiDocumentoInternoSei:
         # Muda para a nova janela
         self.driver.switch_to.window(nova_janela)
         self.driver.maximize_window()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         self.driver.refresh()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
 
 
@@ -1767,7 +1889,7 @@ class IncluiEditalDou:
         janela_original = IncluiDocumentoInternoSei(self.driver, self.tipo, self.protocolo,
                                                     self.nome_arvore).incluir_documento_interno_sei()
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         wait = WebDriverWait(self.driver, 10)
         try:
@@ -1852,7 +1974,7 @@ class IncluiEditalDou:
             return
 
         self.driver.switch_to.default_content()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             salvar_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, '#cke_149_label')))
             salvar_button.click()
@@ -1861,7 +1983,7 @@ class IncluiEditalDou:
             logging.error('Botão "Salvar" não encontrado ou não era clicável dentro do tempo limite.')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Fechar a janela atual
         self.driver.close()
         logging.info('Janela do Edital DOU fechada com sucesso.')
@@ -1904,7 +2026,7 @@ class IncluiNotaTecnicaEspecifica:
         total_mens = 115
         total_edit = 33
         diferenca = total_mens - total_edit
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             # Atualizando o texto do primeiro parágrafo
@@ -1920,7 +2042,7 @@ class IncluiNotaTecnicaEspecifica:
             logging.error(f'Erro ao atualizar o texto do primeiro parágrafo: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             # Atualizando o texto do segundo parágrafo
@@ -1935,7 +2057,7 @@ class IncluiNotaTecnicaEspecifica:
             logging.error(f'Erro ao atualizar o texto do segundo parágrafo: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             # Atualizando o texto do terceiro parágrafo
@@ -1951,7 +2073,7 @@ class IncluiNotaTecnicaEspecifica:
             return
 
         self.driver.switch_to.default_content()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             salvar_button = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, 'cke_button__save_label')))
             salvar_button.click()
@@ -1960,7 +2082,7 @@ class IncluiNotaTecnicaEspecifica:
             logging.error('Botão "Salvar" não encontrado ou não era clicável dentro do tempo limite.')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Fechar a janela atual
         self.driver.close()
         logging.info('Janela da Nota Técnica Específica fechada com sucesso.')
@@ -1974,10 +2096,6 @@ class UnidadasCaixaSei:
     def __init__(self, navegador):
         self.driver = navegador
 
-    def tempo_aleatorio(self):
-        # Função temporária para simular comportamento humano
-        return time.uniform(1, 3)
-
     def get_unidades(self):
         unidades = []
         logging.info('Iniciando a obtenção das unidades da caixa.')
@@ -1986,12 +2104,12 @@ class UnidadasCaixaSei:
             WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable(
                 (By.CSS_SELECTOR, 'div.nav-item:nth-child(3) > div:nth-child(1) > a:nth-child(1)'))).click()
             logging.info('Clicou no elemento de seleção de unidade com sucesso.')
-            time.sleep(self.tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
             WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.XPATH, '//*[@id="selInfraOrgaoUnidade"]'))).send_keys('MGI')
             logging.info('Unidade "MGI" selecionada com sucesso.')
-            time.sleep(self.tempo_aleatorio())  # Simula comportamento humano
+            governador().aguardar()
 
         except TimeoutException:
             logging.error("Elemento de seleção de unidade não encontrado ou não clicável dentro do tempo limite.")
@@ -2048,9 +2166,9 @@ class PlanilhaTecnico:
             logging.info(f"Assunto encontrado: {assunto}")
         except NoSuchElementException:
             logging.error("Assunto não encontrado na tabela.")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Assunto não encontrado na tabela", "error")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Assunto não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2065,9 +2183,9 @@ class PlanilhaTecnico:
             logging.info(f"Objeto encontrado: {objeto}")
         except NoSuchElementException:
             logging.error("Objeto não encontrado na tabela.")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Objeto não encontrado na tabela", "error")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Objeto não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2081,10 +2199,10 @@ class PlanilhaTecnico:
                                                  "td:nth-child(2)").get_attribute('textContent').strip()
             logging.info(f"Descrição encontrada: {descricao}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Objeto não encontrado na tabela", "error")
             logging.error("Objeto não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Descrição não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2098,10 +2216,10 @@ class PlanilhaTecnico:
                                                           "td:nth-child(2)").get_attribute('textContent').strip()
             logging.info(f"Situação Funcional encontrada: {situacao_funcional}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Situação Funcional não encontrado na tabela", "error")
             logging.error("Situação Funcional não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Situação Funcional não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2115,10 +2233,10 @@ class PlanilhaTecnico:
                                                  "td:nth-child(2)").get_attribute('textContent').strip()
             logging.info(f"Nome encontrado: {nome_serv}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Nome não encontrado na tabela", "error")
             logging.error("Nome não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Nome não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2132,10 +2250,10 @@ class PlanilhaTecnico:
                                              "td:nth-child(2)").get_attribute('textContent').strip()
             logging.info(f"Órgão encontrado: {orgao}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Órgão não encontrado na tabela", "error")
             logging.error("Órgão não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Órgão não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2151,10 +2269,10 @@ class PlanilhaTecnico:
             upag1 = '0' * 8 + ultim_carac
             logging.info(f"UPAG encontrado: {upag}, UPAG ajustado: {upag1}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"UPAG não encontrado na tabela", "error")
             logging.error("UPAG não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'UPAG não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2177,13 +2295,13 @@ class PlanilhaTecnico:
 
         else:
 
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             self.janela.message_handler.add_message(f"Matrícula não encontrado na tabela", "error")
 
             logging.error("Matrícula não encontrada na tabela")
 
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
 
@@ -2240,7 +2358,7 @@ class PlanilhaTecnico:
 
                         logging.error("Total dos valores não encontrado na tabela")
 
-                        time.sleep(TempoAleatorio().tempo_aleatorio())
+                        governador().aguardar()
 
                         PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
 
@@ -2346,13 +2464,13 @@ class PlanilhaTecnico:
         tot_tab1 = "{:.1f}".format(math.floor(float(tot_tab) * 100) / 100.0)
 
         if abs(float(valor4) - float(tot_tab1)) > 0.5:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             self.janela.message_handler.add_message(f"Diferença entre os valores somados e o Total na tabela", "error")
 
             logging.error("Diferença entre os valores somados e o Total na tabela")
 
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
 
@@ -2371,7 +2489,7 @@ class PlanilhaTecnico:
 
             logging.error("Sequência de meses ou ano incorreta na tabela")
 
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
 
@@ -2399,7 +2517,7 @@ class PlanilhaTecnico:
 
         self.janela.message_handler.add_message(f"Tabela lida com sucesso")
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         return info_exer_ant
 
@@ -2413,7 +2531,7 @@ class AcessoBlocoAssinatura:
         self.driver.switch_to.default_content()
         self.click_element('//*[@id="lnkControleProcessos"]/img')
         self.click_element_menu('//a[contains(@href, "bloco_assinatura_listar")]')
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         # Clicar bloco
         WebDriverWait(self.driver, 3).until(
@@ -2458,9 +2576,9 @@ class ExtraiDadosNotaTecnicaExante:
 
     def extracao_dados_nt_exante(self):
         IframesSei(self.driver, "Exibe frame documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
         IframesSei(self.driver, "Exibe documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
         # Extrai número do processo administrativo
         proc_siape = self.driver.find_element(By.CSS_SELECTOR, "body > table:nth-child(13) > tbody > tr:nth-child(2) > td:nth-child(2)")
         proc_siape_num = proc_siape.text
@@ -2485,9 +2603,9 @@ class ExtraiDadosPlanilha_Calculo:
 
     def extracao_dados_planilha(self):
         IframesSei(self.driver, "Exibe frame documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
         IframesSei(self.driver, "Exibe documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
 
         if self.driver.find_element(By.CSS_SELECTOR,
                                     "body > table:nth-child(8) > tbody > tr:nth-child(4) > td:nth-child(2)").get_attribute(
@@ -2497,10 +2615,10 @@ class ExtraiDadosPlanilha_Calculo:
                                              "td:nth-child(2)").get_attribute('textContent').strip()
             logging.info(f"Órgão encontrado: {orgao}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"Órgão não encontrado na tabela", "error")
             logging.error("Órgão não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'Órgão não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
@@ -2516,16 +2634,16 @@ class ExtraiDadosPlanilha_Calculo:
             upag1 = '0' * 8 + ultim_carac
             logging.info(f"UPAG encontrado: {upag}, UPAG ajustado: {upag1}")
         else:
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.janela.message_handler.add_message(f"UPAG não encontrado na tabela", "error")
             logging.error("UPAG não encontrado na tabela")
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             PrimeiroPlanoNavegador(self.driver, "SEI").enviar_primeiro_plano()
             TrocaMarcadorSEi(self.driver, 'UPAG não encontrado na tabela', "CGPAG INTEGRA",
                              "INTEGRA - RETORNO").trocar_marcador()
             return
         self.driver.switch_to.default_content()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         IframesSei(self.driver, "Arvore documentos").navegar_iframes_sei()
         return orgao, upag1
 
@@ -2540,7 +2658,7 @@ class TermoEncerramento:
         self.driver.implicitly_wait(5)
         self.driver.switch_to.default_content()
         self.driver.switch_to.frame('ifrArvore')
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             IconesBarraProcessoSei(self.driver, "Incluir Documento").clicar_icone_barra()
@@ -2549,7 +2667,7 @@ class TermoEncerramento:
             logging.error(f'Erro ao clicar no ícone "Incluir Documento": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="txtFiltro"]').send_keys(self.tipo_doc, Keys.TAB, Keys.ENTER)
             logging.info(f'Documento do tipo "{self.tipo_doc}" filtrado com sucesso.')
@@ -2557,7 +2675,7 @@ class TermoEncerramento:
             logging.error(f'Erro ao filtrar documento do tipo "{self.tipo_doc}": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.ID, 'txtNomeArvore').send_keys(self.nome_arvore)
             logging.info(f'Nome da árvore "{self.nome_arvore}" inserido com sucesso.')
@@ -2568,7 +2686,7 @@ class TermoEncerramento:
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptRestrito"]/div/label').click()
             logging.info('Opção de restrição selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             drop = Select(self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]'))
             drop.select_by_visible_text("Informação Pessoal (Art. 31 da Lei nº 12.527/2011)")
             logging.info('Hipótese legal "Informação Pessoal" selecionada com sucesso.')
@@ -2576,7 +2694,7 @@ class TermoEncerramento:
             logging.error(f'Erro ao selecionar a hipótese legal: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Armazena as janelas abertas antes de clicar no botão "Salvar"
         janelas_antes = set(self.driver.window_handles)
 
@@ -2589,7 +2707,7 @@ class TermoEncerramento:
             return
 
         # Aguarda um tempo aleatório para simular o comportamento humano
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         # Aguarda até que uma nova janela seja aberta (esperando que uma nova janela seja adicionada)
         WebDriverWait(self.driver, 10).until(lambda driver: len(set(driver.window_handles) - janelas_antes) == 1)
@@ -2614,7 +2732,7 @@ class TermoEncerramento:
             self.driver.find_element(By.XPATH, '/html/body/table[1]/tbody/tr[8]/td[2]').send_keys("Outros motivos. Especificar: Ausência de documentos exigidos pela Portaria Conjunta SEGEP/SOF nº 02, de 30/11/2012, que regulamenta os critérios para pagamento de despesas de exercícios anteriores de pessoal, no âmbito da Administração Pública Federal direta, autárquica e fundacional, conforme especificado no Art.4º, alínea g.")
 
             # Limpa e insere novo conteúdo no parágrafo especificado
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.driver.find_element(By.XPATH, '/html/body/p[7]').clear()
             self.driver.find_element(By.XPATH, '/html/body/p[8]').click()
             self.driver.find_element(By.XPATH, '/html/body/p[8]').send_keys(
@@ -2624,7 +2742,7 @@ class TermoEncerramento:
                 "Coordenadora Geral de Pagamentos")
 
             # Aguarda um tempo aleatório antes de sair do frame
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.driver.switch_to.default_content()
 
             # Clica em um elemento específico
@@ -2648,9 +2766,9 @@ class InclusaoDocumentoBloco:
         self.bloco = bloco
 
     def incluir_documento_bloco(self):
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         DocumentosArvoreSei(self.driver, self.documento).clicar_no_documento()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         IconesBarraProcessoSei(self.driver, "Incluir em Bloco de Assinatura").clicar_icone_barra()
         IframesSei(self.driver, "Exibe frame documentos").navegar_iframes_sei()
 
@@ -2665,7 +2783,7 @@ class InclusaoDocumentoBloco:
 
         # Selecionar a opção pelo valor (neste caso, o valor da variável 'valor')
         select.select_by_value(valor)
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         for protocolo in self.protocolos:
             # Espera pelo label associado ao checkbox com o title desejado
@@ -2703,7 +2821,7 @@ class NotificacaoNumerada():
         self.driver.implicitly_wait(5)
         self.driver.switch_to.default_content()
         self.driver.switch_to.frame('ifrArvore')
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             IconesBarraProcessoSei(self.driver, "Incluir Documento").clicar_icone_barra()
@@ -2712,7 +2830,7 @@ class NotificacaoNumerada():
             logging.error(f'Erro ao clicar no ícone "Incluir Documento": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="txtFiltro"]').send_keys(self.tipo_doc, Keys.TAB, Keys.ENTER)
             logging.info(f'Documento do tipo "{self.tipo_doc}" filtrado com sucesso.')
@@ -2720,18 +2838,18 @@ class NotificacaoNumerada():
             logging.error(f'Erro ao filtrar documento do tipo "{self.tipo_doc}": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptProtocoloDocumentoTextoBase"]/div/label').click()
             logging.info('Opção de protocolo de documento base selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.driver.find_element(By.XPATH, '//*[@id="txtProtocoloDocumentoTextoBase"]').send_keys(self.protocolo)
             logging.info(f'Protocolo "{self.protocolo}" inserido com sucesso.')
         except Exception as e:
             logging.error(f'Erro ao inserir protocolo do documento base: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.ID, 'txtNomeArvore').send_keys(self.nome_arvore)
             logging.info(f'Nome da árvore "{self.nome_arvore}" inserido com sucesso.')
@@ -2742,7 +2860,7 @@ class NotificacaoNumerada():
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptRestrito"]/div/label').click()
             logging.info('Opção de restrição selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             drop = Select(self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]'))
             drop.select_by_visible_text("Informação Pessoal (Art. 31 da Lei nº 12.527/2011)")
             logging.info('Hipótese legal "Informação Pessoal" selecionada com sucesso.')
@@ -2750,7 +2868,7 @@ class NotificacaoNumerada():
             logging.error(f'Erro ao selecionar a hipótese legal: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Armazena as janelas abertas antes de clicar no botão "Salvar"
         janelas_antes = set(self.driver.window_handles)
 
@@ -2763,7 +2881,7 @@ class NotificacaoNumerada():
             return
 
         # Aguarda um tempo aleatório para simular o comportamento humano
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         # Aguarda até que uma nova janela seja aberta (esperando que uma nova janela seja adicionada)
         WebDriverWait(self.driver, 10).until(lambda driver: len(set(driver.window_handles) - janelas_antes) == 1)
@@ -2774,9 +2892,9 @@ class NotificacaoNumerada():
         # Muda para a nova janela
         self.driver.switch_to.window(nova_janela)
         self.driver.maximize_window()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         self.driver.refresh()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             # Localiza o frame que deseja acessar
             frame = self.driver.find_elements(By.CLASS_NAME, 'cke_wysiwyg_frame')
@@ -2917,7 +3035,7 @@ class NotificacaoNumerada():
         self.driver.execute_script("arguments[0].insertAdjacentHTML('beforeend', arguments[1]);", parent_element,
                                    final_html)
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         self.driver.switch_to.default_content()
 
         # Clica em um elemento específico
@@ -2941,11 +3059,11 @@ class GeraPDFDocumentoSEI:
         botao = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@name="btnGerar"]')))
         botao.click()
         IframesSei(self.driver, "Arvore documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
         documentos = DocumentosArvoreSei(self.driver, "Notificação")
         numero = documentos.extrair_numeroSEI_do_ultimo_elemento()
         GerenciadorArquivos("downloads").renomear_arquivo_por_sequencia(numero)
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
 
         # Atualiza o texto parcial antes de clicar no documento
         documentos.texto_parcial = self.documento
@@ -2987,9 +3105,9 @@ class DownloadPDFSEI:
         documentos = DocumentosArvoreSei(self.driver, self.documento)
         documentos.clicar_no_documento()
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
         IframesSei(self.driver, "Exibe frame documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())  # Simula comportamento humano
+        governador().aguardar()
         # IframesSei(self.driver, "Exibe documentos").navegar_iframes_sei()
         iframe = self.driver.find_element(By.ID, "ifrArvoreHtml")
         pdf_url = iframe.get_attribute("src")
@@ -3057,7 +3175,7 @@ class IniciaProcessos:
 
     def iniciar_processo(self):
         wait = WebDriverWait(self.driver, 10)
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             # Localiza o elemento pelo texto do span
             elemento = self.driver.find_element(By.XPATH, '//span[text()="Iniciar Processo"]')
@@ -3068,7 +3186,7 @@ class IniciaProcessos:
             return
 
         # Aguarda um tempo aleatório e insere o valor no campo de texto
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             # Localiza o elemento pelo atributo title
             elemento_img = self.driver.find_element(By.XPATH, '//img[@title="Exibir todos os tipos"]')
@@ -3077,13 +3195,13 @@ class IniciaProcessos:
         except:
             pass
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             campo_filtro = self.driver.find_element(By.ID, "txtFiltro")  # Localiza o campo pelo ID
             campo_filtro.clear()  # Limpa o campo antes de inserir o valor
             campo_filtro.send_keys(self.tipo)  # Insere o valor de self.tipo no campo
             logging.info(f'Valor "{self.tipo}" inserido no campo de texto com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             # Envia TAB e ENTER após a inserção
             campo_filtro.send_keys(Keys.TAB)  # Envia TAB
             logging.info('TAB enviado com sucesso.')
@@ -3095,7 +3213,7 @@ class IniciaProcessos:
             logging.error(f'Erro ao inserir o valor no campo de texto: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             campo_especificacao = self.driver.find_element(By.ID, "txtDescricao")  # Localiza o campo pelo ID
             campo_especificacao.clear()  # Limpa o campo antes de inserir o valor
@@ -3106,7 +3224,7 @@ class IniciaProcessos:
             logging.error(f'Erro ao inserir o valor no campo de texto: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             # Localiza o elemento <option> pelo atributo value ou pelo texto
@@ -3129,14 +3247,14 @@ class IniciaProcessos:
             logging.error(f'Erro ao clicar na opção "ASSUNTO - CLASSIFICAÇÃO PENDENTE DE AVALIAÇÃO": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             campo_classificacao = self.driver.find_element(By.ID, "txtAssunto")  # Localiza o campo pelo ID
             campo_classificacao.clear()  # Limpa o campo antes de inserir o valor
             campo_classificacao.send_keys(self.classificacao)  # Insere o valor de self.tipo no campo
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             campo_classificacao.send_keys(Keys.ARROW_DOWN)  # Navega para a primeira sugestão
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             campo_classificacao.send_keys(Keys.ENTER)
 
             logging.info(f'Valor "{self.classificacao}" inserido no campo de texto com sucesso.')
@@ -3145,7 +3263,7 @@ class IniciaProcessos:
             logging.error(f'Erro ao inserir o valor no campo de texto: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             campo_interessado = self.driver.find_element(By.ID, "txtInteressadoProcedimento")  # Localiza o campo pelo ID
             campo_interessado.clear()  # Limpa o campo antes de inserir o valor
@@ -3155,7 +3273,7 @@ class IniciaProcessos:
             alert.accept()
 
             logging.info(f'Valor "{self.interessado}" inserido no campo de texto com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             clique_interessado = self.driver.find_element(By.ID, "selInteressadosProcedimento")
             clique_interessado.click()
 
@@ -3163,7 +3281,7 @@ class IniciaProcessos:
             logging.error(f'Erro ao inserir o valor no campo de texto: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # try:
         #     campo_observacao = self.driver.find_element(By.ID,
         #                                                  "txaObservacoes")  # Localiza o campo pelo ID
@@ -3174,7 +3292,7 @@ class IniciaProcessos:
         #
         #     logging.info(f'Valor "{self.observacao}" inserido no campo de texto com sucesso.')
         #
-        #     time.sleep(TempoAleatorio().tempo_aleatorio())
+        #     governador().aguardar()
         #     time.sleep(10)
         #
         # except Exception as e:
@@ -3201,7 +3319,7 @@ class TipoAcesso:
             logging.info('Opção de restrição selecionada.')
 
             # Simula comportamento humano com uma espera aleatória
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
 
             # Tenta selecionar o dropdown utilizando o método com retry
             self._selecionar_dropdown()
@@ -3216,7 +3334,7 @@ class TipoAcesso:
         Tenta selecionar o dropdown. Caso o elemento não esteja disponível,
         o tenacity realizará até 3 tentativas, esperando 2 segundos entre elas.
         """
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Tenta encontrar o dropdown
         dropdown_element = self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]')
         drop = Select(dropdown_element)
@@ -3283,7 +3401,7 @@ class IncluiNotaPss:
             restrito_label = wait.until(EC.element_to_be_clickable(
                 (By.XPATH, '//*[@id="divOptRestrito"]/div/label')))
             restrito_label.click()
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             select_element = wait.until(EC.element_to_be_clickable(
                 (By.XPATH, '//*[@id="selHipoteseLegal"]')))
             drop = Select(select_element)
@@ -3302,7 +3420,7 @@ class IncluiNotaPss:
         except Exception as e:
             logging.error("Erro ao clicar no botão 'Salvar': %s", e)
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             # Formata o valor e converte para extenso
@@ -3376,10 +3494,10 @@ class IncluiNotaPss:
 
         # Volta para o conteúdo principal e aguarda que o botão de salvar esteja clicável
         self.driver.switch_to.default_content()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         salvar_button = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="cke_455_label"]')))
         salvar_button.click()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         # Fecha a nova janela/aba
         self.driver.close()
@@ -3420,7 +3538,7 @@ class NotificacaoNumeradaPss():
         # Aguarda ativamente que o frame 'ifrVisualizacao' esteja disponível e troca para ele
         wait.until(EC.frame_to_be_available_and_switch_to_it("ifrVisualizacao"))
         # self.driver.switch_to.frame('ifrArvore')
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             IconesBarraProcessoSei(self.driver, "Incluir Documento").clicar_icone_barra()
@@ -3429,7 +3547,7 @@ class NotificacaoNumeradaPss():
             logging.error(f'Erro ao clicar no ícone "Incluir Documento": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="txtFiltro"]').send_keys(self.tipo_doc, Keys.TAB, Keys.ENTER)
             logging.info(f'Documento do tipo "{self.tipo_doc}" filtrado com sucesso.')
@@ -3437,18 +3555,18 @@ class NotificacaoNumeradaPss():
             logging.error(f'Erro ao filtrar documento do tipo "{self.tipo_doc}": {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptProtocoloDocumentoTextoBase"]/div/label').click()
             logging.info('Opção de protocolo de documento base selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             self.driver.find_element(By.XPATH, '//*[@id="txtProtocoloDocumentoTextoBase"]').send_keys(self.protocolo)
             logging.info(f'Protocolo "{self.protocolo}" inserido com sucesso.')
         except Exception as e:
             logging.error(f'Erro ao inserir protocolo do documento base: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         try:
             self.driver.find_element(By.ID, 'txtNomeArvore').send_keys(self.nome_arvore)
             logging.info(f'Nome da árvore "{self.nome_arvore}" inserido com sucesso.')
@@ -3459,7 +3577,7 @@ class NotificacaoNumeradaPss():
         try:
             self.driver.find_element(By.XPATH, '//*[@id="divOptRestrito"]/div/label').click()
             logging.info('Opção de restrição selecionada com sucesso.')
-            time.sleep(TempoAleatorio().tempo_aleatorio())
+            governador().aguardar()
             drop = Select(self.driver.find_element(By.XPATH, '//*[@id="selHipoteseLegal"]'))
             drop.select_by_visible_text("Informação Pessoal (Art. 31 da Lei nº 12.527/2011)")
             logging.info('Hipótese legal "Informação Pessoal" selecionada com sucesso.')
@@ -3467,7 +3585,7 @@ class NotificacaoNumeradaPss():
             logging.error(f'Erro ao selecionar a hipótese legal: {str(e)}')
             return
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Armazena as janelas abertas antes de clicar no botão "Salvar"
         janelas_antes = set(self.driver.window_handles)
 
@@ -3484,7 +3602,7 @@ class NotificacaoNumeradaPss():
             return
 
         # Aguarda um tempo aleatório para simular o comportamento humano
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         # Aguarda até que uma nova janela seja aberta
         WebDriverWait(self.driver, 10).until(
@@ -3497,9 +3615,9 @@ class NotificacaoNumeradaPss():
         # Muda para a nova janela
         self.driver.switch_to.window(nova_janela)
         self.driver.maximize_window()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         self.driver.refresh()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
         try:
             # Localiza os frames desejados pela classe 'cke_wysiwyg_frame'
@@ -3609,7 +3727,7 @@ class NotificacaoNumeradaPss():
         )
         self.driver.execute_script("arguments[0].innerHTML = arguments[1];", elemento2, novo_texto2)
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         self.driver.switch_to.default_content()
 
         # Clica em um elemento específico (por exemplo, o botão de confirmação)
@@ -3655,7 +3773,7 @@ class AcessoExterno:
         IconesBarraProcessoSei(self.driver, "Gerenciar Disponibilizações de Acesso Externo").clicar_icone_barra()
         IframesSei(self.driver, "Exibe frame documentos").navegar_iframes_sei()
 
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         # Tenta encontrar o dropdown
         try:
             # Aguarda até que o elemento do dropdown esteja visível
@@ -3819,14 +3937,14 @@ class ApagaDocumentoSEI:
 
     def apagar_documento_sei(self):
         wait = WebDriverWait(self.driver, 10)
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         IframesSei(self.driver, "Arvore documentos").navegar_iframes_sei()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         DocumentosArvoreSei(self.driver, self.texto_parcial).clicar_no_documento()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         IconesBarraProcessoSei(self.driver, "Excluir").clicar_icone_barra()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
         alert = wait.until(EC.alert_is_present())
         alert.accept()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        governador().aguardar()
 
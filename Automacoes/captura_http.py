@@ -0,0 +1,318 @@
+import logging
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+
+from .db_processos import GerenciadorDB, impressao_pagina
+from .captura_processos import montar_processos
+from .ritmo import governador
+from .telemetria import etapa
+
+# href ou onclick dos links de paginação do infra: infraAcaoPaginar('+',0,'Infra', ...)
+PADRAO_PAGINACAO = re.compile(r"infraAcaoPaginar\(\s*'([^']*)'\s*,\s*(-?\d+)\s*,\s*'(\w+)'")
+
+IDS_PROXIMA_PAGINA = ('lnkInfraProximaPaginaSuperior', 'lnkInfraProximaPaginaInferior')
+
+# Campos <input> que o navegador não envia ao submeter o formulário por script
+TIPOS_INPUT_IGNORADOS = ('submit', 'button', 'image', 'reset', 'file')
+
+
+class ParserControleProcessos(HTMLParser):
+    """
+    Lê a página de Controle de Processos numa única passada:
+    - linhas da tabela 'tblProcessosDetalhado' (texto dos links de cada <tr> do tbody);
+    - link de próxima página do infra, se houver;
+    - formulário que contém a tabela (action e os campos que o navegador
+      enviaria: inputs, opções selecionadas dos <select> e <textarea>), usado
+      na paginação;
+    - link de 'Visualização detalhada'.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.linhas = None
+        self.proxima_pagina = None
+        self.form_action = None
+        self.form_campos = {}
+        self.link_detalhado = None
+
+        self._form_atual = None
+        self._campos_atuais = {}
+        self._select = None
+        self._opcao = None
+        self._textarea = None
+        self._na_tabela = 0
+        self._no_tbody = False
+        self._linha = None
+        self._link = None
+        self._texto_link = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == 'form':
+            self._form_atual = attrs.get('action', '')
+            self._campos_atuais = {}
+        elif tag == 'input' and self._form_atual is not None and attrs.get('name') and 'disabled' not in attrs:
+            tipo = (attrs.get('type') or 'text').lower()
+            if tipo in ('checkbox', 'radio'):
+                if 'checked' in attrs:
+                    self._campos_atuais[attrs['name']] = attrs.get('value') or 'on'
+            elif tipo not in TIPOS_INPUT_IGNORADOS:
+                self._campos_atuais[attrs['name']] = attrs.get('value') or ''
+        elif tag == 'select' and self._form_atual is not None and attrs.get('name') and 'disabled' not in attrs:
+            self._select = {'nome': attrs['name'], 'primeira': None, 'selecionada': None}
+        elif tag == 'option' and self._select is not None:
+            self._fechar_opcao()
+            self._opcao = {'valor': attrs.get('value'), 'texto': [], 'selecionada': 'selected' in attrs}
+        elif tag == 'textarea' and self._form_atual is not None and attrs.get('name') and 'disabled' not in attrs:
+            self._textarea = {'nome': attrs['name'], 'texto': []}
+        elif tag == 'table':
+            if self._na_tabela:
+                self._na_tabela += 1
+            elif attrs.get('id') == 'tblProcessosDetalhado':
+                self._na_tabela = 1
+                self.linhas = []
+        elif tag == 'tbody' and self._na_tabela == 1:
+            self._no_tbody = True
+        elif tag == 'tr' and self._no_tbody and self._na_tabela == 1:
+            self._linha = []
+        elif tag == 'a':
+            if attrs.get('id') in IDS_PROXIMA_PAGINA and self.proxima_pagina is None:
+                # O infraAcaoPaginar pode estar no onclick, com href="#" ou javascript:void(0)
+                candidatos = [attrs.get('href') or '', attrs.get('onclick') or '']
+                self.proxima_pagina = next((c for c in candidatos if PADRAO_PAGINACAO.search(c)),
+                                           candidatos[0] or candidatos[1])
+            self._link = attrs
+            self._texto_link = []
+
+    def _fechar_opcao(self):
+        """Registra a <option> em aberto (o </option> é opcional no HTML)."""
+        if self._opcao is None:
+            return
+        valor = self._opcao['valor']
+        if valor is None:
+            valor = ' '.join(''.join(self._opcao['texto']).split())
+        if self._select['primeira'] is None:
+            self._select['primeira'] = valor
+        if self._opcao['selecionada']:
+            self._select['selecionada'] = valor
+        self._opcao = None
+
+    def handle_endtag(self, tag):
+        if tag == 'option' and self._opcao is not None:
+            self._fechar_opcao()
+        elif tag == 'select' and self._select is not None:
+            self._fechar_opcao()
+            # Sem opção marcada, o navegador envia a primeira
+            valor = self._select['selecionada']
+            if valor is None:
+                valor = self._select['primeira']
+            if valor is not None:
+                self._campos_atuais[self._select['nome']] = valor
+            self._select = None
+        elif tag == 'textarea' and self._textarea is not None:
+            self._campos_atuais[self._textarea['nome']] = ''.join(self._textarea['texto'])
+            self._textarea = None
+        elif tag == 'a' and self._link is not None:
+            texto = ''.join(self._texto_link).strip()
+            if self._linha is not None:
+                self._linha.append(texto)
+            if texto == 'Visualização detalhada' and self.link_detalhado is None:
+                self.link_detalhado = self._link.get('href')
+            self._link = None
+        elif tag == 'tr' and self._linha is not None:
+            self.linhas.append(self._linha)
+            self._linha = None
+        elif tag == 'tbody' and self._na_tabela == 1:
+            self._no_tbody = False
+        elif tag == 'table' and self._na_tabela:
+            self._na_tabela -= 1
+            if not self._na_tabela:
+                # O formulário da paginação é o que contém a tabela
+                self.form_action = self._form_atual
+        elif tag == 'form' and self._form_atual is not None:
+            if self.form_action == self._form_atual and not self.form_campos:
+                self.form_campos = dict(self._campos_atuais)
+            self._form_atual = None
+
+    def handle_data(self, data):
+        if self._opcao is not None:
+            self._opcao['texto'].append(data)
+        if self._textarea is not None:
+            self._textarea['texto'].append(data)
+        if self._link is not None:
+            self._texto_link.append(data)
+
+
+class CapturaProcessosHttp:
+    """
+    Leitura da caixa por HTTP: a partir de um requests.Session já autenticado
+    no SEI, baixa as páginas do Controle de Processos, segue a paginação do
+    infra por POST do formulário e lê a tabela com o parser de HTML da
+    biblioteca padrão, sem renderizar as páginas no navegador.
+
+    O login e a troca de unidade continuam sendo feitos pelo navegador: o
+    OrquestradorCapturas monta a sessão com a_partir_do_driver, com os cookies
+    do Chrome já na unidade desejada.
+
+    Grava no GerenciadorDB os mesmos registros que CapturaProcessos. Captura a
+    unidade selecionada na sessão e pressupõe o nível de detalhe com a coluna
+    de Atribuição já configurado (NivelDetalheTecnicos grava a preferência).
+    """
+    URL_SEI = 'https://colaboragov.sei.gov.br/sei/'
+    TIMEOUT = 30
+    MAX_PAGINAS = 500
+
+    def __init__(self, sessao: requests.Session, db: GerenciadorDB, url_controle=None, limitador=None,
+                 ao_finalizar=None):
+        """
+        Args:
+            sessao: requests.Session autenticado no SEI
+            db: Banco da unidade
+            url_controle: URL do Controle de Processos (com infra_hash); se
+                          omitida, a tela inicial do SEI é usada
+            limitador: Ritmo das requisições (padrão: governador do SEI)
+            ao_finalizar: Chamado com a unidade depois de uma captura completa
+                          (ex.: para invalidar o cache do painel)
+        """
+        self.sessao = sessao
+        self.db = db
+        self.url_controle = url_controle or self.URL_SEI
+        self.limitador = limitador or governador()
+        self.ao_finalizar = ao_finalizar
+
+    @classmethod
+    def a_partir_do_driver(cls, driver, db, ao_finalizar=None):
+        """Monta a captura HTTP reaproveitando os cookies e a URL atual do navegador."""
+        sessao = requests.Session()
+        for cookie in driver.get_cookies():
+            sessao.cookies.set(cookie['name'], cookie['value'],
+                               domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        sessao.headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+        return cls(sessao, db, url_controle=driver.current_url, ao_finalizar=ao_finalizar)
+
+    def _ler(self, resposta):
+        resposta.raise_for_status()
+        if 'login' in resposta.url.lower():
+            raise RuntimeError('Sessão do SEI expirada: redirecionado para a página de login.')
+        parser = ParserControleProcessos()
+        parser.feed(resposta.text)
+        parser.close()
+        return resposta.url, parser
+
+    def _abrir_listagem(self):
+        self.limitador.aguardar()
+        url, pagina = self._ler(self.sessao.get(self.url_controle, timeout=self.TIMEOUT))
+        if pagina.linhas is None and pagina.link_detalhado:
+            logging.info("Alternando para a visualização detalhada.")
+            self.limitador.aguardar()
+            url, pagina = self._ler(self.sessao.get(urljoin(url, pagina.link_detalhado), timeout=self.TIMEOUT))
+        return url, pagina
+
+    def _campo_pagina_atual(self, pagina):
+        correspondencia = PADRAO_PAGINACAO.search(pagina.proxima_pagina or '')
+        prefixo = correspondencia.group(3) if correspondencia else 'Infra'
+        return f'hdn{prefixo}PaginaAtual'
+
+    def _ir_para_pagina(self, url, pagina, indice):
+        """Reproduz infraAcaoPaginar: grava o índice da página (a primeira é 0) no formulário e o envia."""
+        campos = dict(pagina.form_campos)
+        campos[self._campo_pagina_atual(pagina)] = str(indice)
+
+        destino = urljoin(url, pagina.form_action or url)
+        self.limitador.aguardar()
+        return self._ler(self.sessao.post(destino, data=campos, timeout=self.TIMEOUT))
+
+    def _proxima_pagina(self, url, pagina):
+        campo = self._campo_pagina_atual(pagina)
+        return self._ir_para_pagina(url, pagina, int(pagina.form_campos.get(campo) or 0) + 1)
+
+    def _retomar(self, captura_id, checkpoint, url, pagina):
+        """
+        Vai até a última página gravada da captura interrompida e confere se ela
+        ainda tem os mesmos processos; se a paginação se deslocou, descarta a
+        captura e recomeça da primeira página.
+
+        Returns:
+            tuple: (captura_id, índice da última página já gravada ou -1 se a
+            captura recomeçou, url, página exibida)
+        """
+        indice = checkpoint["pagina"]
+        url_destino, destino = (url, pagina) if indice == 0 else self._ir_para_pagina(url, pagina, indice)
+
+        if destino.linhas is not None:
+            processos = montar_processos(destino.linhas, self.db.unidade)
+            if impressao_pagina(processos) == checkpoint["impressao"]:
+                return captura_id, indice, url_destino, destino
+
+        logging.warning("A listagem mudou desde o checkpoint; recomeçando a captura da primeira página.")
+        self.db.abandonar_captura(captura_id)
+        captura_id, _ = self.db.iniciar_captura('http')
+        if indice != 0:
+            url, pagina = self._ir_para_pagina(url, pagina, 0)
+        return captura_id, -1, url, pagina
+
+    def capturar_caixa(self, caixa_nome):
+        logging.info(f"Iniciando captura HTTP da caixa: {caixa_nome}")
+
+        with etapa('abertura_listagem'):
+            url, pagina = self._abrir_listagem()
+        if pagina.linhas is None:
+            logging.warning("Tabela de processos com ID 'tblProcessosDetalhado' não encontrada.")
+            return False
+
+        captura_id, checkpoint = self.db.iniciar_captura('http')
+        # Páginas até ultima_gravada já estão no banco (captura retomada)
+        ultima_gravada = -1
+        if checkpoint is not None:
+            with etapa('retomada'):
+                captura_id, ultima_gravada, url, pagina = self._retomar(captura_id, checkpoint, url, pagina)
+
+        numero_pagina = max(ultima_gravada, 0)
+        while numero_pagina < self.MAX_PAGINAS:
+            if pagina.linhas is None:
+                self.db.registrar_falha_captura(captura_id, f"Tabela ausente na página {numero_pagina + 1}")
+                logging.error("Tabela ausente após paginar. Captura interrompida sem marcar processos concluídos.")
+                return False
+
+            if numero_pagina > ultima_gravada:
+                with etapa('extracao_pagina', numero_pagina):
+                    processos = montar_processos(pagina.linhas, self.db.unidade)
+                with etapa('gravacao_pagina', numero_pagina):
+                    resumo = self.db.gravar_pagina(captura_id, numero_pagina, processos)
+                logging.info(f"Página {numero_pagina + 1} gravada: {resumo['inseridos']} inseridos, "
+                             f"{resumo['atualizados']} atualizados, {resumo['inalterados']} inalterados.")
+
+            if pagina.proxima_pagina is None:
+                logging.info("Nenhum link 'Próxima página' encontrado. Fim da tabela.")
+                break
+
+            try:
+                with etapa('paginacao', numero_pagina + 1):
+                    url, pagina = self._proxima_pagina(url, pagina)
+            except (requests.RequestException, RuntimeError) as e:
+                # Os checkpoints ficam e a próxima tentativa recomeça desta página
+                self.db.registrar_falha_captura(captura_id, f"{e.__class__.__name__} na página {numero_pagina + 2}")
+                logging.error(f"Falha ao baixar a página {numero_pagina + 2} ({e}). "
+                              "Captura interrompida sem marcar processos concluídos.")
+                return False
+            numero_pagina += 1
+        else:
+            self.db.registrar_falha_captura(captura_id, f"Limite de {self.MAX_PAGINAS} páginas")
+            logging.error(f"Limite de {self.MAX_PAGINAS} páginas atingido. "
+                          f"Captura interrompida sem marcar processos concluídos.")
+            return False
+
+        # Só chega aqui depois de gravar todas as páginas
+        self.db.finalizar_captura(captura_id)
+        if self.ao_finalizar is not None:
+            self.ao_finalizar(self.db.unidade)
+
+        logging.info(f"Captura HTTP finalizada para a caixa {caixa_nome}. Páginas lidas: {numero_pagina + 1}")
+        return True
+
+    def fechar(self):
+        self.db.fechar()
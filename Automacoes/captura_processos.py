@@ -1,129 +1,268 @@
 import logging
-import time
-import sqlite3
 from datetime import datetime
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-from .db_processos import GerenciadorDB
-from .SEI_Geral import VisualizacaoDetalhada, BotaoProximaPagina, TempoAleatorio, NivelDetalheTecnicos
+from .db_processos import GerenciadorDB, impressao_pagina
+from .SEI_Geral import VisualizacaoDetalhada, NivelDetalheTecnicos
+from .ritmo import governador
+from .telemetria import etapa
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Lê a tabela inteira no navegador e devolve, para cada linha do tbody, o texto
+# de todos os links. Retorna null quando a tabela não está na página.
+JS_EXTRAIR_TABELA_PROCESSOS = """
+const tabela = document.getElementById('tblProcessosDetalhado');
+if (!tabela) { return null; }
+const linhas = tabela.querySelectorAll(':scope > tbody > tr');
+return Array.from(linhas, tr => Array.from(tr.getElementsByTagName('a'), a => a.innerText || ''));
+"""
+
+# Reproduz infraAcaoPaginar para ir direto a uma página: grava o índice no campo
+# oculto hdnInfraPaginaAtual e envia o formulário da tabela. Retorna false se a
+# página não tiver paginação do infra.
+JS_IR_PARA_PAGINA = """
+const campo = document.getElementById('hdnInfraPaginaAtual');
+const tabela = document.getElementById('tblProcessosDetalhado');
+const formulario = campo && (campo.form || (tabela && tabela.closest('form')));
+if (!formulario) { return false; }
+campo.value = arguments[0];
+formulario.submit();
+return true;
+"""
+
+
+def montar_processos(linhas, caixa):
+    """
+    Converte as linhas da tabela 'tblProcessosDetalhado' nos registros gravados
+    pelo GerenciadorDB. Cada linha é a lista de textos dos seus links: o
+    penúltimo é o número do processo e o último o técnico da atribuição.
+    Compartilhado pelas capturas via navegador e via HTTP.
+    """
+    processos = []
+    logging.info(f"Encontradas {len(linhas)} linhas na tabela com ID 'tblProcessosDetalhado'.")
+
+    agora = datetime.now()
+    data = agora.strftime("%Y-%m-%d")
+    hora = agora.strftime("%H:%M:%S")
+
+    for i, links_na_linha in enumerate(linhas):
+        if len(links_na_linha) < 2:
+            logging.warning(f"Linha {i+1} com menos de 2 links. Encontrados {len(links_na_linha)} links. Pulando.")
+            continue
+
+        tecnico_email = links_na_linha[-1].strip()
+        numero_processo = links_na_linha[-2].strip()
+
+        if numero_processo and tecnico_email:
+            logging.debug(f"Processo extraído: Número='{numero_processo}', Técnico='{tecnico_email}'")
+            processos.append({
+                "processo_numero": numero_processo,
+                "email": tecnico_email,
+                "tecnico": tecnico_email,
+                "caixa": caixa,
+                "data": data,
+                "hora": hora
+            })
+        else:
+            logging.warning(f"Dados vazios encontrados na linha {i+1}: Numero='{numero_processo}', Tecnico='{tecnico_email}'")
+
+    logging.info(f"Total de processos para salvar nesta página: {len(processos)}")
+    return processos
+
 
 class CapturaProcessos:
-    def __init__(self, driver, db:GerenciadorDB):
+    TIMEOUT_PAGINA = 30
+    TIMEOUT_RECARGA = 10
+
+    def __init__(self, driver, db:GerenciadorDB, limitador=None, ao_finalizar=None):
+        """
+        Args:
+            driver: Navegador já na unidade a capturar
+            db: Banco da unidade
+            limitador: Ritmo das ações (padrão: governador do SEI)
+            ao_finalizar: Chamado com a unidade depois de uma captura completa
+                          (ex.: para invalidar o cache do painel)
+        """
         self.driver = driver
         self.db = db
+        self.limitador = limitador or governador()
+        self.ao_finalizar = ao_finalizar
 
     def _extrair_processos_da_pagina(self):
-        processos = []
-        try:
-            tabela = self.driver.find_element(By.ID, 'tblProcessosDetalhado')
-            linhas = tabela.find_elements(By.XPATH, './tbody/tr')
-            
-            logging.info(f"Encontradas {len(linhas)} linhas na tabela com ID 'tblProcessosDetalhado'.")
-
-            for i, linha in enumerate(linhas):
-                links_na_linha = linha.find_elements(By.TAG_NAME, 'a')
-                
-
-                if len(links_na_linha) >= 2:
-                    try:
-                        tecnico_email = links_na_linha[-1].text.strip()
-                        numero_processo = links_na_linha[-2].text.strip()
-                        
-                        if numero_processo and tecnico_email:
-                            logging.info(f"Processo extraído: Número='{numero_processo}', Técnico='{tecnico_email}'")
-                            processos.append({
-                                "processo_numero": numero_processo,
-                                "email": tecnico_email,
-                                "tecnico": tecnico_email,
-                                "caixa": self.db.unidade,
-                                "data": datetime.now().strftime("%Y-%m-%d"),
-                                "hora": datetime.now().strftime("%H:%M:%S")
-                            })
-                        else:
-                            logging.warning(f"Dados vazios encontrados na linha {i+1}: Numero='{numero_processo}', Tecnico='{tecnico_email}'")
-                    except Exception as e:
-                        logging.error(f"Erro ao extrair dados da linha {i+1}: {e}. Pulando.")
-                        continue
-                else:
-                    logging.warning(f"Linha {i+1} com menos de 2 links. Encontrados {len(links_na_linha)} links. Pulando.")
-                    continue
-        except NoSuchElementException:
+        """
+        Extrai os processos da tabela 'tblProcessosDetalhado' da página atual.
+
+        A tabela inteira é lida com um único execute_script, que devolve o texto
+        dos links de cada linha (os dois últimos são o processo e o técnico).
+        Evita um find_elements por linha e um .text por link, o que custava
+        mais de mil chamadas ao WebDriver em páginas grandes.
+        """
+        linhas = self.driver.execute_script(JS_EXTRAIR_TABELA_PROCESSOS)
+
+        if linhas is None:
             logging.warning("Tabela de processos com ID 'tblProcessosDetalhado' não encontrada.")
-        
-        logging.info(f"Total de processos para salvar nesta página: {len(processos)}")
-        return processos
+            return []
+
+        return montar_processos(linhas, self.db.unidade)
+
+    def _aguardar_tabela(self):
+        """
+        Espera o documento terminar de carregar e a tabela de processos existir.
+
+        Returns:
+            WebElement da tabela, ou None se ela não aparecer (caixa vazia)
+        """
+        espera = WebDriverWait(self.driver, self.TIMEOUT_PAGINA)
+        espera.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
+        try:
+            return espera.until(EC.presence_of_element_located((By.ID, 'tblProcessosDetalhado')))
+        except TimeoutException:
+            logging.warning("Tabela de processos com ID 'tblProcessosDetalhado' não apareceu na página.")
+            return None
+
+    def _botao_proxima_pagina(self):
+        """Botão 'Próxima página' superior ou inferior, com uma única busca; None se não houver."""
+        botoes = self.driver.find_elements(
+            By.CSS_SELECTOR, '#lnkInfraProximaPaginaSuperior img, #lnkInfraProximaPaginaInferior'
+        )
+        return botoes[0] if botoes else None
 
     def capturar_caixa(self, caixa_nome):
         logging.info(f"Iniciando captura da caixa: {caixa_nome}")
         logging.info(f"URL atual do navegador: {self.driver.current_url}")
         
         # 1. Chamar a visualização detalhada e padronizar o nível de detalhe
-        vis_detalhada = VisualizacaoDetalhada(self.driver)
-        vis_detalhada.visualizar_detalhado()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
+        with etapa('visualizacao_detalhada'):
+            vis_detalhada = VisualizacaoDetalhada(self.driver)
+            vis_detalhada.visualizar_detalhado()
 
-        # Chamar NivelDetalheTecnicos para padronizar tabela
-        
-        nivel_detalhe = NivelDetalheTecnicos(self.driver)
-        nivel_detalhe.detalhar_nivel_tecnicos()
-        time.sleep(TempoAleatorio().tempo_aleatorio())
-
-        # 3. Rolar a página para carregar todos os elementos
-        logging.info("Rolando a página para garantir que todos os elementos estejam visíveis.")
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2) 
-        
-        todos_processos = []
+        with etapa('nivel_detalhe'):
+            # Chamar NivelDetalheTecnicos para padronizar tabela
+            tabela_anterior = self.driver.find_elements(By.ID, 'tblProcessosDetalhado')
+            nivel_detalhe = NivelDetalheTecnicos(self.driver)
+            nivel_detalhe.detalhar_nivel_tecnicos()
+
+            # 2. Esperar a tabela recarregada com a nova configuração
+            if tabela_anterior:
+                try:
+                    WebDriverWait(self.driver, self.TIMEOUT_RECARGA).until(EC.staleness_of(tabela_anterior[0]))
+                except TimeoutException:
+                    logging.info("A tabela não foi recarregada após configurar o nível de detalhe.")
+            tabela = self._aguardar_tabela()
 
-        botao_prox = BotaoProximaPagina(self.driver)
+        captura_id, checkpoint = self.db.iniciar_captura('selenium')
+        # Páginas até ultima_gravada já estão no banco (captura retomada)
+        ultima_gravada = -1
+        if checkpoint is not None:
+            with etapa('retomada'):
+                captura_id, ultima_gravada, tabela = self._retomar(captura_id, checkpoint, tabela)
+        pagina = max(ultima_gravada, 0)
 
         while True:
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+            if pagina > ultima_gravada:
+                with etapa('extracao_pagina', pagina):
+                    processos = self._extrair_processos_da_pagina()
+                with etapa('gravacao_pagina', pagina):
+                    resumo = self.db.gravar_pagina(captura_id, pagina, processos)
+                logging.info(f"Página {pagina + 1} gravada: {resumo['inseridos']} inseridos, "
+                             f"{resumo['atualizados']} atualizados, {resumo['inalterados']} inalterados.")
 
-            processos = self._extrair_processos_da_pagina()
-            todos_processos.extend(processos)
-            
-            self.db.inserir_ou_atualizar(processos)
-            
-            next_btn = None
-            
+            next_btn = self._botao_proxima_pagina()
+            if next_btn is None:
+                logging.info("Nenhum botão 'Próxima página' encontrado. Fim da tabela.")
+                break
+
+            # Ritmo das requisições ao SEI vem do limitador, não de pausas fixas
+            with etapa('espera_ritmo', pagina + 1):
+                self.limitador.aguardar()
             try:
-                # Tenta encontrar o botão superior
-                next_btn = self.driver.find_element(By.XPATH, '//*[@id="lnkInfraProximaPaginaSuperior"]/img')
-                logging.info("Botão 'Próxima página' superior encontrado.")
-            except NoSuchElementException:
-                logging.info("Botão 'Próxima página' superior não encontrado. Tentando o botão inferior...")
-                try:
-                    # Se o superior não for encontrado, tenta o inferior
-                    next_btn = self.driver.find_element(By.ID, 'lnkInfraProximaPaginaInferior')
-                    logging.info("Botão 'Próxima página' inferior encontrado.")
-                except NoSuchElementException:
-                    logging.info("Nenhum botão 'Próxima página' encontrado. Fim da tabela.")
-                    break
-
-            # Se um botão foi encontrado, clica nele
-            if next_btn:
-                try:
+                with etapa('paginacao', pagina + 1):
                     next_btn.click()
-                    time.sleep(TempoAleatorio().tempo_aleatorio())
+                    # A troca de página substitui a tabela: espera a antiga sair e a nova carregar
+                    if tabela is not None:
+                        WebDriverWait(self.driver, self.TIMEOUT_PAGINA).until(EC.staleness_of(tabela))
+                    tabela = self._aguardar_tabela()
+            except (NoSuchElementException, StaleElementReferenceException, TimeoutException) as e:
+                # A tabela não foi lida até o fim: não marca conclusões com um retrato parcial.
+                # Os checkpoints ficam e a próxima tentativa recomeça desta página.
+                self.db.registrar_falha_captura(captura_id, f"{e.__class__.__name__} na página {pagina + 2}")
+                logging.error(f"Falha ao avançar para a página {pagina + 2} ({e.__class__.__name__}). "
+                              "Captura interrompida sem marcar processos concluídos.")
+                return False
+            pagina += 1
 
-                except NoSuchElementException:
-                    logging.info("Botão 'Próxima página' não encontrado ao tentar clicar.")
-                    break
-            else:
-                logging.info("Botão 'Próxima página' não está presente. Fim da tabela.")
-                break
-        numeros_atuais = [p["processo_numero"] for p in todos_processos]
-        self.db.marcar_concluidos(numeros_atuais)
+            if tabela is None:
+                self.db.registrar_falha_captura(captura_id, f"Tabela ausente na página {pagina + 1}")
+                logging.error("Tabela ausente após paginar. Captura interrompida sem marcar processos concluídos.")
+                return False
+
+        # Só chega aqui depois de gravar todas as páginas
+        self.db.finalizar_captura(captura_id)
+        if self.ao_finalizar is not None:
+            self.ao_finalizar(self.db.unidade)
+
+        logging.info(f"Captura finalizada para a caixa {caixa_nome}. Páginas lidas: {pagina + 1}")
+        return True
+
+    def _ir_para_pagina(self, indice, tabela):
+        """
+        Vai direto para a página `indice` (a primeira é 0) da listagem. Usa o
+        campo de paginação do infra e, se ele não existir, avança pelo botão
+        'Próxima página'.
+
+        Returns:
+            WebElement da tabela na página de destino, ou None se não chegar lá
+        """
+        self.limitador.aguardar()
+        if self.driver.execute_script(JS_IR_PARA_PAGINA, indice):
+            if tabela is not None:
+                WebDriverWait(self.driver, self.TIMEOUT_PAGINA).until(EC.staleness_of(tabela))
+            return self._aguardar_tabela()
+
+        for _ in range(indice):
+            next_btn = self._botao_proxima_pagina()
+            if next_btn is None:
+                return None
+            self.limitador.aguardar()
+            next_btn.click()
+            if tabela is not None:
+                WebDriverWait(self.driver, self.TIMEOUT_PAGINA).until(EC.staleness_of(tabela))
+            tabela = self._aguardar_tabela()
+        return tabela
+
+    def _retomar(self, captura_id, checkpoint, tabela):
+        """
+        Posiciona a listagem na última página gravada da captura interrompida e
+        confere se ela ainda tem os mesmos processos. Se a paginação se deslocou
+        desde o checkpoint, a captura antiga é descartada e uma nova começa da
+        primeira página, para não deixar processos de fora do retrato.
+
+        Returns:
+            tuple: (captura_id, índice da última página já gravada ou -1 se a
+            captura recomeçou, tabela exibida)
+        """
+        pagina = checkpoint["pagina"]
+        try:
+            tabela_destino = tabela if pagina == 0 else self._ir_para_pagina(pagina, tabela)
+        except (NoSuchElementException, StaleElementReferenceException, TimeoutException) as e:
+            logging.warning(f"Não foi possível voltar à página {pagina + 1} ({e.__class__.__name__}).")
+            tabela_destino = None
+
+        if tabela_destino is not None:
+            processos = self._extrair_processos_da_pagina()
+            if impressao_pagina(processos) == checkpoint["impressao"]:
+                return captura_id, pagina, tabela_destino
 
-        logging.info(f"Captura finalizada para a caixa {caixa_nome}. Total extraído: {len(todos_processos)}")
+        logging.warning("A listagem mudou desde o checkpoint; recomeçando a captura da primeira página.")
+        self.db.abandonar_captura(captura_id)
+        captura_id, _ = self.db.iniciar_captura('selenium')
+        if tabela_destino is not tabela:
+            tabela_destino = self._ir_para_pagina(0, tabela_destino)
+        return captura_id, -1, tabela_destino
 
     def fechar(self):
         self.db.fechar()
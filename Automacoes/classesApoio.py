@@ -1,6 +1,5 @@
 import logging
 import os
-import random
 import re
 import shutil
 import sys
@@ -24,14 +23,6 @@ from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, PageBreak,
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 
-class TempoAleatorio:
-    def __init__(self):
-        self.tempo = random.uniform(1, 2)
-
-    def tempo_aleatorio(self):
-        return self.tempo
-
-
 class AlternadorDeAbas:
     def __init__(self, navegador):
         self.driver = navegador
@@ -0,0 +1,52 @@
+"""
+Ponto único de interceptação dos comandos do WebDriver.
+
+Todos os comandos, inclusive os dos WebElements, passam por driver.execute.
+Os recursos que precisam observá-los (o GerenciadorFrames do SEI_Geral e a
+instrumentação) não substituem driver.execute cada um por conta própria, o
+que faria o resultado depender da ordem de instalação: registram um
+interceptador numa cadeia única do driver, com posição fixa.
+
+    ORDEM_FRAMES          externo: pode responder sem ir ao navegador
+    ORDEM_INSTRUMENTACAO  interno: mede só o que chega ao navegador
+
+Um interceptador recebe (comando, params, prosseguir) e chama
+prosseguir(comando, params) para passar o comando adiante.
+"""
+
+ORDEM_FRAMES = 10
+ORDEM_INSTRUMENTACAO = 20
+
+
+def interceptar_comandos(driver, nome, interceptador, ordem):
+    """
+    Registra o interceptador na cadeia do driver, criada no primeiro uso.
+
+    Returns:
+        bool: False se já havia um interceptador com esse nome (nada muda)
+    """
+    cadeia = getattr(driver, '_interceptadores', None)
+    if cadeia is None:
+        cadeia = driver._interceptadores = []
+        original = driver.execute
+
+        def execute(comando, params=None):
+            return _executar(cadeia, 0, original, comando, params)
+
+        driver.execute = execute
+
+    if any(registrado == nome for _, registrado, _ in cadeia):
+        return False
+    cadeia.append((ordem, nome, interceptador))
+    cadeia.sort(key=lambda item: item[0])
+    return True
+
+
+def _executar(cadeia, indice, original, comando, params):
+    if indice == len(cadeia):
+        return original(comando, params)
+    interceptador = cadeia[indice][2]
+    return interceptador(
+        comando, params,
+        lambda comando, params=None: _executar(cadeia, indice + 1, original, comando, params)
+    )
@@ -1,6 +1,255 @@
 import sqlite3
 import os
-from datetime import datetime
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from .telemetria import etapa
+
+# Limite de parâmetros por consulta "IN (...)" para não esbarrar no
+# SQLITE_MAX_VARIABLE_NUMBER de builds mais antigos do SQLite.
+TAMANHO_LOTE_CONSULTA = 900
+
+# Uma captura interrompida só é retomada dentro desta janela; depois disso a
+# listagem já mudou demais e a captura recomeça da primeira página.
+HORAS_RETOMADA_CAPTURA = float(os.getenv("CAPTURA_RETOMADA_HORAS", 4))
+
+FORMATO_DATA_HORA = "%Y-%m-%d %H:%M:%S"
+
+
+def impressao_pagina(processos):
+    """
+    Impressão digital de uma página da listagem: hash dos números de processo
+    na ordem em que aparecem. Muda quando a paginação se desloca.
+    """
+    numeros = "\n".join(p["processo_numero"] for p in processos)
+    return hashlib.sha1(numeros.encode("utf-8")).hexdigest()
+
+
+def _texto_data(valor):
+    """date/datetime no formato das colunas de data do banco; texto passa direto."""
+    if isinstance(valor, datetime):
+        return valor.strftime(FORMATO_DATA_HORA)
+    if hasattr(valor, "isoformat"):
+        return valor.isoformat()
+    return valor
+
+
+def impressao_atribuicoes(processos):
+    """
+    Impressão digital das atribuições de uma página: hash dos pares
+    (processo, e-mail, técnico) na ordem da listagem. Igual à da mesma página
+    na captura anterior significa que nenhum processo da página mudou.
+    """
+    pares = "\n".join(f'{p["processo_numero"]}\t{p.get("email")}\t{p.get("tecnico")}' for p in processos)
+    return hashlib.sha1(pares.encode("utf-8")).hexdigest()
+
+
+def _colunas(cursor, tabela):
+    return {linha[1] for linha in cursor.execute(f"PRAGMA table_info({tabela})").fetchall()}
+
+
+def _criar_tabela_processos(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS processos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            processo_numero TEXT UNIQUE,
+            email TEXT,
+            data TEXT,
+            hora TEXT,
+            caixa TEXT,
+            tecnico TEXT,
+            concluido INTEGER DEFAULT 0,
+            data_conclusao TEXT
+        )
+    """)
+
+
+def _adicionar_data_conclusao(cursor):
+    # Bancos criados antes da coluna existir
+    if "data_conclusao" not in _colunas(cursor, "processos"):
+        cursor.execute("ALTER TABLE processos ADD COLUMN data_conclusao TEXT")
+
+
+def _criar_indices_painel(cursor):
+    # Filtros do painel (usuarios/views.get_dados_caixa): concluídos da caixa
+    # pelos e-mails dos responsáveis ou por técnico, no dia ou no total.
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_processos_concluido_email_data
+        ON processos (concluido, email, data)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_processos_concluido_tecnico_data
+        ON processos (concluido, tecnico, data)
+    """)
+    # Atende tanto os processos em aberto (data_conclusao IS NULL), percorridos
+    # por marcar_concluidos, quanto consultas por período de conclusão.
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_processos_data_conclusao
+        ON processos (data_conclusao)
+    """)
+
+
+def _criar_tabelas_captura(cursor):
+    # Cada execução de capturar_caixa é um registro em "capturas"; cada página
+    # gravada vira um checkpoint em "captura_paginas", com os números lidos,
+    # para que uma captura interrompida recomece da página em que parou.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS capturas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            motor TEXT,
+            status TEXT NOT NULL DEFAULT 'em_andamento',
+            iniciada_em TEXT,
+            atualizada_em TEXT,
+            finalizada_em TEXT,
+            paginas INTEGER DEFAULT 0,
+            processos INTEGER DEFAULT 0,
+            concluidos INTEGER,
+            tentativas INTEGER DEFAULT 1,
+            ultimo_erro TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS captura_paginas (
+            captura_id INTEGER NOT NULL REFERENCES capturas(id),
+            pagina INTEGER NOT NULL,
+            linhas INTEGER,
+            impressao TEXT,
+            processos TEXT,
+            gravada_em TEXT,
+            PRIMARY KEY (captura_id, pagina)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_capturas_status
+        ON capturas (status, atualizada_em)
+    """)
+
+
+def _criar_alteracoes(cursor):
+    # Conjunto de mudanças de cada captura: processos atribuídos (novos na
+    # caixa), reatribuídos (outro técnico), reabertos (voltaram à listagem
+    # depois de concluídos) e que sumiram (concluídos). É a
+    # entrada das métricas derivadas, sem precisar reler a tabela processos.
+    if "impressao_atribuicoes" not in _colunas(cursor, "captura_paginas"):
+        cursor.execute("ALTER TABLE captura_paginas ADD COLUMN impressao_atribuicoes TEXT")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS alteracoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            captura_id INTEGER,
+            processo_numero TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            email_anterior TEXT,
+            tecnico_anterior TEXT,
+            email TEXT,
+            tecnico TEXT,
+            registrada_em TEXT
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_alteracoes_captura
+        ON alteracoes (captura_id, tipo)
+    """)
+
+
+def _criar_atribuicoes(cursor):
+    # Histórico das atribuições: um intervalo (inicio, fim) por processo e
+    # técnico, só acrescentado. Reatribuir fecha o intervalo aberto e abre
+    # outro; concluir fecha o aberto com concluido = 1. "processos" guarda só
+    # a atribuição atual, o que não basta para a produção de cada técnico
+    # num período quando há reatribuições.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS atribuicoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            processo_numero TEXT NOT NULL,
+            email TEXT,
+            tecnico TEXT,
+            caixa TEXT,
+            inicio TEXT NOT NULL,
+            fim TEXT,
+            concluido INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    # No máximo um intervalo aberto por processo; serve também para fechá-lo
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_atribuicoes_aberta
+        ON atribuicoes (processo_numero) WHERE fim IS NULL
+    """)
+    # Concluídos por técnico (ou pelos e-mails dos responsáveis) num período
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_atribuicoes_tecnico_fim
+        ON atribuicoes (tecnico, concluido, fim)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_atribuicoes_email_fim
+        ON atribuicoes (email, concluido, fim)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_atribuicoes_concluido_fim
+        ON atribuicoes (concluido, fim)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_atribuicoes_processo
+        ON atribuicoes (processo_numero, inicio)
+    """)
+
+    # Carga inicial a partir da atribuição atual de cada processo. O início é
+    # a última data/hora gravada em "processos", a melhor aproximação que os
+    # bancos antigos têm.
+    cursor.execute("""
+        INSERT INTO atribuicoes (processo_numero, email, tecnico, caixa, inicio, fim, concluido)
+        SELECT processo_numero, email, tecnico, caixa,
+               COALESCE(data, '') || ' ' || COALESCE(hora, '00:00:00'),
+               CASE WHEN concluido = 1
+                    THEN COALESCE(data_conclusao, COALESCE(data, '') || ' ' || COALESCE(hora, '00:00:00'))
+               END,
+               COALESCE(concluido, 0)
+        FROM processos
+        WHERE NOT EXISTS (SELECT 1 FROM atribuicoes a WHERE a.processo_numero = processos.processo_numero)
+    """)
+
+
+def _criar_metricas_diarias(cursor):
+    # Consolidação diária por técnico, mantida depois de cada captura a partir
+    # de "atribuicoes": concluídos e atribuídos no dia e o estoque (atribuições
+    # abertas) no fim do dia. O painel lê estas poucas linhas em vez de varrer
+    # o histórico de processos a cada requisição.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metricas_diarias (
+            caixa TEXT NOT NULL,
+            tecnico TEXT NOT NULL,
+            email TEXT NOT NULL,
+            dia TEXT NOT NULL,
+            concluidos INTEGER NOT NULL DEFAULT 0,
+            atribuidos INTEGER NOT NULL DEFAULT 0,
+            estoque INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (caixa, tecnico, email, dia)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_metricas_diarias_dia
+        ON metricas_diarias (dia)
+    """)
+    # Atribuições abertas por dia, usado na consolidação
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_atribuicoes_inicio
+        ON atribuicoes (inicio)
+    """)
+
+
+# Migrações do esquema, em ordem. A posição na lista (a partir de 1) é a
+# versão gravada em PRAGMA user_version; novas migrações entram no final.
+MIGRACOES = [
+    _criar_tabela_processos,
+    _adicionar_data_conclusao,
+    _criar_indices_painel,
+    _criar_tabelas_captura,
+    _criar_alteracoes,
+    _criar_atribuicoes,
+    _criar_metricas_diarias,
+]
+
 
 class GerenciadorDB:
     def __init__(self, base_dir, unidade):
@@ -12,7 +261,7 @@ class GerenciadorDB:
         
         self.db_path = os.path.join(pasta, f"{unidade}.db")  
         
-        # conecta ao banco
+        # conecta ao banco; a mesma conexão é usada durante toda a vida do objeto
         self.conn = sqlite3.connect(self.db_path)
         self.cursor = self.conn.cursor()
 
@@ -20,36 +269,55 @@ class GerenciadorDB:
         self._criar_tabela()
 
     def _criar_tabela(self):
-        """Cria a tabela se não existir ainda"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS processos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    processo_numero TEXT UNIQUE,
-                    email TEXT,
-                    data TEXT,
-                    hora TEXT,
-                    caixa TEXT,
-                    tecnico TEXT,
-                    concluido INTEGER DEFAULT 0,
-                    data_conclusao TEXT
-                )
-            """)
+        """Cria a tabela e aplica as migrações pendentes do esquema"""
+        versao_atual = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        aplicadas = []
 
+        for versao, migracao in enumerate(MIGRACOES, start=1):
+            if versao <= versao_atual:
+                continue
+            # Cada migração roda na sua própria transação junto com a nova versão
+            self.cursor.execute("BEGIN")
             try:
-                cursor.execute("ALTER TABLE processos ADD COLUMN data_conclusao TEXT;")
-                print("Coluna 'data_conclusao' adicionada com sucesso.")
-            except sqlite3.OperationalError as e:
-                if "duplicate column name" in str(e):
-                    pass 
-                else:
-                    raise e
-            conn.commit()
+                migracao(self.cursor)
+                self.cursor.execute(f"PRAGMA user_version = {versao}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            logging.info(f"Banco '{self.db_path}' migrado para a versão {versao} ({migracao.__name__}).")
+            aplicadas.append(migracao)
+
+        # A consolidação diária é carregada uma única vez, na abertura que cria
+        # a tabela, a partir do histórico de atribuições; depois disso cada
+        # captura a mantém. Se esta carga for interrompida, a próxima captura
+        # consolida o histórico inteiro e, até lá, o painel conta na tabela
+        # processos (usuarios.metricas).
+        if _criar_metricas_diarias in aplicadas:
+            self.atualizar_metricas_diarias()
+
+    def _atribuicoes_existentes(self, numeros):
+        """
+        Retorna {processo_numero: ((email, caixa, tecnico), concluido)} para
+        os números informados que já estão no banco.
+        """
+        existentes = {}
+        numeros = list(numeros)
+        for i in range(0, len(numeros), TAMANHO_LOTE_CONSULTA):
+            lote = numeros[i:i + TAMANHO_LOTE_CONSULTA]
+            marcadores = ",".join("?" * len(lote))
+            self.cursor.execute(f"""
+                SELECT processo_numero, email, caixa, tecnico, COALESCE(concluido, 0)
+                FROM processos
+                WHERE processo_numero IN ({marcadores})
+            """, lote)
+            for numero, email, caixa, tecnico, concluido in self.cursor.fetchall():
+                existentes[numero] = ((email, caixa, tecnico), bool(concluido))
+        return existentes
 
     def inserir_ou_atualizar(self, processos):
         """
-        Insere ou atualiza processos na tabela.
+        Insere ou atualiza processos na tabela em uma única transação.
         processos deve ser uma lista de dicionários:
         {
             "processo_numero": str,
@@ -59,58 +327,491 @@ class GerenciadorDB:
             "caixa": str,
             "tecnico": str
         }
+
+        Só são gravados os processos novos, os que mudaram de atribuição e os
+        que voltaram à listagem depois de concluídos (reabertos); os demais não
+        são regravados (data e hora ficam as da última mudança).
+
+        Returns:
+            dict: {"inseridos": int, "atualizados": int, "inalterados": int}.
+            "atualizados" conta os processos cuja atribuição (email, caixa ou
+            técnico) mudou e os reabertos.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            for proc in processos:
-                cursor.execute("""
-                    INSERT INTO processos (processo_numero, email, data, hora, caixa, tecnico)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(processo_numero) DO UPDATE SET
-                        email=excluded.email,
-                        data=excluded.data,
-                        hora=excluded.hora,
-                        caixa=excluded.caixa,
-                        tecnico=excluded.tecnico
-                """, (
-                    proc["processo_numero"],
-                    proc.get("email"),
-                    proc.get("data"),
-                    proc.get("hora"),
-                    proc.get("caixa"),
-                    proc.get("tecnico")
-                ))
-            conn.commit()
-
-    def marcar_concluidos(self, processos_atuais):
+        with self.conn:
+            return self._gravar_processos(processos)
+
+    def _gravar_processos(self, processos, captura_id=None):
+        """
+        Grava os processos novos ou com atribuição diferente da do banco,
+        mantém o histórico em "atribuicoes" e, com captura_id, registra cada um
+        em "alteracoes". Deve rodar dentro de uma transação aberta.
+        """
+        resumo = {"inseridos": 0, "atualizados": 0, "inalterados": 0}
+        if not processos:
+            return resumo
+
+        linhas = [(
+            proc["processo_numero"],
+            proc.get("email"),
+            proc.get("data"),
+            proc.get("hora"),
+            proc.get("caixa"),
+            proc.get("tecnico")
+        ) for proc in processos]
+
+        existentes = self._atribuicoes_existentes(linha[0] for linha in linhas)
+        vistos = set()
+        gravar = []
+        alteracoes = []
+        agora = datetime.now().strftime(FORMATO_DATA_HORA)
+        for linha in linhas:
+            numero, email, _, _, caixa, tecnico = linha
+            if numero in vistos:
+                continue
+            vistos.add(numero)
+            if numero not in existentes:
+                resumo["inseridos"] += 1
+                alteracoes.append((captura_id, numero, "atribuido", None, None, email, tecnico, agora))
+                gravar.append(linha)
+                continue
+
+            atribuicao, concluido = existentes[numero]
+            email_anterior, _, tecnico_anterior = atribuicao
+            if concluido:
+                # Voltou à caixa depois de concluído: reabre com a atribuição atual
+                resumo["atualizados"] += 1
+                alteracoes.append((captura_id, numero, "reaberto",
+                                   email_anterior, tecnico_anterior, email, tecnico, agora))
+            elif atribuicao != (email, caixa, tecnico):
+                resumo["atualizados"] += 1
+                alteracoes.append((captura_id, numero, "reatribuido",
+                                   email_anterior, tecnico_anterior, email, tecnico, agora))
+            else:
+                resumo["inalterados"] += 1
+                continue
+            gravar.append(linha)
+
+        if not gravar:
+            return resumo
+
+        if captura_id is not None:
+            self.cursor.executemany("""
+                INSERT INTO alteracoes (captura_id, processo_numero, tipo, email_anterior,
+                                        tecnico_anterior, email, tecnico, registrada_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, alteracoes)
+
+        # Histórico: fecha a atribuição anterior dos reatribuídos e abre a nova.
+        # A dos reabertos já foi fechada como concluída; o UPDATE só os inclui
+        # para nunca deixar dois intervalos abertos para o mesmo processo.
+        self.cursor.executemany("""
+            UPDATE atribuicoes SET fim = ?
+            WHERE processo_numero = ? AND fim IS NULL
+        """, [(agora, alteracao[1]) for alteracao in alteracoes if alteracao[2] in ("reatribuido", "reaberto")])
+        self.cursor.executemany("""
+            INSERT INTO atribuicoes (processo_numero, email, tecnico, caixa, inicio)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(numero, email, tecnico, caixa, agora) for numero, email, _, _, caixa, tecnico in gravar])
+
+        self.cursor.executemany("""
+            INSERT INTO processos (processo_numero, email, data, hora, caixa, tecnico)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(processo_numero) DO UPDATE SET
+                email=excluded.email,
+                data=excluded.data,
+                hora=excluded.hora,
+                caixa=excluded.caixa,
+                tecnico=excluded.tecnico,
+                concluido=0,
+                data_conclusao=NULL
+        """, gravar)
+
+        return resumo
+
+    def marcar_concluidos(self, processos_atuais, captura_id=None):
         """
         Marca como concluídos os processos que estão no banco
         mas não apareceram na coleta atual.
         processos_atuais deve ser uma lista de números de processo (strings).
+        Com captura_id, cada processo fechado entra em "alteracoes" como 'sumiu'.
+
+        O retrato da coleta é carregado numa tabela temporária e os processos
+        que sumiram são fechados com um único UPDATE, tudo na mesma transação.
+        Só deve ser chamado depois que todas as páginas da caixa foram gravadas;
+        um retrato vazio é recusado para que uma coleta que falhou antes de ler
+        a tabela não conclua o estoque inteiro.
+
+        Returns:
+            int: quantidade de processos marcados como concluídos.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Pega todos os processos ainda não concluídos
-            cursor.execute("SELECT processo_numero FROM processos WHERE data_conclusao is NULL")
-            processos_no_banco = {row[0] for row in cursor.fetchall()}
+        numeros = {(numero,) for numero in processos_atuais}
+        if not numeros:
+            logging.warning("Coleta sem processos; nenhum processo será marcado como concluído.")
+            return 0
+
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with self.conn:
+            self.cursor.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS coleta_atual (
+                    processo_numero TEXT PRIMARY KEY
+                )
+            """)
+            self.cursor.execute("DELETE FROM coleta_atual")
+            self.cursor.executemany("INSERT INTO coleta_atual (processo_numero) VALUES (?)", numeros)
 
-            # Processos que sumiram
-            processos_para_concluir = processos_no_banco - set(processos_atuais)
+            # Fecha no histórico a atribuição aberta dos processos que sumiram
+            self.cursor.execute("""
+                UPDATE atribuicoes
+                SET fim = ?, concluido = 1
+                WHERE fim IS NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM coleta_atual c
+                      WHERE c.processo_numero = atribuicoes.processo_numero
+                  )
+            """, (agora,))
 
-            agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if captura_id is not None:
+                self.cursor.execute("""
+                    INSERT INTO alteracoes (captura_id, processo_numero, tipo, email_anterior,
+                                            tecnico_anterior, registrada_em)
+                    SELECT ?, processo_numero, 'sumiu', email, tecnico, ?
+                    FROM processos
+                    WHERE data_conclusao IS NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM coleta_atual c
+                          WHERE c.processo_numero = processos.processo_numero
+                      )
+                """, (captura_id, agora))
 
-            for proc in processos_para_concluir:
-                cursor.execute("""
-                    UPDATE processos
-                    SET concluido = 1,
+            self.cursor.execute("""
+                UPDATE processos
+                SET concluido = 1,
                     data_conclusao = ?
-                    WHERE processo_numero = ?
-                """, (agora, proc,))
+                WHERE data_conclusao IS NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM coleta_atual c
+                      WHERE c.processo_numero = processos.processo_numero
+                  )
+            """, (agora,))
+            marcados = self.cursor.rowcount
+
+            self.cursor.execute("DELETE FROM coleta_atual")
+
+        logging.info(f"Número de processos marcados como concluídos: {marcados}")
+        return marcados
+
+    def iniciar_captura(self, motor):
+        """
+        Abre uma captura ou retoma a última que foi interrompida.
+
+        Uma captura 'em_andamento' atualizada há menos de HORAS_RETOMADA_CAPTURA
+        é retomada; as mais antigas são marcadas como 'abandonada' e uma nova
+        captura é criada.
+
+        Returns:
+            tuple: (captura_id, checkpoint), onde checkpoint é None numa captura
+            nova ou {"pagina": int, "impressao": str} com a última página gravada.
+        """
+        agora = datetime.now()
+        limite = (agora - timedelta(hours=HORAS_RETOMADA_CAPTURA)).strftime(FORMATO_DATA_HORA)
+
+        with self.conn:
+            self.cursor.execute("""
+                UPDATE capturas SET status = 'abandonada'
+                WHERE status = 'em_andamento' AND atualizada_em < ?
+            """, (limite,))
+
+            self.cursor.execute("""
+                SELECT c.id, p.pagina, p.impressao
+                FROM capturas c
+                LEFT JOIN captura_paginas p
+                  ON p.captura_id = c.id
+                 AND p.pagina = (SELECT MAX(pagina) FROM captura_paginas WHERE captura_id = c.id)
+                WHERE c.status = 'em_andamento'
+                ORDER BY c.id DESC
+                LIMIT 1
+            """)
+            pendente = self.cursor.fetchone()
+
+            if pendente is not None:
+                captura_id, pagina, impressao = pendente
+                self.cursor.execute("""
+                    UPDATE capturas SET tentativas = tentativas + 1, atualizada_em = ?
+                    WHERE id = ?
+                """, (agora.strftime(FORMATO_DATA_HORA), captura_id))
+                if pagina is not None:
+                    logging.info(f"Retomando a captura {captura_id} a partir da página {pagina + 1}.")
+                    return captura_id, {"pagina": pagina, "impressao": impressao}
+                return captura_id, None
+
+            self.cursor.execute("""
+                INSERT INTO capturas (motor, iniciada_em, atualizada_em)
+                VALUES (?, ?, ?)
+            """, (motor, agora.strftime(FORMATO_DATA_HORA), agora.strftime(FORMATO_DATA_HORA)))
+            captura_id = self.cursor.lastrowid
+
+            # Mudanças já gravadas por capturas abandonadas passam para a nova,
+            # que não as verá de novo (os processos já estão atualizados)
+            self.cursor.execute("""
+                UPDATE alteracoes SET captura_id = ?
+                WHERE captura_id IN (SELECT id FROM capturas WHERE status = 'abandonada')
+            """, (captura_id,))
+            return captura_id, None
+
+    def gravar_pagina(self, captura_id, pagina, processos):
+        """
+        Grava os processos de uma página e o checkpoint dela na mesma transação:
+        se o checkpoint existe, os processos da página também estão no banco.
+
+        Se a captura anterior foi concluída e a impressão das atribuições da
+        página é igual à da mesma página nela, nada mudou e os processos nem
+        são consultados; caso contrário só os processos novos ou reatribuídos
+        são gravados.
+
+        Args:
+            captura_id: Captura aberta por iniciar_captura
+            pagina: Índice da página na listagem (a primeira é 0)
+            processos: Registros da página (ver inserir_ou_atualizar)
+
+        Returns:
+            dict: o mesmo resumo de inserir_ou_atualizar
+        """
+        agora = datetime.now().strftime(FORMATO_DATA_HORA)
+        numeros = [p["processo_numero"] for p in processos]
+        atribuicoes = impressao_atribuicoes(processos)
+
+        with self.conn:
+            # A referência é a captura imediatamente anterior, e só se ela foi
+            # concluída: uma captura abandonada ou que falhou depois da última
+            # concluída pode ter gravado atribuições que a listagem já desfez
+            self.cursor.execute("""
+                SELECT p.impressao_atribuicoes
+                FROM capturas c
+                JOIN captura_paginas p ON p.captura_id = c.id AND p.pagina = ?
+                WHERE c.id = (SELECT MAX(id) FROM capturas WHERE id < ?)
+                  AND c.status = 'concluida'
+            """, (pagina, captura_id))
+            anterior = self.cursor.fetchone()
+
+            if anterior is not None and anterior[0] == atribuicoes:
+                resumo = {"inseridos": 0, "atualizados": 0, "inalterados": len(set(numeros))}
+            else:
+                resumo = self._gravar_processos(processos, captura_id)
+
+            self.cursor.execute("""
+                INSERT OR REPLACE INTO captura_paginas
+                    (captura_id, pagina, linhas, impressao, impressao_atribuicoes, processos, gravada_em)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (captura_id, pagina, len(numeros), impressao_pagina(processos), atribuicoes,
+                  json.dumps(numeros), agora))
+            self.cursor.execute("""
+                UPDATE capturas
+                SET atualizada_em = ?,
+                    paginas = (SELECT COUNT(*) FROM captura_paginas WHERE captura_id = ?),
+                    processos = (SELECT COALESCE(SUM(linhas), 0) FROM captura_paginas WHERE captura_id = ?)
+                WHERE id = ?
+            """, (agora, captura_id, captura_id, captura_id))
+
+        return resumo
+
+    def registrar_falha_captura(self, captura_id, erro):
+        """Guarda o erro; a captura continua 'em_andamento' para ser retomada."""
+        with self.conn:
+            self.cursor.execute("""
+                UPDATE capturas SET ultimo_erro = ?, atualizada_em = ?
+                WHERE id = ?
+            """, (str(erro)[:500], datetime.now().strftime(FORMATO_DATA_HORA), captura_id))
+
+    def abandonar_captura(self, captura_id):
+        """Descarta uma captura cujos checkpoints não valem mais (a listagem mudou)."""
+        with self.conn:
+            self.cursor.execute("UPDATE capturas SET status = 'abandonada' WHERE id = ?", (captura_id,))
+            self.cursor.execute("DELETE FROM captura_paginas WHERE captura_id = ?", (captura_id,))
+
+    def finalizar_captura(self, captura_id):
+        """
+        Fecha a captura depois que todas as páginas foram gravadas: marca como
+        concluídos os processos ausentes de todos os checkpoints dela e apaga
+        os checkpoints das capturas anteriores. Os desta captura ficam como
+        referência para a detecção de mudanças da próxima.
+
+        Returns:
+            int: quantidade de processos marcados como concluídos.
+        """
+        self.cursor.execute("""
+            SELECT j.value
+            FROM captura_paginas p, json_each(p.processos) j
+            WHERE p.captura_id = ?
+        """, (captura_id,))
+        numeros = [linha[0] for linha in self.cursor.fetchall()]
+
+        with etapa('marcar_concluidos'):
+            marcados = self.marcar_concluidos(numeros, captura_id)
+
+        with self.conn:
+            self.cursor.execute("""
+                UPDATE capturas
+                SET status = 'concluida', finalizada_em = ?, concluidos = ?, ultimo_erro = NULL
+                WHERE id = ?
+            """, (datetime.now().strftime(FORMATO_DATA_HORA), marcados, captura_id))
+            self.cursor.execute("DELETE FROM captura_paginas WHERE captura_id < ?", (captura_id,))
+
+        resumo = self.resumo_alteracoes(captura_id)
+        logging.info(f"Mudanças da captura {captura_id}: {resumo['atribuido']} atribuídos, "
+                     f"{resumo['reatribuido']} reatribuídos, {resumo['reaberto']} reabertos, "
+                     f"{resumo['sumiu']} sumiram.")
+
+        with etapa('metricas_diarias'):
+            self.atualizar_metricas_diarias()
+        return marcados
+
+    def atualizar_metricas_diarias(self, ate=None):
+        """
+        Recalcula "metricas_diarias" do último dia consolidado (que pode ter
+        ficado parcial) até `ate` (hoje por padrão). Na primeira execução
+        consolida todo o histórico de "atribuicoes".
+
+        Returns:
+            int: quantidade de linhas (caixa, técnico, dia) gravadas.
+        """
+        ate = _texto_data(ate or datetime.now().date())
+        with self.conn:
+            inicio = self.cursor.execute("SELECT MAX(dia) FROM metricas_diarias").fetchone()[0]
+            if inicio is None:
+                # Datas válidas começam por dígito; descarta inícios vazios da carga inicial
+                inicio = self.cursor.execute("""
+                    SELECT substr(MIN(inicio), 1, 10) FROM atribuicoes WHERE inicio >= '0'
+                """).fetchone()[0]
+            if inicio is None or inicio > ate:
+                return 0
+
+            self.cursor.execute("DELETE FROM metricas_diarias WHERE dia >= ? AND dia <= ?", (inicio, ate))
+            self.cursor.execute("""
+                WITH RECURSIVE abertas(tecnico, email, dia, ultimo) AS (
+                    -- Cada atribuição gera só os dias do período em que estava
+                    -- aberta no fim do dia: de max(início, :inicio) até a véspera
+                    -- do fim, ou até :ate se ainda estiver aberta
+                    SELECT tecnico, email, MAX(substr(inicio, 1, 10), :inicio),
+                           CASE WHEN fim IS NULL OR fim >= date(:ate, '+1 day') THEN :ate
+                                ELSE date(fim, '-1 day') END
+                    FROM atribuicoes
+                    WHERE inicio < date(:ate, '+1 day')
+                      AND (fim IS NULL OR fim >= date(:inicio, '+1 day'))
+                    UNION ALL
+                    SELECT tecnico, email, date(dia, '+1 day'), ultimo
+                    FROM abertas
+                    WHERE dia < ultimo
+                )
+                INSERT INTO metricas_diarias (caixa, tecnico, email, dia, concluidos, atribuidos, estoque)
+                SELECT :caixa, tecnico, email, dia, SUM(concluidos), SUM(atribuidos), SUM(estoque)
+                FROM (
+                    SELECT tecnico, email, substr(fim, 1, 10) AS dia,
+                           1 AS concluidos, 0 AS atribuidos, 0 AS estoque
+                    FROM atribuicoes
+                    WHERE concluido = 1 AND fim >= :inicio AND fim < date(:ate, '+1 day')
+                    UNION ALL
+                    SELECT tecnico, email, substr(inicio, 1, 10), 0, 1, 0
+                    FROM atribuicoes
+                    WHERE inicio >= :inicio AND inicio < date(:ate, '+1 day')
+                    UNION ALL
+                    SELECT tecnico, email, dia, 0, 0, 1
+                    FROM abertas
+                    WHERE dia <= ultimo
+                )
+                WHERE tecnico IS NOT NULL AND email IS NOT NULL
+                GROUP BY tecnico, email, dia
+            """, {"inicio": inicio, "ate": ate, "caixa": self.unidade})
+            # rowcount não é preenchido para INSERT precedido de WITH
+            gravadas = self.cursor.execute("SELECT changes()").fetchone()[0]
+
+        logging.info(f"Métricas diárias de {inicio} a {ate} consolidadas ({gravadas} linhas).")
+        return gravadas
+
+    def resumo_alteracoes(self, captura_id):
+        """Retorna {"atribuido": int, "reatribuido": int, "reaberto": int, "sumiu": int} da captura."""
+        resumo = {"atribuido": 0, "reatribuido": 0, "reaberto": 0, "sumiu": 0}
+        self.cursor.execute("""
+            SELECT tipo, COUNT(*) FROM alteracoes
+            WHERE captura_id = ?
+            GROUP BY tipo
+        """, (captura_id,))
+        resumo.update(dict(self.cursor.fetchall()))
+        return resumo
+
+    def alteracoes_da_captura(self, captura_id, tipo=None):
+        """
+        Conjunto de mudanças de uma captura, na ordem em que foram detectadas.
+
+        Returns:
+            list: dicionários com processo_numero, tipo ('atribuido',
+            'reatribuido', 'reaberto' ou 'sumiu'), email_anterior, tecnico_anterior,
+            email, tecnico e registrada_em.
+        """
+        consulta = """
+            SELECT processo_numero, tipo, email_anterior, tecnico_anterior, email, tecnico, registrada_em
+            FROM alteracoes
+            WHERE captura_id = ?
+        """
+        parametros = [captura_id]
+        if tipo is not None:
+            consulta += " AND tipo = ?"
+            parametros.append(tipo)
+        self.cursor.execute(consulta + " ORDER BY id", parametros)
+        colunas = [descricao[0] for descricao in self.cursor.description]
+        return [dict(zip(colunas, linha)) for linha in self.cursor.fetchall()]
+
+    def concluidos_no_periodo(self, inicio, fim, tecnico=None, emails=None):
+        """
+        Conta os processos concluídos entre inicio (inclusive) e fim
+        (exclusive), creditando a quem tinha a atribuição na conclusão.
+
+        Args:
+            inicio, fim: date, datetime ou texto 'AAAA-MM-DD[ HH:MM:SS]'
+            tecnico: Conta só os concluídos por este técnico
+            emails: Conta só os concluídos por estes e-mails (responsáveis)
+
+        Returns:
+            int
+        """
+        consulta = """
+            SELECT COUNT(*) FROM atribuicoes
+            WHERE concluido = 1 AND fim >= ? AND fim < ?
+        """
+        parametros = [_texto_data(inicio), _texto_data(fim)]
+        if tecnico is not None:
+            consulta += " AND tecnico = ?"
+            parametros.append(tecnico)
+        if emails is not None:
+            emails = list(emails)
+            if not emails:
+                return 0
+            consulta += f" AND email IN ({','.join('?' * len(emails))})"
+            parametros += emails
+        return self.cursor.execute(consulta, parametros).fetchone()[0]
+
+    def concluidos_por_tecnico_no_periodo(self, inicio, fim):
+        """Retorna {tecnico: concluídos entre inicio e fim} (ver concluidos_no_periodo)."""
+        self.cursor.execute("""
+            SELECT tecnico, COUNT(*) FROM atribuicoes
+            WHERE concluido = 1 AND fim >= ? AND fim < ?
+            GROUP BY tecnico
+        """, (_texto_data(inicio), _texto_data(fim)))
+        return dict(self.cursor.fetchall())
 
-            conn.commit()
-            print(f"Número de processos marcados como concluídos: {len(processos_para_concluir)}")
+    def historico_processo(self, processo_numero):
+        """Atribuições de um processo em ordem cronológica (dicionários com email, tecnico, inicio, fim, concluido)."""
+        self.cursor.execute("""
+            SELECT email, tecnico, caixa, inicio, fim, concluido
+            FROM atribuicoes
+            WHERE processo_numero = ?
+            ORDER BY inicio, id
+        """, (processo_numero,))
+        colunas = [descricao[0] for descricao in self.cursor.description]
+        return [dict(zip(colunas, linha)) for linha in self.cursor.fetchall()]
 
     def fechar(self):
         if self.conn:
             self.conn.commit()
-            self.conn.close()
\ No newline at end of file
+            self.conn.close()
+            self.conn = None
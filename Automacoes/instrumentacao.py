@@ -0,0 +1,366 @@
+"""
+Instrumentação do WebDriver para descobrir onde vai o tempo das automações
+no SEI. Com a instrumentação ativa são medidos:
+
+- cada comando enviado ao navegador (findElement, clickElement, get...),
+  nos drivers passados a instrumentar_driver();
+- cada WebDriverWait.until/until_not, com o nome da condição esperada;
+- cada time.sleep do SEI_Geral e do ritmo (onde fica a espera do
+  governador de requisições);
+- cada nova tentativa do iframe_retry_decorator, com o intervalo até ela.
+
+Cada medição é atribuída à pilha de métodos dos page objects do SEI_Geral
+que a originou (ex.: IframesSei.navegar_iframes_sei), e cada método ganha
+um intervalo próprio, do início do primeiro ao fim do último comando que
+emitiu. O resultado é exportado em dois arquivos:
+
+- .json: eventos no formato do Chrome (chrome://tracing, Perfetto, speedscope);
+- .folded: pilhas dobradas com o tempo próprio em microssegundos
+  (flamegraph.pl, speedscope).
+
+Uso:
+    with instrumentacao() as gravador:
+        instrumentar_driver(driver)
+        ...
+    # grava Automacoes/traces/selenium_<data>.json e .folded
+
+No orquestrador a instrumentação é ligada com INSTRUMENTAR_SELENIUM=1 no .env.
+
+Alcance: enquanto a instrumentação está ativa, WebDriverWait.until/until_not,
+o _before_retry do SEI_Geral e o módulo time do SEI_Geral e do ritmo são
+substituídos no processo inteiro, em todas as threads. Para não misturar no
+trace o que não foi pedido, as esperas só são medidas em drivers passados a
+instrumentar_driver(), e os sleeps e retentativas só nas threads que já
+enviaram algum comando por um driver instrumentado. Nas demais, as funções
+substituídas apenas repassam a chamada à original.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+from selenium.webdriver.support.wait import WebDriverWait
+
+from . import SEI_Geral, ritmo
+from .comandos_driver import ORDEM_INSTRUMENTACAO, interceptar_comandos
+
+DIRETORIO_TRACES = Path(__file__).resolve().parent / "traces"
+
+# Módulos cujo `time.sleep` é medido enquanto a instrumentação está ativa
+MODULOS_SLEEP = (SEI_Geral, ritmo)
+
+_ativa = None
+_lock = threading.Lock()
+
+
+def instrumentacao_ativa():
+    return _ativa
+
+
+class _EstadoThread:
+    """Medições em aberto e métodos de page objects ativos de uma thread."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.abertas = []   # [nome, tempo dos filhos]
+        self.metodos = []   # [frame, rótulo, início, fim]
+
+
+class _TempoInstrumentado:
+    """Substitui o módulo time nos módulos instrumentados, medindo o sleep."""
+
+    def __init__(self, gravador):
+        self._gravador = gravador
+
+    def __getattr__(self, nome):
+        return getattr(time, nome)
+
+    def sleep(self, segundos):
+        if not self._gravador.acompanha_thread():
+            return time.sleep(segundos)
+        with self._gravador.medir("sleep", "pausa", segundos=segundos):
+            time.sleep(segundos)
+
+
+def _nome_condicao(condicao):
+    """Nome da condição esperada (ex.: element_to_be_clickable)."""
+    nome = getattr(condicao, "__qualname__", None) or type(condicao).__name__
+    return nome.split(".<locals>")[0]
+
+
+class GravadorWebDriver:
+    """
+    Acumula as medições de todas as threads. Os intervalos são medidos com
+    time.perf_counter() e exportados relativos ao início da gravação.
+    """
+
+    def __init__(self, modulos=None):
+        self.modulos = set(modulos or (SEI_Geral.__name__,))
+        self.inicio = time.perf_counter()
+        self.iniciada_em = datetime.now()
+        self.eventos = []
+        self.pilhas = {}
+        self._estados = {}
+        self._threads_comandos = set()
+        self._lock = threading.Lock()
+
+    def acompanha_thread(self):
+        """Indica se a thread atual já enviou algum comando por um driver instrumentado."""
+        return threading.get_ident() in self._threads_comandos
+
+    def _estado(self):
+        tid = threading.get_ident()
+        estado = self._estados.get(tid)
+        if estado is None:
+            with self._lock:
+                estado = self._estados[tid] = _EstadoThread(threading.current_thread().name)
+        return estado
+
+    def _pilha_metodos(self):
+        """Métodos dos page objects na pilha de chamadas, do mais externo ao mais interno."""
+        pilha = []
+        frame = sys._getframe(1)
+        while frame is not None:
+            codigo = frame.f_code
+            # Funções internas (ex.: o wrapper do iframe_retry_decorator) não são page objects
+            if frame.f_globals.get("__name__") in self.modulos and "<locals>" not in codigo.co_qualname:
+                pilha.append((frame, codigo.co_qualname))
+            frame = frame.f_back
+        pilha.reverse()
+        return pilha
+
+    def _sincronizar_metodos(self, tid, estado, pilha, agora):
+        """Fecha os métodos que já retornaram e abre os que apareceram na pilha."""
+        comum = 0
+        for (frame, _), aberto in zip(pilha, estado.metodos):
+            if frame is not aberto[0]:
+                break
+            comum += 1
+        for _, rotulo, inicio, fim in reversed(estado.metodos[comum:]):
+            self._evento(tid, rotulo, "metodo", inicio, fim - inicio)
+        del estado.metodos[comum:]
+        for frame, rotulo in pilha[comum:]:
+            estado.metodos.append([frame, rotulo, agora, agora])
+
+    def _evento(self, tid, nome, categoria, inicio, duracao, args=None):
+        evento = {
+            "name": nome,
+            "cat": categoria,
+            "ph": "X",
+            "ts": round((inicio - self.inicio) * 1e6, 1),
+            "dur": round(duracao * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": tid,
+        }
+        if args:
+            evento["args"] = args
+        with self._lock:
+            self.eventos.append(evento)
+
+    def _acumular(self, caminho, segundos):
+        chave = ";".join(caminho)
+        with self._lock:
+            self.pilhas[chave] = self.pilhas.get(chave, 0.0) + max(0.0, segundos)
+
+    @contextmanager
+    def medir(self, nome, categoria, **args):
+        """Mede o bloco como uma chamada ao navegador, espera ou pausa."""
+        tid = threading.get_ident()
+        estado = self._estado()
+        inicio = time.perf_counter()
+        pilha = self._pilha_metodos()
+        self._sincronizar_metodos(tid, estado, pilha, inicio)
+        aberta = [nome, 0.0]
+        estado.abertas.append(aberta)
+        try:
+            yield
+        finally:
+            fim = time.perf_counter()
+            duracao = fim - inicio
+            estado.abertas.pop()
+            caminho = [rotulo for _, rotulo in pilha] + [pai for pai, _ in estado.abertas] + [nome]
+            if estado.abertas:
+                estado.abertas[-1][1] += duracao
+            for metodo in estado.metodos:
+                metodo[3] = fim
+            self._evento(tid, nome, categoria, inicio, duracao, args)
+            self._acumular(caminho, duracao - aberta[1])
+
+    def registrar_retentativa(self, metodo, tentativa, espera):
+        """Registra a nova tentativa de `metodo` e o intervalo até ela."""
+        tid = threading.get_ident()
+        estado = self._estado()
+        inicio = time.perf_counter()
+        pilha = self._pilha_metodos()
+        self._sincronizar_metodos(tid, estado, pilha, inicio)
+        nome = f"retentativa:{metodo}"
+        self._evento(tid, nome, "retentativa", inicio, espera, {"tentativa": tentativa})
+        self._acumular([rotulo for _, rotulo in pilha] + [nome], espera)
+
+    def _fechar_metodos(self):
+        for tid, estado in list(self._estados.items()):
+            self._sincronizar_metodos(tid, estado, [], time.perf_counter())
+
+    def trace(self):
+        """Eventos no formato do Chrome (Trace Event Format)."""
+        self._fechar_metodos()
+        nomes_threads = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": estado.nome}}
+            for tid, estado in self._estados.items()
+        ]
+        return {"traceEvents": nomes_threads + sorted(self.eventos, key=lambda e: e["ts"]),
+                "displayTimeUnit": "ms"}
+
+    def pilhas_dobradas(self):
+        """Linhas `metodo;metodo;comando microssegundos` para flame graphs."""
+        return [f"{pilha} {round(segundos * 1e6)}"
+                for pilha, segundos in sorted(self.pilhas.items()) if segundos > 0]
+
+    def resumo(self, limite=10):
+        """As pilhas com mais tempo próprio, em segundos."""
+        return sorted(self.pilhas.items(), key=lambda item: -item[1])[:limite]
+
+    def exportar(self, destino=None):
+        """
+        Grava o trace (.json) e as pilhas dobradas (.folded).
+
+        Args:
+            destino: caminho sem extensão; por padrão traces/selenium_<data>.
+
+        Returns:
+            tuple: (caminho do .json, caminho do .folded)
+        """
+        if destino is None:
+            destino = DIRETORIO_TRACES / f"selenium_{self.iniciada_em:%Y%m%d_%H%M%S}"
+        destino = Path(destino)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+
+        caminho_trace = destino.with_suffix(".json")
+        caminho_pilhas = destino.with_suffix(".folded")
+        with open(caminho_trace, "w", encoding="utf-8") as arquivo:
+            json.dump(self.trace(), arquivo, ensure_ascii=False)
+        with open(caminho_pilhas, "w", encoding="utf-8") as arquivo:
+            arquivo.write("\n".join(self.pilhas_dobradas()) + "\n")
+        return caminho_trace, caminho_pilhas
+
+
+def _medir_comando(comando, params, prosseguir):
+    gravador = _ativa
+    if gravador is None:
+        return prosseguir(comando, params)
+    gravador._threads_comandos.add(threading.get_ident())
+    args = {chave: str(params[chave])[:200] for chave in ("using", "value", "url") if params and chave in params}
+    with gravador.medir(comando, "comando", **args):
+        return prosseguir(comando, params)
+
+
+def instrumentar_driver(driver):
+    """
+    Mede os comandos do driver enquanto houver instrumentação ativa. Todos os
+    comandos, inclusive os dos WebElements, passam pelo driver.execute; fora
+    da instrumentação o custo é uma verificação por comando.
+
+    O interceptador fica na posição ORDEM_INSTRUMENTACAO da cadeia do driver
+    (comandos_driver), depois do GerenciadorFrames, seja qual for a ordem em
+    que os dois forem instalados: só são medidos os comandos que chegam ao
+    navegador, não as trocas de frame puladas.
+    """
+    interceptar_comandos(driver, "instrumentacao", _medir_comando, ORDEM_INSTRUMENTACAO)
+    return driver
+
+
+def _driver_instrumentado(driver):
+    # WebDriverWait também aceita um WebElement, cujo driver fica em .parent
+    driver = getattr(driver, "parent", driver)
+    return any(nome == "instrumentacao" for _, nome, _ in getattr(driver, "_interceptadores", ()))
+
+
+def _aplicar(gravador):
+    """Instala as medições de espera, sleep e retentativa; retorna o necessário para desfazê-las."""
+    originais = {
+        "until": WebDriverWait.until,
+        "until_not": WebDriverWait.until_not,
+        "before_retry": SEI_Geral._before_retry,
+        "time": [(modulo, modulo.time) for modulo in MODULOS_SLEEP],
+    }
+
+    def until(self, method, message=""):
+        if not _driver_instrumentado(self._driver):
+            return originais["until"](self, method, message)
+        with gravador.medir(f"until:{_nome_condicao(method)}", "espera", timeout=self._timeout):
+            return originais["until"](self, method, message)
+
+    def until_not(self, method, message=""):
+        if not _driver_instrumentado(self._driver):
+            return originais["until_not"](self, method, message)
+        with gravador.medir(f"until_not:{_nome_condicao(method)}", "espera", timeout=self._timeout):
+            return originais["until_not"](self, method, message)
+
+    def before_retry(retry_state, method_name):
+        if gravador.acompanha_thread():
+            gravador.registrar_retentativa(method_name, retry_state.attempt_number, retry_state.next_action.sleep)
+        return originais["before_retry"](retry_state, method_name)
+
+    WebDriverWait.until = until
+    WebDriverWait.until_not = until_not
+    SEI_Geral._before_retry = before_retry
+    tempo = _TempoInstrumentado(gravador)
+    for modulo in MODULOS_SLEEP:
+        modulo.time = tempo
+    return originais
+
+
+def _desfazer(originais):
+    WebDriverWait.until = originais["until"]
+    WebDriverWait.until_not = originais["until_not"]
+    SEI_Geral._before_retry = originais["before_retry"]
+    for modulo, original in originais["time"]:
+        modulo.time = original
+
+
+@contextmanager
+def instrumentacao(destino=None, exportar=True):
+    """
+    Ativa a instrumentação enquanto durar o bloco e exporta o resultado ao
+    sair. Se já houver uma instrumentação ativa, o bloco usa a mesma.
+    """
+    global _ativa
+    with _lock:
+        if _ativa is not None:
+            aninhada = True
+            gravador = _ativa
+        else:
+            aninhada = False
+            gravador = _ativa = GravadorWebDriver()
+            originais = _aplicar(gravador)
+
+    if aninhada:
+        yield gravador
+        return
+
+    try:
+        yield gravador
+    finally:
+        with _lock:
+            _desfazer(originais)
+            _ativa = None
+        if exportar:
+            try:
+                caminho_trace, caminho_pilhas = gravador.exportar(destino)
+                logging.info(f"Instrumentação do Selenium gravada em {caminho_trace} e {caminho_pilhas}.")
+                for pilha, segundos in gravador.resumo(5):
+                    logging.info(f"  {segundos:8.2f}s  {pilha}")
+            except OSError as e:
+                logging.warning(f"Não foi possível gravar a instrumentação do Selenium: {e}")
+
+
+def instrumentacao_do_ambiente():
+    """instrumentacao() se INSTRUMENTAR_SELENIUM estiver ligado no .env; senão, nada."""
+    if os.getenv("INSTRUMENTAR_SELENIUM", "").strip().lower() in ("1", "true", "sim"):
+        return instrumentacao()
+    return nullcontext()
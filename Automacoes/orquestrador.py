@@ -0,0 +1,184 @@
+import logging
+import queue
+import threading
+import time
+
+from .db_processos import GerenciadorDB
+from .captura_processos import CapturaProcessos
+from .captura_http import CapturaProcessosHttp
+from .passivoteste import AutomacaoPassivo
+from .ritmo import estatisticas_governadores
+from .telemetria import execucao
+from .instrumentacao import instrumentacao_do_ambiente
+
+
+class OrquestradorCapturas:
+    """
+    Executa CapturaProcessos.capturar_caixa para várias unidades em paralelo.
+
+    Cada trabalhador abre um Chrome headless, faz login e fecha a tela de aviso
+    uma única vez, e depois consome a fila de unidades trocando de unidade na
+    mesma sessão (AutomacaoPassivo.trocar_unidade, que só refaz o login se a
+    sessão expirar). O número de navegadores simultâneos é limitado por
+    max_navegadores; com max_navegadores=1 as unidades são percorridas em
+    série com um único login.
+
+    Uma unidade cuja captura falha volta para a fila até TENTATIVAS_POR_UNIDADE
+    vezes; a nova tentativa retoma a captura do último checkpoint gravado
+    (GerenciadorDB.iniciar_captura).
+
+    O pacote não depende do Django: quem usa o painel passa ao_finalizar
+    (ex.: usuarios.metricas.invalidar_metricas), chamado a cada unidade
+    capturada por completo.
+    """
+
+    MOTORES_CAPTURA = ('selenium', 'http')
+    TENTATIVAS_POR_UNIDADE = 2
+
+    def __init__(self, usuario, senha, unidades, base_dir, max_navegadores=3, motor='selenium',
+                 ao_finalizar=None):
+        """
+        Args:
+            usuario: Nome de usuário do SEI
+            senha: Senha do usuário
+            unidades: Lista de unidades (caixas) a capturar
+            base_dir: Pasta onde ficam os bancos de cada unidade
+            max_navegadores: Quantidade máxima de navegadores abertos ao mesmo tempo
+            motor: 'selenium' lê a listagem pelo navegador; 'http' usa o navegador
+                   só para login e troca de unidade e lê a listagem por requests
+            ao_finalizar: Chamado com a unidade ao fim de cada captura completa
+        """
+        if motor not in self.MOTORES_CAPTURA:
+            raise ValueError(f"Motor de captura inválido: {motor}. Use um de {self.MOTORES_CAPTURA}.")
+        self.motor = motor
+        self.usuario = usuario
+        self.senha = senha
+        self.unidades = list(unidades)
+        self.base_dir = base_dir
+        self.ao_finalizar = ao_finalizar
+        self.max_navegadores = max(1, min(max_navegadores, len(self.unidades)))
+        self.resultados = {}
+        self._lock = threading.Lock()
+
+    def executar(self):
+        """
+        Captura todas as unidades e aguarda o fim dos trabalhadores.
+
+        Returns:
+            dict: {unidade: True se a captura terminou, False caso contrário}
+        """
+        if not self.unidades:
+            logging.warning("Nenhuma unidade informada para captura.")
+            return {}
+
+        fila = queue.Queue()
+        for unidade in self.unidades:
+            fila.put((unidade, 1))
+
+        inicio = time.monotonic()
+        logging.info(f"Iniciando captura de {len(self.unidades)} unidades com {self.max_navegadores} navegadores.")
+
+        trabalhadores = [
+            threading.Thread(target=self._trabalhador, args=(indice, fila), name=f"captura-{indice}")
+            for indice in range(self.max_navegadores)
+        ]
+        # Com INSTRUMENTAR_SELENIUM=1 grava um trace de todos os navegadores em Automacoes/traces
+        with instrumentacao_do_ambiente():
+            for trabalhador in trabalhadores:
+                trabalhador.start()
+            for trabalhador in trabalhadores:
+                trabalhador.join()
+
+        # Unidades que sobraram na fila (ex.: todos os logins falharam)
+        while not fila.empty():
+            self._registrar(fila.get_nowait()[0], False)
+
+        concluidas = sum(1 for ok in self.resultados.values() if ok)
+        logging.info(f"Captura de {concluidas}/{len(self.unidades)} unidades concluída em "
+                     f"{time.monotonic() - inicio:.0f}s.")
+        for estatisticas in estatisticas_governadores():
+            logging.info(f"Ritmo do SEI ({estatisticas['host']}): {estatisticas['acoes']} ações, "
+                         f"{estatisticas['acoes_limitadas']} limitadas, "
+                         f"{estatisticas['tempo_limitado']}s de espera.")
+        return self.resultados
+
+    def _registrar(self, unidade, sucesso):
+        with self._lock:
+            self.resultados[unidade] = sucesso
+
+    def _abrir_sessao(self, indice, unidade_inicial):
+        """Abre o navegador e faz login; retorna a AutomacaoPassivo ou None."""
+        # Cada trabalhador usa o seu slot de sessão salva: a unidade selecionada
+        # fica na sessão do servidor e não pode ser compartilhada entre navegadores
+        automacao = AutomacaoPassivo(usuario=self.usuario, senha=self.senha,
+                                     unidade=unidade_inicial, slot_sessao=indice)
+
+        if not automacao._inicializar_navegador():
+            logging.error("Erro ao iniciar navegador.")
+            return None
+
+        if not automacao._realizar_login():
+            logging.error("Erro no login.")
+            automacao.driver.quit()
+            return None
+
+        automacao._fechar_tela_aviso()
+        return automacao
+
+    def _trabalhador(self, indice, fila):
+        automacao = None
+        try:
+            while True:
+                try:
+                    unidade, tentativa = fila.get_nowait()
+                except queue.Empty:
+                    return
+
+                # A telemetria da unidade inclui a abertura da sessão quando ela
+                # acontece nesta captura (a primeira do trabalhador)
+                with execucao(unidade, self.motor) as telemetria:
+                    if automacao is None:
+                        automacao = self._abrir_sessao(indice, unidade)
+                        if automacao is None:
+                            telemetria.sucesso = False
+                            telemetria.erro = "Sem sessão no SEI"
+                            # Devolve a unidade para outro trabalhador tentar
+                            fila.put((unidade, tentativa))
+                            logging.error(f"Trabalhador {indice} encerrado sem sessão no SEI.")
+                            return
+
+                    sucesso = self._capturar_unidade(automacao, unidade)
+                    telemetria.sucesso = sucesso
+                if not sucesso and tentativa < self.TENTATIVAS_POR_UNIDADE:
+                    logging.warning(f"Captura da unidade {unidade} falhou; nova tentativa "
+                                    f"({tentativa + 1}/{self.TENTATIVAS_POR_UNIDADE}) retomará do último checkpoint.")
+                    fila.put((unidade, tentativa + 1))
+                    continue
+                self._registrar(unidade, sucesso)
+        finally:
+            if automacao is not None and automacao.driver:
+                try:
+                    automacao.driver.quit()
+                except Exception:
+                    pass
+
+    def _capturar_unidade(self, automacao, unidade):
+        """Seleciona a unidade na sessão já aberta e captura a sua caixa."""
+        db = None
+        try:
+            logging.info(f"Capturando unidade {unidade}.")
+            if not automacao.trocar_unidade(unidade):
+                return False
+
+            db = GerenciadorDB(base_dir=self.base_dir, unidade=unidade)
+            if self.motor == 'http':
+                captura = CapturaProcessosHttp.a_partir_do_driver(automacao.driver, db, self.ao_finalizar)
+            else:
+                captura = CapturaProcessos(automacao.driver, db, ao_finalizar=self.ao_finalizar)
+            return captura.capturar_caixa('técnicos')
+        except Exception as e:
+            logging.exception(f"Erro durante a captura da unidade {unidade}: {e}")
+            return False
+        finally:
+            if db is not None:
+                db.fechar()
@@ -8,8 +8,12 @@ from selenium.webdriver.common.alert import Alert
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
 
 from .SEI_Geral import LoginSei, TelaAviso, SelecaoUnidade, StatusLogin, PaginaMovimentacoes
+from .sessao_sei import SessaoSeiPersistida
+from .telemetria import etapa
+from .instrumentacao import instrumentar_driver
 
 import os
 
@@ -17,8 +21,11 @@ class AutomacaoPassivo:
     """
     Classe principal para automação do processo passivo no SEI
     """
+    # Link da barra superior com a sigla da unidade selecionada
+    SELETOR_UNIDADE_ATUAL = 'div.nav-item:nth-child(3) > div:nth-child(1) > a:nth-child(1)'
+    TIMEOUT_TROCA_UNIDADE = 15
     
-    def __init__(self, usuario, senha, unidade):
+    def __init__(self, usuario, senha, unidade, slot_sessao=0):
         """
         Inicializa a automação
         
@@ -26,6 +33,7 @@ class AutomacaoPassivo:
             usuario: Nome de usuário do SEI
             senha: Senha do usuário
             unidade: Nome da unidade a ser selecionada
+            slot_sessao: Sessão salva a reutilizar (uma por navegador simultâneo)
         """
         self.usuario = usuario
         self.senha = senha
@@ -34,6 +42,12 @@ class AutomacaoPassivo:
         self.login_sei = None
         self.tela_aviso = None
         self.selecao_unidade = None
+        self.sessao_restaurada = False
+
+        # Cookies da sessão salvos em disco; SESSAO_SEI_PERSISTIR=0 desativa
+        self.sessao_persistida = None
+        if os.getenv("SESSAO_SEI_PERSISTIR", "1") != "0":
+            self.sessao_persistida = SessaoSeiPersistida(usuario, senha, slot=slot_sessao)
         
         # Configurar logging
         self._configurar_logging()
@@ -49,6 +63,7 @@ class AutomacaoPassivo:
             ]
         )
     
+    @etapa('navegador')
     def _inicializar_navegador(self):
         """Inicializa o navegador Chrome"""
         try:
@@ -61,6 +76,7 @@ class AutomacaoPassivo:
             chrome_options.add_argument('--window-size=1920,1080')
             
             self.driver = webdriver.Chrome(options=chrome_options)
+            instrumentar_driver(self.driver)
             self.driver.maximize_window()
             
             logging.info('Navegador inicializado com sucesso.')
@@ -69,13 +85,19 @@ class AutomacaoPassivo:
             logging.error(f'Erro ao inicializar navegador: {e}')
             return False
     
+    @etapa('login')
     def _realizar_login(self):
         """
-        Realiza o login no SEI usando a classe LoginSei
+        Realiza o login no SEI usando a classe LoginSei. Antes tenta reaproveitar
+        a sessão salva em disco; o formulário de login só é preenchido se ela
+        não existir ou tiver expirado.
         
         Returns:
             bool: True se login foi bem-sucedido, False caso contrário
         """
+        if self._restaurar_sessao():
+            return True
+
         try:
             # Instancia a classe de login
             self.login_sei = LoginSei(self.driver, self.usuario, self.senha)
@@ -88,6 +110,7 @@ class AutomacaoPassivo:
                 # Verifica novamente se o login foi realmente bem-sucedido
                 if self.login_sei.verificar_login_bem_sucedido():
                     logging.info('Login realizado com sucesso!')
+                    self._salvar_sessao()
                     return True
                 else:
                     logging.error('Falha na verificação do login.')
@@ -103,8 +126,45 @@ class AutomacaoPassivo:
             logging.error(f'Erro durante o login: {e}')
             return False
     
+    def _restaurar_sessao(self):
+        """
+        Restaura no navegador os cookies da sessão salva e confirma que ainda
+        está autenticada.
+
+        Returns:
+            bool: True se a sessão salva foi reaproveitada, False caso contrário
+        """
+        self.sessao_restaurada = False
+        if self.sessao_persistida is None:
+            return False
+
+        if not self.sessao_persistida.restaurar_no_driver(self.driver):
+            return False
+
+        if not self.sessao_ativa():
+            logging.info('Sessão salva do SEI expirada. Será feito novo login.')
+            self.sessao_persistida.apagar()
+            return False
+
+        logging.info('Sessão do SEI restaurada sem novo login.')
+        self.sessao_restaurada = True
+        return True
+
+    def _salvar_sessao(self):
+        """Grava os cookies da sessão autenticada para os próximos reinícios."""
+        if self.sessao_persistida is None:
+            return
+        try:
+            self.sessao_persistida.salvar(self.driver)
+        except Exception as e:
+            logging.warning(f'Não foi possível salvar a sessão do SEI: {e}')
+
+    @etapa('tela_aviso')
     def _fechar_tela_aviso(self):
         """Remove a tela de aviso após o login"""
+        if self.sessao_restaurada:
+            # A tela de aviso só aparece logo após o formulário de login
+            return
         try:
             self.tela_aviso = TelaAviso(self.driver)
             self.tela_aviso.fechar_tela_aviso_sei()
@@ -113,6 +173,7 @@ class AutomacaoPassivo:
         except Exception as e:
             logging.warning(f'Erro ao fechar tela de aviso (pode não ter aparecido): {e}')
     
+    @etapa('selecao_unidade')
     def _selecionar_unidade_mgi(self):
         """
         Seleciona especificamente a unidade MGI-SGP-DECIPEX-CGPAG-ANIST
@@ -135,4 +196,89 @@ class AutomacaoPassivo:
             
         except Exception as e:
             logging.error(f'Erro durante seleção da unidade MGI: {e}')
-            return False
\ No newline at end of file
+            return False
+
+    def unidade_atual(self):
+        """
+        Retorna a sigla da unidade exibida na barra superior do SEI,
+        ou None se o elemento não estiver na página.
+        """
+        elementos = self.driver.find_elements(By.CSS_SELECTOR, self.SELETOR_UNIDADE_ATUAL)
+        return elementos[0].text.strip() if elementos else None
+
+    def sessao_ativa(self):
+        """
+        Verifica, com uma única chamada ao navegador, se a sessão do SEI ainda
+        está autenticada: a página principal tem o ícone de Controle de Processos
+        e não é a tela de login.
+
+        Returns:
+            bool: True se a sessão está ativa, False caso contrário
+        """
+        if self.driver is None:
+            return False
+        try:
+            return bool(self.driver.execute_script(
+                "const doc = window.top.document;"
+                "return !!doc.querySelector(\"img[title='Controle de Processos']\")"
+                " && !/login/i.test(window.top.location.href);"
+            ))
+        except WebDriverException as e:
+            logging.warning(f'Não foi possível verificar a sessão do SEI: {e}')
+            return False
+
+    def garantir_sessao(self):
+        """
+        Refaz o login apenas se a sessão tiver expirado.
+
+        Returns:
+            bool: True se ao final há uma sessão ativa, False caso contrário
+        """
+        if self.sessao_ativa():
+            return True
+
+        logging.info('Sessão do SEI expirada. Realizando novo login.')
+        if not self._realizar_login():
+            return False
+        self._fechar_tela_aviso()
+        return True
+
+    @etapa('troca_unidade')
+    def trocar_unidade(self, unidade):
+        """
+        Troca para outra unidade dentro da sessão já autenticada, sem novo login,
+        e confirma a troca pela unidade exibida na barra superior.
+
+        Args:
+            unidade: Sigla da unidade de destino
+
+        Returns:
+            bool: True se a unidade de destino está selecionada, False caso contrário
+        """
+        if not self.garantir_sessao():
+            logging.error(f'Sem sessão no SEI para trocar para a unidade {unidade}.')
+            return False
+
+        self.unidade = unidade
+        if self.unidade_atual() == unidade:
+            logging.info(f'Unidade {unidade} já está selecionada.')
+            return True
+
+        try:
+            self.driver.switch_to.default_content()
+            self.selecao_unidade = SelecaoUnidade(None, self.driver, unidade)
+            self.selecao_unidade.selecionar_unidade_sei()
+        except Exception as e:
+            logging.error(f'Erro ao trocar para a unidade {unidade}: {e}')
+            return False
+
+        try:
+            WebDriverWait(self.driver, self.TIMEOUT_TROCA_UNIDADE).until(
+                lambda driver: self.unidade_atual() == unidade
+            )
+        except TimeoutException:
+            logging.error(f'Troca de unidade não confirmada: esperada {unidade}, atual {self.unidade_atual()}.')
+            return False
+
+        logging.info(f'Unidade trocada para {unidade}.')
+        return True
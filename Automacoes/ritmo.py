@@ -0,0 +1,116 @@
+import os
+import threading
+import time
+
+
+class LimitadorTaxa:
+    """
+    Balde de fichas (token bucket) para espaçar ações contra o SEI.
+
+    Libera até `rajada` ações seguidas e, depois disso, no máximo `taxa`
+    ações por segundo. Ao contrário de uma pausa fixa, só espera quando as
+    ações estão de fato mais rápidas que o permitido. Seguro para uso entre
+    threads.
+    """
+
+    def __init__(self, taxa, rajada=1):
+        """
+        Args:
+            taxa: Ações por segundo; 0 ou negativo desativa o limite
+            rajada: Quantidade de ações liberadas sem espera
+        """
+        self.taxa = taxa
+        self.rajada = max(1, rajada)
+        self._fichas = float(self.rajada)
+        self._ultima_reposicao = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self):
+        """Consome uma ficha e retorna quantos segundos é preciso esperar por ela."""
+        with self._lock:
+            agora = time.monotonic()
+            self._fichas = min(self.rajada, self._fichas + (agora - self._ultima_reposicao) * self.taxa)
+            self._ultima_reposicao = agora
+            self._fichas -= 1
+            if self._fichas >= 0:
+                return 0.0
+            return -self._fichas / self.taxa
+
+    def aguardar(self):
+        """
+        Bloqueia até que a próxima ação seja permitida.
+
+        Returns:
+            float: Segundos esperados
+        """
+        if self.taxa <= 0:
+            return 0.0
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+
+class GovernadorRequisicoes(LimitadorTaxa):
+    """
+    Limitador compartilhado por todas as automações que acessam um mesmo host
+    do SEI, com contabilidade do tempo gasto esperando.
+    """
+
+    def __init__(self, host, taxa, rajada=1):
+        super().__init__(taxa, rajada)
+        self.host = host
+        self.acoes = 0
+        self.acoes_limitadas = 0
+        self.tempo_limitado = 0.0
+        self._lock_estatisticas = threading.Lock()
+
+    def aguardar(self):
+        espera = super().aguardar()
+        with self._lock_estatisticas:
+            self.acoes += 1
+            if espera > 0:
+                self.acoes_limitadas += 1
+                self.tempo_limitado += espera
+        return espera
+
+    def estatisticas(self):
+        """Resumo do uso: ações liberadas, quantas esperaram e o tempo total de espera."""
+        with self._lock_estatisticas:
+            return {
+                "host": self.host,
+                "taxa": self.taxa,
+                "rajada": self.rajada,
+                "acoes": self.acoes,
+                "acoes_limitadas": self.acoes_limitadas,
+                "tempo_limitado": round(self.tempo_limitado, 3),
+            }
+
+
+HOST_SEI = 'colaboragov.sei.gov.br'
+
+_governadores = {}
+_lock_governadores = threading.Lock()
+
+
+def governador(host=HOST_SEI):
+    """
+    Governador do host, único por processo e compartilhado entre threads.
+
+    O orçamento vem do ambiente: SEI_REQUISICOES_POR_SEGUNDO (padrão 1; 0
+    desativa o limite) e SEI_RAJADA (ações seguidas sem espera, padrão 3).
+    """
+    with _lock_governadores:
+        if host not in _governadores:
+            _governadores[host] = GovernadorRequisicoes(
+                host,
+                taxa=float(os.getenv("SEI_REQUISICOES_POR_SEGUNDO", 1)),
+                rajada=int(os.getenv("SEI_RAJADA", 3)),
+            )
+        return _governadores[host]
+
+
+def estatisticas_governadores():
+    """Estatísticas de todos os governadores criados no processo."""
+    with _lock_governadores:
+        return [g.estatisticas() for g in _governadores.values()]
@@ -0,0 +1,114 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+from selenium.common.exceptions import WebDriverException
+
+
+class SessaoSeiPersistida:
+    """
+    Guarda os cookies de uma sessão autenticada do SEI criptografados em disco,
+    para que reinícios do agendador e execuções seguidas reaproveitem o login.
+
+    Os cookies são restaurados num novo WebDriver e a validade é conferida com
+    uma única chamada (AutomacaoPassivo.sessao_ativa); só quando a sessão
+    expirou é preciso refazer o fluxo completo de LoginSei.logar_sei.
+
+    A chave vem de SESSAO_SEI_CHAVE (chave Fernet) ou, na falta dela, é derivada
+    da senha do usuário, de forma que só quem tem a senha consegue ler o arquivo.
+    Cada slot guarda uma sessão independente: navegadores que trabalham em
+    paralelo precisam de sessões próprias, já que a unidade selecionada fica
+    na sessão do servidor.
+    """
+    URL_SEI = 'https://colaboragov.sei.gov.br/sei/'
+    TIMEOUT_VALIDACAO = 10
+
+    def __init__(self, usuario, senha, slot=0, pasta=None):
+        """
+        Args:
+            usuario: Nome de usuário do SEI
+            senha: Senha do usuário (usada para derivar a chave se SESSAO_SEI_CHAVE não existir)
+            slot: Identificador da sessão, um por navegador simultâneo
+            pasta: Pasta dos arquivos de sessão (padrão: SESSAO_SEI_DIR ou Automacoes/sessoes)
+        """
+        self.usuario = usuario
+        pasta = pasta or os.getenv(
+            "SESSAO_SEI_DIR",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessoes')
+        )
+        os.makedirs(pasta, exist_ok=True)
+
+        identificador = hashlib.sha256(f"{usuario}:{slot}".encode()).hexdigest()[:16]
+        self.arquivo = os.path.join(pasta, f"sessao_{identificador}.bin")
+        self.fernet = Fernet(self._chave(usuario, senha))
+
+    @staticmethod
+    def _chave(usuario, senha):
+        chave = os.getenv("SESSAO_SEI_CHAVE")
+        if chave:
+            return chave.encode()
+        derivada = hashlib.pbkdf2_hmac('sha256', (senha or '').encode(), (usuario or '').encode(), 200_000)
+        return base64.urlsafe_b64encode(derivada)
+
+    def salvar(self, driver):
+        """Criptografa e grava os cookies atuais do navegador."""
+        conteudo = json.dumps({"salvo_em": time.time(), "cookies": driver.get_cookies()})
+        with open(self.arquivo, 'wb') as f:
+            f.write(self.fernet.encrypt(conteudo.encode()))
+        logging.info('Sessão do SEI salva em disco.')
+
+    def carregar(self):
+        """
+        Lê os cookies gravados.
+
+        Returns:
+            list: Cookies no formato do Selenium, ou None se não houver sessão
+                  salva ou o arquivo não puder ser lido com a chave atual
+        """
+        if not os.path.exists(self.arquivo):
+            return None
+        try:
+            with open(self.arquivo, 'rb') as f:
+                conteudo = json.loads(self.fernet.decrypt(f.read()))
+        except (InvalidToken, ValueError) as e:
+            logging.warning(f'Sessão do SEI salva ilegível, descartando: {e}')
+            self.apagar()
+            return None
+        return conteudo.get("cookies") or None
+
+    def apagar(self):
+        if os.path.exists(self.arquivo):
+            os.remove(self.arquivo)
+
+    def restaurar_no_driver(self, driver):
+        """
+        Injeta os cookies salvos no navegador e abre o SEI.
+
+        Returns:
+            bool: True se os cookies foram aplicados; a validade da sessão deve
+                  ser confirmada em seguida (ex.: AutomacaoPassivo.sessao_ativa)
+        """
+        cookies = self.carregar()
+        if not cookies:
+            return False
+
+        try:
+            # O Selenium só aceita cookies do domínio da página aberta
+            driver.get(self.URL_SEI)
+            driver.delete_all_cookies()
+            for cookie in cookies:
+                if cookie.get('sameSite') not in ('Strict', 'Lax', 'None'):
+                    cookie.pop('sameSite', None)
+                try:
+                    driver.add_cookie(cookie)
+                except WebDriverException as e:
+                    logging.debug(f"Cookie '{cookie.get('name')}' não restaurado: {e}")
+            driver.get(self.URL_SEI)
+        except WebDriverException as e:
+            logging.warning(f'Erro ao restaurar a sessão do SEI no navegador: {e}')
+            return False
+        return True
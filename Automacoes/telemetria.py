@@ -0,0 +1,247 @@
+"""
+Telemetria das capturas: duração de cada etapa (login, troca de unidade,
+nível de detalhe, extração e gravação de cada página, marcação de
+concluídos...) gravada num banco SQLite próprio, com uma linha por execução
+em capture_runs e uma por etapa em capture_stages.
+
+Uso:
+    with execucao(unidade, motor):
+        with etapa('login'):
+            ...
+
+    @etapa('troca_unidade')
+    def trocar_unidade(...): ...
+
+A execução ativa é guardada por thread (o OrquestradorCapturas roda uma por
+navegador). As etapas ficam em memória e são gravadas de uma vez ao fim da
+execução; etapas medidas fora de uma execução são descartadas.
+"""
+import os
+import math
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+FORMATO_DATA_HORA = "%Y-%m-%d %H:%M:%S"
+
+_local = threading.local()
+
+
+def caminho_telemetria():
+    """Banco da telemetria: TELEMETRIA_DB do .env ou Bases/telemetria.db."""
+    caminho = os.getenv("TELEMETRIA_DB")
+    if caminho:
+        return Path(caminho)
+    return Path(__file__).resolve().parent.parent / "Bases" / "telemetria.db"
+
+
+def _conectar(caminho=None):
+    caminho = Path(caminho or caminho_telemetria())
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    # Várias threads e processos gravam no mesmo arquivo
+    conn = sqlite3.connect(caminho, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS capture_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            unidade TEXT,
+            motor TEXT,
+            iniciada_em TEXT,
+            duracao REAL,
+            sucesso INTEGER,
+            erro TEXT
+        );
+        CREATE TABLE IF NOT EXISTS capture_stages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER NOT NULL REFERENCES capture_runs(id),
+            etapa TEXT NOT NULL,
+            iniciada_em TEXT,
+            duracao REAL,
+            pagina INTEGER,
+            sucesso INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_capture_runs_iniciada ON capture_runs (iniciada_em);
+        CREATE INDEX IF NOT EXISTS idx_capture_stages_run ON capture_stages (run_id);
+    """)
+    return conn
+
+
+class ExecucaoCaptura:
+    """Etapas medidas de uma execução; gravadas por salvar()."""
+
+    def __init__(self, unidade, motor):
+        self.unidade = unidade
+        self.motor = motor
+        self.iniciada_em = datetime.now()
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.sucesso = None
+        self.erro = None
+
+    def registrar(self, nome, iniciada_em, duracao, pagina=None, sucesso=True):
+        self.etapas.append((nome, iniciada_em.strftime(FORMATO_DATA_HORA), duracao, pagina, int(sucesso)))
+
+    def salvar(self, caminho=None):
+        duracao = time.perf_counter() - self.inicio
+        conn = _conectar(caminho)
+        try:
+            with conn:
+                cursor = conn.execute("""
+                    INSERT INTO capture_runs (unidade, motor, iniciada_em, duracao, sucesso, erro)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (self.unidade, self.motor, self.iniciada_em.strftime(FORMATO_DATA_HORA), duracao,
+                      None if self.sucesso is None else int(self.sucesso), self.erro))
+                run_id = cursor.lastrowid
+                conn.executemany("""
+                    INSERT INTO capture_stages (run_id, etapa, iniciada_em, duracao, pagina, sucesso)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(run_id, *etapa) for etapa in self.etapas])
+        finally:
+            conn.close()
+        return run_id
+
+
+def execucao_atual():
+    return getattr(_local, "execucao", None)
+
+
+@contextmanager
+def execucao(unidade, motor="selenium"):
+    """
+    Abre a execução da thread atual e a grava ao sair. O resultado é o valor
+    atribuído a `sucesso` pelo chamador ou, se ele não o fizer, True quando o
+    bloco termina sem exceção.
+    """
+    anterior = execucao_atual()
+    atual = ExecucaoCaptura(unidade, motor)
+    _local.execucao = atual
+    try:
+        yield atual
+        if atual.sucesso is None:
+            atual.sucesso = True
+    except Exception as e:
+        atual.sucesso = False
+        atual.erro = f"{e.__class__.__name__}: {e}"[:500]
+        raise
+    finally:
+        _local.execucao = anterior
+        try:
+            atual.salvar()
+        except sqlite3.Error as e:
+            logging.warning(f"Não foi possível gravar a telemetria da captura de {unidade}: {e}")
+
+
+@contextmanager
+def etapa(nome, pagina=None):
+    """Mede o bloco (ou a função decorada) como uma etapa da execução atual."""
+    atual = execucao_atual()
+    if atual is None:
+        yield
+        return
+
+    iniciada_em = datetime.now()
+    inicio = time.perf_counter()
+    sucesso = False
+    try:
+        yield
+        sucesso = True
+    finally:
+        atual.registrar(nome, iniciada_em, time.perf_counter() - inicio, pagina, sucesso)
+
+
+def _percentil(valores, p):
+    """Percentil pelo método do posto mais próximo; valores já ordenados."""
+    if not valores:
+        return None
+    indice = max(0, min(len(valores) - 1, math.ceil(p / 100 * len(valores)) - 1))
+    return valores[indice]
+
+
+def _resumir(grupos):
+    return [
+        {
+            **chave,
+            "quantidade": len(duracoes),
+            "p50": _percentil(sorted(duracoes), 50),
+            "p95": _percentil(sorted(duracoes), 95),
+            "total": sum(duracoes),
+        }
+        for chave, duracoes in ((dict(k), v) for k, v in grupos.items())
+    ]
+
+
+def resumo_etapas(dias=7, unidade=None, caminho=None):
+    """
+    p50/p95 da duração de cada etapa por unidade nos últimos `dias`.
+
+    Returns:
+        list: dicionários com unidade, etapa, quantidade, p50, p95 e total
+        (segundos), ordenados por unidade e tempo total decrescente.
+    """
+    caminho = Path(caminho or caminho_telemetria())
+    if not caminho.exists():
+        return []
+
+    desde = (datetime.now() - timedelta(days=dias)).strftime(FORMATO_DATA_HORA)
+    consulta = """
+        SELECT r.unidade, s.etapa, s.duracao
+        FROM capture_stages s
+        JOIN capture_runs r ON r.id = s.run_id
+        WHERE r.iniciada_em >= ?
+    """
+    parametros = [desde]
+    if unidade:
+        consulta += " AND r.unidade = ?"
+        parametros.append(unidade)
+
+    conn = _conectar(caminho)
+    try:
+        grupos = {}
+        for unidade_etapa, nome, duracao in conn.execute(consulta, parametros):
+            chave = (("unidade", unidade_etapa), ("etapa", nome))
+            grupos.setdefault(chave, []).append(duracao)
+    finally:
+        conn.close()
+
+    return sorted(_resumir(grupos), key=lambda linha: (linha["unidade"] or "", -linha["total"]))
+
+
+def resumo_execucoes(dias=7, unidade=None, caminho=None):
+    """
+    p50/p95 da duração total das execuções por unidade e dia, com a
+    quantidade de falhas, para acompanhar a evolução ao longo do tempo.
+    """
+    caminho = Path(caminho or caminho_telemetria())
+    if not caminho.exists():
+        return []
+
+    desde = (datetime.now() - timedelta(days=dias)).strftime(FORMATO_DATA_HORA)
+    consulta = """
+        SELECT unidade, substr(iniciada_em, 1, 10), duracao, sucesso
+        FROM capture_runs
+        WHERE iniciada_em >= ?
+    """
+    parametros = [desde]
+    if unidade:
+        consulta += " AND unidade = ?"
+        parametros.append(unidade)
+
+    conn = _conectar(caminho)
+    try:
+        grupos = {}
+        falhas = {}
+        for unidade_run, dia, duracao, sucesso in conn.execute(consulta, parametros):
+            chave = (("unidade", unidade_run), ("dia", dia))
+            grupos.setdefault(chave, []).append(duracao)
+            falhas[chave] = falhas.get(chave, 0) + (sucesso == 0)
+    finally:
+        conn.close()
+
+    linhas = _resumir(grupos)
+    for linha in linhas:
+        linha["falhas"] = falhas[(("unidade", linha["unidade"]), ("dia", linha["dia"]))]
+    return sorted(linhas, key=lambda linha: (linha["dia"], linha["unidade"] or ""), reverse=True)
@@ -100,6 +100,16 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Cache das métricas do painel. Baseado em arquivo para ser compartilhado entre
+# o servidor web e o scheduler, que invalida as métricas ao fim de cada captura.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv("CACHE_DIR", os.path.join(BASE_DIR, 'cache')),
+    }
+}
+METRICAS_CACHE_TIMEOUT = int(os.getenv("METRICAS_CACHE_TIMEOUT", 6 * 60 * 60))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 #VERIFICAÇÃO
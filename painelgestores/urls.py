@@ -15,5 +15,10 @@ urlpatterns = [
     path("desempenho/", views.desempenho_view, name="desempenho"),
     path("panorama/", views.panorama_view, name="panorama"),
     path("extracoes/", views.extracoes, name="extracoes"),
+    path("telemetria/", views.telemetria_view, name="telemetria"),
+
+    path("api/metricas/<str:caixa>/", views.api_metricas, name="api_metricas"),
+    path("api/panorama/", views.api_panorama, name="api_panorama"),
+    path("api/extracoes/<int:job_id>/", views.api_job_extracao, name="api_job_extracao"),
 ]
 
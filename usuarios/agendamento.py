@@ -0,0 +1,135 @@
+"""
+Capturas agendadas com django_apscheduler (manage.py agendador).
+
+As caixas são agrupadas pela cadência (CADENCIA_CAPTURA_POR_CAIXA) e cada
+grupo tem o seu job no agendador. O job não abre navegador: dentro da janela
+de expediente (dias úteis de Brasília, JANELA_CAPTURA) ele só enfileira um
+JobExtracao de captura por caixa do grupo, de uma vez, para que o worker
+(processar_extracoes) as reserve juntas e rode um único OrquestradorCapturas
+com o pool de navegadores. Como a fila aceita um único job ativo por
+unidade, uma captura nunca se sobrepõe à anterior da mesma caixa; o pedido
+novo se junta ao que ainda está na fila.
+
+As execuções, inclusive as perdidas (agendador parado ou ocupado além de
+misfire_grace_time), ficam registradas em DjangoJobExecution.
+"""
+import os
+import logging
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django_apscheduler.models import DjangoJob, DjangoJobExecution
+from django_apscheduler.util import close_old_connections
+
+from .calendario import eh_dia_util
+from .config_caixas import (RESPONSAVEIS_POR_CAIXA, CADENCIA_CAPTURA_PADRAO, CADENCIA_CAPTURA_POR_CAIXA,
+                            JANELA_CAPTURA, FUSO_AGENDAMENTO)
+from .models import JobExtracao
+
+PREFIXO_JOB_CAPTURA = "captura:"
+
+# Uma execução atrasada mais que isso é dada como perdida em vez de rodar
+TOLERANCIA_ATRASO = 15 * 60
+
+# Execuções registradas em DjangoJobExecution são guardadas por uma semana
+IDADE_MAXIMA_EXECUCOES = 7 * 24 * 60 * 60
+
+
+def unidades_configuradas():
+    """
+    Unidades a capturar: a lista UNIDADES do .env (separada por vírgulas) ou,
+    na ausência dela, todas as caixas de config_caixas.
+    """
+    unidades = os.getenv("UNIDADES")
+    if unidades:
+        return [unidade.strip() for unidade in unidades.split(",") if unidade.strip()]
+    return list(RESPONSAVEIS_POR_CAIXA.keys())
+
+
+def cadencia_minutos(caixa):
+    return CADENCIA_CAPTURA_POR_CAIXA.get(caixa, CADENCIA_CAPTURA_PADRAO)
+
+
+def dentro_da_janela(momento=None):
+    """Indica se o momento (agora, por padrão) está num dia útil e dentro de JANELA_CAPTURA."""
+    fuso = ZoneInfo(FUSO_AGENDAMENTO)
+    momento = (momento or datetime.now(fuso)).astimezone(fuso)
+    inicio, fim = (time.fromisoformat(hora) for hora in JANELA_CAPTURA)
+    return eh_dia_util(momento.date()) and inicio <= momento.time() < fim
+
+
+@close_old_connections
+def agendar_capturas(caixas):
+    """Job do agendador: enfileira a captura das caixas se estiver no expediente."""
+    if not dentro_da_janela():
+        logging.debug(f"Captura agendada de {', '.join(caixas)} ignorada: fora da janela de expediente.")
+        return
+
+    for caixa in caixas:
+        job, criado = JobExtracao.enfileirar("captura", caixa)
+        if criado:
+            logging.info(f"Captura agendada de {caixa} enfileirada (job {job.id}).")
+        else:
+            logging.warning(f"Captura de {caixa} ainda {job.get_status_display().lower()} (job {job.id}); "
+                            "a execução agendada foi juntada a ela.")
+
+
+@close_old_connections
+def limpar_execucoes_antigas(idade_maxima=IDADE_MAXIMA_EXECUCOES):
+    """Apaga do banco os registros de execução do agendador mais antigos que idade_maxima (segundos)."""
+    DjangoJobExecution.objects.delete_old_job_executions(idade_maxima)
+
+
+def configurar_agendador(agendador, unidades=None):
+    """
+    Registra no agendador um job de captura por cadência, com as unidades
+    daquela cadência, e o job de limpeza. Jobs de cadências que não são mais
+    usadas são removidos.
+
+    Os grupos começam escalonados (um minuto entre eles) para que cadências
+    múltiplas umas das outras não caiam no mesmo instante.
+    """
+    unidades = unidades_configuradas() if unidades is None else list(unidades)
+    inicio = datetime.now(ZoneInfo(FUSO_AGENDAMENTO)) + timedelta(minutes=1)
+
+    grupos = {}
+    for unidade in unidades:
+        grupos.setdefault(cadencia_minutos(unidade), []).append(unidade)
+
+    ids_atuais = []
+    for indice, (minutos, caixas) in enumerate(sorted(grupos.items())):
+        job_id = f"{PREFIXO_JOB_CAPTURA}{minutos}min"
+        agendador.add_job(
+            agendar_capturas,
+            trigger="interval",
+            minutes=minutos,
+            start_date=inicio + timedelta(minutes=indice),
+            args=[caixas],
+            id=job_id,
+            name=f"Captura a cada {minutos} minutos",
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=TOLERANCIA_ATRASO,
+            replace_existing=True,
+        )
+        ids_atuais.append(job_id)
+        logging.info(f"Captura de {', '.join(caixas)} agendada a cada {minutos} minutos.")
+
+    # Antes do start o agendador só enxerga os jobs pendentes; os gravados em
+    # execuções anteriores (inclusive os antigos, de uma caixa por job) são
+    # removidos direto no DjangoJobStore
+    obsoletos = DjangoJob.objects.filter(id__startswith=PREFIXO_JOB_CAPTURA).exclude(id__in=ids_atuais)
+    for job_id in obsoletos.values_list("id", flat=True):
+        logging.info(f"Job {job_id} removido: fora da configuração atual.")
+    obsoletos.delete()
+
+    agendador.add_job(
+        limpar_execucoes_antigas,
+        trigger="cron",
+        day_of_week="mon",
+        hour=3,
+        id="limpar_execucoes_antigas",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True,
+    )
@@ -0,0 +1,71 @@
+"""
+Calendário de dias úteis de Brasília (DF) usado nas metas do painel.
+
+Os dias úteis de cada mês são calculados uma única vez, para um intervalo de
+anos em torno do ano corrente, e guardados numa tabela {(ano, mes): dias}.
+As views consultam essa tabela em vez de montar um calendário do workalendar
+a cada requisição. Pontos facultativos entram pela lista PONTOS_FACULTATIVOS
+de config_caixas.
+"""
+import calendar
+from datetime import date
+from functools import lru_cache
+
+from workalendar.america import BrazilDistritoFederal
+
+from .config_caixas import PONTOS_FACULTATIVOS
+
+# Anos pré-calculados em relação ao ano corrente
+ANOS_ANTERIORES = 1
+ANOS_POSTERIORES = 2
+
+_calendario_df = BrazilDistritoFederal()
+
+
+def _dias_nao_uteis_extras():
+    return {date.fromisoformat(dia) for dia in PONTOS_FACULTATIVOS}
+
+
+def _calcular_mes(ano, mes, extras):
+    """Conta os dias úteis do mês, do dia 1 ao último, inclusive."""
+    inicio = date(ano, mes, 1)
+    fim = date(ano, mes, calendar.monthrange(ano, mes)[1])
+    return _calendario_df.get_working_days_delta(
+        inicio, fim, include_start=True, extra_holidays=extras
+    )
+
+
+@lru_cache(maxsize=1)
+def _tabela_dias_uteis(ano_base):
+    """Tabela {(ano, mes): dias úteis} para os anos em torno de ano_base."""
+    extras = _dias_nao_uteis_extras()
+    return {
+        (ano, mes): _calcular_mes(ano, mes, extras)
+        for ano in range(ano_base - ANOS_ANTERIORES, ano_base + ANOS_POSTERIORES + 1)
+        for mes in range(1, 13)
+    }
+
+
+@lru_cache(maxsize=None)
+def _dias_uteis_fora_da_tabela(ano, mes):
+    return _calcular_mes(ano, mes, _dias_nao_uteis_extras())
+
+
+def dias_uteis_mes(ano, mes):
+    """Quantidade de dias úteis do mês em Brasília, descontados os pontos facultativos."""
+    tabela = _tabela_dias_uteis(date.today().year)
+    dias = tabela.get((ano, mes))
+    if dias is None:
+        dias = _dias_uteis_fora_da_tabela(ano, mes)
+    return dias
+
+
+def eh_dia_util(dia):
+    """Indica se o dia é útil em Brasília, descontados os pontos facultativos."""
+    return _calendario_df.is_working_day(dia, extra_holidays=_dias_nao_uteis_extras())
+
+
+def recarregar():
+    """Descarta a tabela pré-calculada (ex.: após alterar PONTOS_FACULTATIVOS em tempo de execução)."""
+    _tabela_dias_uteis.cache_clear()
+    _dias_uteis_fora_da_tabela.cache_clear()
@@ -90,6 +90,36 @@ METAS_POR_CAIXA = {
 
 CAIXAS = list(RESPONSAVEIS_POR_CAIXA.keys())
 
+# Intervalo, em minutos, entre capturas agendadas de cada caixa (manage.py
+# agendador). Caixas com mais técnicos mudam mais e são capturadas com mais
+# frequência; as ausentes usam CADENCIA_CAPTURA_PADRAO.
+CADENCIA_CAPTURA_PADRAO = 120
+
+CADENCIA_CAPTURA_POR_CAIXA = {
+    "MGI-SGP-DECIPEX-CGPAG-ANIST": 120,
+    "MGI-SGP-DECIPEX-CGPAG-BENESP": 240,
+    "MGI-SGP-DECIPEX-CGPAG-CIVAC": 60,
+    "MGI-SGP-DECIPEX-CGPAG-CIVPAS": 240,
+    "MGI-SGP-DECIPEX-CGPAG-CIVRES": 60,
+    "MGI-SGP-DECIPEX-CGPAG-DEVIR": 240,
+    "MGI-SGP-DECIPEX-CGPAG-ESTPEN": 240,
+    "MGI-SGP-DECIPEX-CGPAG-EXANTE": 60,
+    "MGI-SGP-DECIPEX-CGPAG-JUD": 120,
+    "MGI-SGP-DECIPEX-CGPAG-MILREP": 240,
+    "MGI-SGP-DECIPEX-CGPAG-REVER": 60,
+    "MGI-SGP-DECIPEX-CGPAG-REPER": 60,
+}
+
+# Capturas agendadas só rodam em dias úteis, dentro deste horário (Brasília)
+JANELA_CAPTURA = ("07:00", "20:00")
+FUSO_AGENDAMENTO = "America/Sao_Paulo"
+
+# Pontos facultativos e demais dias sem expediente que não constam do
+# calendário de feriados do DF (datas no formato "AAAA-MM-DD").
+# Ex.: "2025-03-03", "2025-03-04" (Carnaval)
+PONTOS_FACULTATIVOS = [
+]
+
 SE_PATH = Path(__file__).parent / "Bases"
 
 
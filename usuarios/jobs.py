@@ -0,0 +1,192 @@
+"""
+Execução dos jobs de extração enfileirados pela página /extracoes/ e pelo
+agendador.
+
+A view só cria o JobExtracao; quem abre o navegador e roda a captura é o
+worker (manage.py processar_extracoes), um processo separado do servidor
+web. Cada job é reservado com um UPDATE condicionado ao status 'pendente',
+de modo que dois workers nunca executam o mesmo job. As capturas pendentes
+são reservadas juntas e rodam num único OrquestradorCapturas, que reparte
+as unidades entre CAPTURA_NAVEGADORES navegadores e troca de unidade na
+sessão já aberta em vez de fazer um login por unidade.
+
+Cada job guarda o worker que o reservou ("host:pid"); ao iniciar, um worker
+só dá como interrompidos os jobs de processos parados na mesma máquina ou os
+que estão em execução há mais de JOB_EXTRACAO_HORAS_MAXIMAS.
+"""
+import os
+import socket
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .metricas import invalidar_metricas
+from .models import JobExtracao
+from Automacoes.orquestrador import OrquestradorCapturas
+from Automacoes.passivoteste import AutomacaoPassivo
+
+NAVEGADORES = int(os.getenv("CAPTURA_NAVEGADORES", 3))
+
+# Um job em execução há mais tempo que isso é dado como interrompido por
+# qualquer worker (o que o reservou pode estar em outra máquina)
+HORAS_JOB_TRAVADO = float(os.getenv("JOB_EXTRACAO_HORAS_MAXIMAS", 6))
+
+
+def identificacao_worker():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _processo_ativo(pid):
+    """Indica se o processo existe; no Windows não há como testar sem risco e assume que sim."""
+    if os.name == "nt":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _interrompido(job, limite):
+    host, _, pid = job.worker.rpartition(":")
+    if host == socket.gethostname() and pid.isdigit():
+        return int(pid) == os.getpid() or not _processo_ativo(int(pid))
+    return job.iniciado_em is None or job.iniciado_em < limite
+
+
+def recuperar_jobs_interrompidos():
+    """
+    Marca como falhos os jobs que ficaram 'executando' quando o seu worker
+    parou, liberando a unidade para um novo pedido. Jobs de outros workers
+    em atividade não são tocados.
+
+    Returns:
+        int: quantidade de jobs marcados
+    """
+    limite = timezone.now() - timedelta(hours=HORAS_JOB_TRAVADO)
+    interrompidos = [job for job in JobExtracao.objects.filter(status="executando") if _interrompido(job, limite)]
+    for job in interrompidos:
+        job.registrar("Execução interrompida (o worker que a executava parou).")
+    return JobExtracao.objects.filter(pk__in=[job.pk for job in interrompidos], status="executando").update(
+        status="falhou", finalizado_em=timezone.now()
+    )
+
+
+def _reservar(job, worker):
+    return JobExtracao.objects.filter(pk=job.pk, status="pendente").update(
+        status="executando", iniciado_em=timezone.now(), worker=worker
+    ) == 1
+
+
+def proximos_jobs():
+    """
+    Reserva o job pendente mais antigo. Se for uma captura, reserva junto as
+    demais capturas pendentes, que rodam no mesmo lote.
+
+    Returns:
+        list: os jobs reservados (vazia se a fila estiver vazia)
+    """
+    worker = identificacao_worker()
+    for job in JobExtracao.objects.filter(status="pendente").order_by("criado_em")[:10]:
+        if _reservar(job, worker):
+            break
+    else:
+        return []
+
+    reservados = [job]
+    if job.tipo == "captura":
+        for outro in JobExtracao.objects.filter(status="pendente", tipo="captura").order_by("criado_em"):
+            if _reservar(outro, worker):
+                reservados.append(outro)
+
+    for job in reservados:
+        job.refresh_from_db()
+    return reservados
+
+
+def _executar_capturas(jobs):
+    unidades = [job.unidade for job in jobs]
+    orquestrador = OrquestradorCapturas(
+        usuario=os.getenv("USER_EMAIL"),
+        senha=os.getenv("USER_PASSWORD"),
+        unidades=unidades,
+        base_dir=settings.BASES_DADOS_DIR,
+        max_navegadores=NAVEGADORES,
+        motor=os.getenv("MOTOR_CAPTURA", "selenium"),
+        ao_finalizar=invalidar_metricas,
+    )
+    resultados = orquestrador.executar()
+
+    sucessos = {}
+    for job in jobs:
+        sucessos[job.pk] = resultados.get(job.unidade, False)
+        if sucessos[job.pk]:
+            job.registrar(f"Captura de processos da unidade '{job.unidade}' finalizada.")
+        else:
+            job.registrar(f"Captura de processos da unidade '{job.unidade}' falhou; veja o log do worker.")
+    return sucessos
+
+
+def _executar_passivos(jobs):
+    return {job.pk: _executar_passivo(job) for job in jobs}
+
+
+def _executar_passivo(job):
+    automacao_sei = AutomacaoPassivo(
+        usuario=os.getenv("USER_EMAIL"),
+        senha=os.getenv("USER_PASSWORD"),
+        unidade=job.unidade
+    )
+    try:
+        if not automacao_sei._inicializar_navegador():
+            job.registrar("Erro ao iniciar o navegador.")
+            return False
+
+        if not automacao_sei._realizar_login():
+            job.registrar("Erro no login. Verifique as credenciais.")
+            return False
+
+        automacao_sei._fechar_tela_aviso()
+        automacao_sei._selecionar_unidade_mgi()
+        job.registrar("Login e seleção da unidade realizados com sucesso.")
+        job.registrar("Automação 'passivo' executada com sucesso!")
+        return True
+    finally:
+        if automacao_sei.driver:
+            try:
+                automacao_sei.driver.quit()
+            except Exception:
+                pass
+
+
+EXECUTORES = {
+    "captura": _executar_capturas,
+    "passivo": _executar_passivos,
+}
+
+
+def executar_jobs(jobs):
+    """
+    Executa jobs já reservados (todos do mesmo tipo, como os devolve
+    proximos_jobs) e grava o resultado em cada um.
+
+    Returns:
+        dict: {job.pk: True se o job foi concluído}
+    """
+    logging.info(f"Executando {len(jobs)} job(s): {', '.join(str(job) for job in jobs)}")
+    try:
+        sucessos = EXECUTORES[jobs[0].tipo](jobs)
+    except Exception as e:
+        logging.exception(f"Erro durante execução dos jobs {[job.id for job in jobs]}: {e}")
+        for job in jobs:
+            job.registrar(f"Erro durante execução: {e}")
+        sucessos = {}
+
+    for job in jobs:
+        job.finalizar(sucessos.get(job.pk, False))
+        logging.info(f"Job {job.id} finalizado: {job.get_status_display()}.")
+    return sucessos
@@ -0,0 +1,38 @@
+import logging
+from zoneinfo import ZoneInfo
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.schedulers.blocking import BlockingScheduler
+from django.core.management.base import BaseCommand
+from django_apscheduler.jobstores import DjangoJobStore
+
+from usuarios.agendamento import configurar_agendador
+from usuarios.config_caixas import FUSO_AGENDAMENTO
+
+
+def _registrar_execucao_perdida(evento):
+    if evento.code == EVENT_JOB_MISSED:
+        logging.warning(f"Execução perdida do job {evento.job_id} (prevista para {evento.scheduled_run_time}).")
+    else:
+        logging.warning(f"Execução do job {evento.job_id} descartada: a anterior ainda está rodando.")
+
+
+class Command(BaseCommand):
+    help = "Agenda as capturas de cada caixa (cadência e janela em config_caixas) e roda o agendador."
+
+    def handle(self, *args, **opcoes):
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+        agendador = BlockingScheduler(timezone=ZoneInfo(FUSO_AGENDAMENTO))
+        agendador.add_jobstore(DjangoJobStore(), "default")
+        agendador.add_listener(_registrar_execucao_perdida, EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+
+        configurar_agendador(agendador)
+
+        try:
+            logging.info("Iniciando o agendador de capturas...")
+            agendador.start()
+        except KeyboardInterrupt:
+            logging.info("Parando o agendador...")
+            agendador.shutdown()
+            logging.info("Agendador parado.")
@@ -0,0 +1,35 @@
+import time
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from usuarios.jobs import executar_jobs, proximos_jobs, recuperar_jobs_interrompidos
+
+
+class Command(BaseCommand):
+    help = "Worker da fila de extrações: executa os jobs enfileirados pela página /extracoes/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--intervalo", type=float, default=5,
+                            help="Segundos entre consultas à fila quando ela está vazia (padrão: 5).")
+        parser.add_argument("--uma-vez", action="store_true",
+                            help="Executa os jobs pendentes e sai.")
+
+    def handle(self, *args, **opcoes):
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+        interrompidos = recuperar_jobs_interrompidos()
+        if interrompidos:
+            logging.warning(f"{interrompidos} job(s) de workers parados marcados como falhos.")
+
+        logging.info("Worker de extrações aguardando jobs...")
+        while True:
+            close_old_connections()
+            jobs = proximos_jobs()
+            if jobs:
+                executar_jobs(jobs)
+                continue
+            if opcoes["uma_vez"]:
+                return
+            time.sleep(opcoes["intervalo"])
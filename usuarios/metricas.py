@@ -0,0 +1,302 @@
+"""
+Consultas de métricas do painel direto nos bancos SQLite de cada caixa.
+
+As contagens vêm da consolidação diária (metricas_diarias) que a captura
+mantém em cada banco (Automacoes.db_processos), de modo que um mês de
+métricas lê algumas centenas de linhas em vez do histórico de processos.
+Bancos legados, sem a consolidação, são contados direto na tabela processos.
+
+Os resultados ficam no cache do Django (settings.CACHES) sob uma versão
+por caixa. Os jobs de captura passam invalidar_metricas ao orquestrador, que
+o chama ao fim de cada captura completa; isso troca a versão e faz a próxima leitura do painel recalcular os números.
+"""
+import sqlite3
+import hashlib
+import logging
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .config_caixas import RESPONSAVEIS_POR_CAIXA, BASE_PATH, CAIXAS
+
+
+def caminho_banco(caixa):
+    """
+    Retorna o caminho do banco da caixa ou None se não existir.
+
+    Prefere o banco gravado pelo GerenciadorDB ('<caixa>/<caixa>.db'), que é
+    o que as capturas atualizam; o arquivo legado '<caixa>_tecnicos.db' só é
+    lido quando ele não existe.
+    """
+    for caminho in (BASE_PATH / caixa / f"{caixa}.db", BASE_PATH / f"{caixa}_tecnicos.db"):
+        if caminho.exists():
+            return caminho
+    return None
+
+
+def conectar_leitura(caminho):
+    """Abre o banco somente para leitura."""
+    return sqlite3.connect(f"file:{caminho}?mode=ro", uri=True)
+
+
+def _filtro_tecnico(caixa, tecnico):
+    """Monta a cláusula de filtro: responsáveis da caixa ou um técnico específico."""
+    if tecnico == "Geral":
+        responsaveis = RESPONSAVEIS_POR_CAIXA.get(caixa, [])
+        marcadores = ",".join("?" * len(responsaveis))
+        return f"email IN ({marcadores})", list(responsaveis)
+    return "tecnico = ?", [tecnico]
+
+
+def _tem_metricas_diarias(conn, alias="main"):
+    """
+    Indica se o banco já tem a consolidação diária preenchida. Bancos legados
+    não têm a tabela e, enquanto ela estiver vazia (banco recém-migrado ainda
+    não consolidado), a contagem também sai da tabela processos.
+    """
+    existe = conn.execute(f"""
+        SELECT 1 FROM {alias}.sqlite_master WHERE type = 'table' AND name = 'metricas_diarias'
+    """).fetchone() is not None
+    return existe and conn.execute(f"SELECT 1 FROM {alias}.metricas_diarias LIMIT 1").fetchone() is not None
+
+
+def contar_concluidos(caixa, tecnico="Geral", dia=None):
+    """
+    Conta os processos concluídos da caixa no mês e no dia, filtrando pelos
+    responsáveis ("Geral") ou por um técnico.
+
+    Lê a consolidação diária (metricas_diarias) mantida pela captura; bancos
+    sem ela são contados direto na tabela de processos.
+
+    Returns:
+        dict: {"concluidos": concluídos do início do mês até o dia informado
+        (hoje por padrão), "hoje": concluídos no dia, "estoque": processos em
+        aberto} ou None se o banco não existir ou não puder ser lido.
+    """
+    caminho = caminho_banco(caixa)
+    if caminho is None:
+        return None
+
+    dia = dia or date.today()
+    hoje, amanha = dia.isoformat(), (dia + timedelta(days=1)).isoformat()
+    inicio_mes = dia.replace(day=1).isoformat()
+    filtro, parametros = _filtro_tecnico(caixa, tecnico)
+
+    try:
+        conn = conectar_leitura(caminho)
+        try:
+            if _tem_metricas_diarias(conn):
+                concluidos, concluidos_hoje = conn.execute(f"""
+                    SELECT COALESCE(SUM(concluidos), 0),
+                           COALESCE(SUM(CASE WHEN dia = ? THEN concluidos END), 0)
+                    FROM metricas_diarias
+                    WHERE dia >= ? AND dia <= ? AND {filtro}
+                """, [hoje, inicio_mes, hoje, *parametros]).fetchone()
+                estoque, = conn.execute(f"""
+                    SELECT COALESCE(SUM(estoque), 0)
+                    FROM metricas_diarias
+                    WHERE dia = (SELECT MAX(dia) FROM metricas_diarias WHERE dia <= ?) AND {filtro}
+                """, [hoje, *parametros]).fetchone()
+            else:
+                concluidos, concluidos_hoje, estoque = conn.execute(f"""
+                    SELECT COALESCE(SUM(concluido = 1 AND data_conclusao >= ? AND data_conclusao < ?), 0),
+                           COALESCE(SUM(concluido = 1 AND data_conclusao >= ? AND data_conclusao < ?), 0),
+                           COALESCE(SUM(data_conclusao IS NULL), 0)
+                    FROM processos
+                    WHERE {filtro}
+                """, [inicio_mes, amanha, hoje, amanha, *parametros]).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error(f"Erro ao consultar métricas da caixa '{caixa}': {e}")
+        return None
+
+    return {"concluidos": concluidos, "hoje": concluidos_hoje, "estoque": estoque}
+
+
+def _anexar_bancos(conn, caminhos):
+    """Anexa os bancos (somente leitura) à conexão e retorna os aliases usados."""
+    aliases = []
+    for i, caminho in enumerate(caminhos):
+        alias = f"caixa{i}"
+        conn.execute("ATTACH DATABASE ? AS " + alias, (f"file:{caminho}?mode=ro",))
+        aliases.append(alias)
+    return aliases
+
+
+def _consultar_panorama(conn, caixas, aliases, ontem, hoje, inicio_mes, amanha):
+    """
+    Consulta um grupo de bancos anexados e devolve (por_caixa, por_tecnico).
+    Usa a consolidação diária de cada banco e, nos legados, a tabela processos.
+    """
+    consultas_caixa = []
+    parametros_caixa = []
+    consultas_tecnico = []
+    parametros_tecnico = []
+    for caixa, alias in zip(caixas, aliases):
+        if _tem_metricas_diarias(conn, alias):
+            consultas_caixa.append(f"""
+                SELECT ?,
+                    (SELECT COALESCE(SUM(concluidos), 0) FROM {alias}.metricas_diarias WHERE dia = ?),
+                    (SELECT COALESCE(SUM(estoque), 0) FROM {alias}.metricas_diarias
+                     WHERE dia = (SELECT MAX(dia) FROM {alias}.metricas_diarias WHERE dia <= ?)),
+                    (SELECT COALESCE(SUM(concluidos), 0) FROM {alias}.metricas_diarias)
+            """)
+            parametros_caixa += [caixa, ontem, hoje]
+            consultas_tecnico.append(f"""
+                SELECT tecnico, concluidos AS total FROM {alias}.metricas_diarias
+                WHERE dia >= ? AND dia < ? AND concluidos > 0
+            """)
+        else:
+            consultas_caixa.append(f"""
+                SELECT ?,
+                    (SELECT COUNT(*) FROM {alias}.processos
+                     WHERE data_conclusao >= ? AND data_conclusao < ?),
+                    (SELECT COUNT(*) FROM {alias}.processos WHERE data_conclusao IS NULL),
+                    (SELECT COUNT(*) FROM {alias}.processos WHERE concluido = 1)
+            """)
+            parametros_caixa += [caixa, ontem, hoje]
+            consultas_tecnico.append(f"""
+                SELECT tecnico, 1 AS total FROM {alias}.processos
+                WHERE data_conclusao >= ? AND data_conclusao < ?
+            """)
+        parametros_tecnico += [inicio_mes, amanha]
+
+    por_caixa = conn.execute(" UNION ALL ".join(consultas_caixa), parametros_caixa).fetchall()
+    por_tecnico = conn.execute(f"""
+        SELECT tecnico, SUM(total) FROM ({" UNION ALL ".join(consultas_tecnico)})
+        GROUP BY tecnico
+    """, parametros_tecnico).fetchall()
+    return por_caixa, por_tecnico
+
+
+def panorama_caixas(dia=None):
+    """
+    Agrega os bancos de todas as caixas de RESPONSAVEIS_POR_CAIXA.
+
+    Os bancos são anexados (ATTACH) a uma conexão em memória, em grupos do
+    tamanho máximo permitido pelo SQLite, e cada grupo é lido com uma única
+    consulta por métrica.
+
+    Returns:
+        dict: {
+            "concluidos_ontem_por_caixa": {caixa: int},
+            "concluidos_mes_por_tecnico": {tecnico: int},
+            "abertos": int,
+            "concluidos": int,
+        }
+        Caixas sem banco ficam de fora.
+    """
+    dia = dia or date.today()
+    ontem = (dia - timedelta(days=1)).isoformat()
+    hoje = dia.isoformat()
+    amanha = (dia + timedelta(days=1)).isoformat()
+    inicio_mes = dia.replace(day=1).isoformat()
+
+    bancos = [(caixa, caminho_banco(caixa)) for caixa in CAIXAS]
+    bancos = [(caixa, caminho) for caixa, caminho in bancos if caminho is not None]
+
+    resultado = {
+        "concluidos_ontem_por_caixa": {},
+        "concluidos_mes_por_tecnico": {},
+        "abertos": 0,
+        "concluidos": 0,
+    }
+
+    conn = sqlite3.connect("file::memory:", uri=True)
+    try:
+        limite = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        for i in range(0, len(bancos), limite):
+            grupo = bancos[i:i + limite]
+            caixas = [caixa for caixa, _ in grupo]
+            try:
+                aliases = _anexar_bancos(conn, [caminho for _, caminho in grupo])
+                por_caixa, por_tecnico = _consultar_panorama(
+                    conn, caixas, aliases, ontem, hoje, inicio_mes, amanha
+                )
+            except sqlite3.Error as e:
+                logging.error(f"Erro ao consultar o panorama das caixas {caixas}: {e}")
+                continue
+            finally:
+                for alias in [nome for _, nome, _ in conn.execute("PRAGMA database_list").fetchall()]:
+                    if alias not in ("main", "temp"):
+                        conn.execute(f"DETACH DATABASE {alias}")
+
+            for caixa, concluidos_ontem, abertos, concluidos in por_caixa:
+                resultado["concluidos_ontem_por_caixa"][caixa] = concluidos_ontem
+                resultado["abertos"] += abertos
+                resultado["concluidos"] += concluidos
+            for tecnico, total in por_tecnico:
+                por_tecnico_total = resultado["concluidos_mes_por_tecnico"]
+                por_tecnico_total[tecnico] = por_tecnico_total.get(tecnico, 0) + total
+    finally:
+        conn.close()
+
+    return resultado
+
+
+def _chave_versao(caixa):
+    return f"metricas:versao:{caixa}"
+
+
+def _versao_caixa(caixa):
+    """Versão atual das métricas da caixa; criada na primeira leitura."""
+    versao = cache.get(_chave_versao(caixa))
+    if versao is None:
+        cache.add(_chave_versao(caixa), time.time_ns(), None)
+        versao = cache.get(_chave_versao(caixa))
+    return versao
+
+
+def versao_metricas(caixa):
+    """
+    Momento (UTC) da versão atual das métricas da caixa, ou None se o banco
+    não existir. A versão muda em invalidar_metricas, ao fim de uma captura
+    completa, e é a mesma que indexa o cache: serve de validador HTTP que só
+    muda quando o corpo servido muda. As gravações de página no meio de uma
+    captura não a alteram.
+    """
+    if caminho_banco(caixa) is None:
+        return None
+    return datetime.fromtimestamp(_versao_caixa(caixa) / 1e9, tz=timezone.utc)
+
+
+def invalidar_metricas(caixa):
+    """
+    Descarta as métricas em cache da caixa. Passado como ao_finalizar ao
+    OrquestradorCapturas, que o chama depois de gravar uma coleta completa.
+    """
+    cache.set(_chave_versao(caixa), time.time_ns(), None)
+    logging.info(f"Cache de métricas da caixa '{caixa}' invalidado.")
+
+
+def em_cache(caixa, chave, calcular):
+    """
+    Retorna o valor em cache para (caixa, chave) ou o calcula com calcular().
+    Resultados None (banco inexistente ou ilegível) não são guardados.
+    """
+    chave_completa = f"metricas:{caixa}:{_versao_caixa(caixa)}:{chave}"
+    valor = cache.get(chave_completa)
+    if valor is None:
+        valor = calcular()
+        if valor is not None:
+            cache.set(chave_completa, valor, settings.METRICAS_CACHE_TIMEOUT)
+    return valor
+
+
+def em_cache_global(chave, calcular):
+    """
+    Como em_cache, mas para métricas que cruzam todas as caixas: o valor é
+    descartado quando qualquer caixa recebe uma nova captura.
+    """
+    versoes = ":".join(str(_versao_caixa(caixa)) for caixa in CAIXAS)
+    assinatura = hashlib.sha1(versoes.encode()).hexdigest()
+    chave_completa = f"metricas:global:{assinatura}:{chave}"
+    valor = cache.get(chave_completa)
+    if valor is None:
+        valor = calcular()
+        if valor is not None:
+            cache.set(chave_completa, valor, settings.METRICAS_CACHE_TIMEOUT)
+    return valor
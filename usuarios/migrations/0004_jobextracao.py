@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0003_usuario_nivel_usuario_senha_alter_usuario_nome'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobExtracao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('captura', 'Captura de Processos'), ('passivo', 'Automação Passivo')], max_length=20)),
+                ('unidade', models.CharField(max_length=100)),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluido', 'Concluído'), ('falhou', 'Falhou')], default='pendente', max_length=20)),
+                ('solicitacoes', models.PositiveIntegerField(default=1)),
+                ('mensagens', models.TextField(blank=True, default='')),
+                ('criado_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciado_em', models.DateTimeField(blank=True, null=True)),
+                ('finalizado_em', models.DateTimeField(blank=True, null=True)),
+                ('solicitado_por', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='usuarios.usuario')),
+            ],
+            options={
+                'ordering': ['-criado_em'],
+                'indexes': [models.Index(fields=['status', 'criado_em'], name='usuarios_jo_status_96ae76_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['pendente', 'executando'])), fields=('tipo', 'unidade'), name='job_extracao_ativo_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 23:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0004_jobextracao'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobextracao',
+            name='worker',
+            field=models.CharField(blank=True, default='', max_length=150),
+        ),
+    ]
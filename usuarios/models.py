@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password, check_password
 
@@ -25,3 +26,96 @@ class Usuario(models.Model):
     
     def __str__(self):
         return f"{self.nome} ({self.nivel})"
+
+
+class JobExtracao(models.Model):
+    """
+    Pedido de extração feito na página /extracoes/. A view só enfileira; o
+    worker (manage.py processar_extracoes) executa os jobs pendentes em ordem.
+    """
+    TIPO_CHOICES = [
+        ("captura", "Captura de Processos"),
+        ("passivo", "Automação Passivo"),
+    ]
+    STATUS_CHOICES = [
+        ("pendente", "Pendente"),
+        ("executando", "Executando"),
+        ("concluido", "Concluído"),
+        ("falhou", "Falhou"),
+    ]
+    STATUS_ATIVOS = ("pendente", "executando")
+
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    unidade = models.CharField(max_length=100)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pendente")
+    solicitacoes = models.PositiveIntegerField(default=1)
+    solicitado_por = models.ForeignKey(Usuario, null=True, blank=True, on_delete=models.SET_NULL)
+    # Worker que reservou o job ("host:pid"), usado para recuperar os interrompidos
+    worker = models.CharField(max_length=150, blank=True, default="")
+    mensagens = models.TextField(blank=True, default="")
+    criado_em = models.DateTimeField(auto_now_add=True)
+    iniciado_em = models.DateTimeField(null=True, blank=True)
+    finalizado_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-criado_em"]
+        indexes = [models.Index(fields=["status", "criado_em"])]
+        constraints = [
+            # Um único job ativo por (tipo, unidade): cliques repetidos se juntam a ele
+            models.UniqueConstraint(
+                fields=["tipo", "unidade"],
+                condition=models.Q(status__in=["pendente", "executando"]),
+                name="job_extracao_ativo_unico",
+            ),
+        ]
+
+    @classmethod
+    def enfileirar(cls, tipo, unidade, usuario=None):
+        """
+        Cria um job pendente ou, se já houver um pendente ou em execução para
+        o mesmo (tipo, unidade), soma o pedido a ele.
+
+        Returns:
+            tuple: (job, criado)
+        """
+        for _ in range(2):
+            ativo = cls.objects.filter(tipo=tipo, unidade=unidade, status__in=cls.STATUS_ATIVOS).first()
+            if ativo is not None:
+                cls.objects.filter(pk=ativo.pk).update(solicitacoes=models.F("solicitacoes") + 1)
+                ativo.refresh_from_db()
+                return ativo, False
+            try:
+                with transaction.atomic():
+                    return cls.objects.create(tipo=tipo, unidade=unidade, solicitado_por=usuario), True
+            except IntegrityError:
+                # Outro pedido criou o job entre a consulta e o INSERT
+                continue
+        raise IntegrityError(f"Não foi possível enfileirar o job {tipo} da unidade {unidade}.")
+
+    def registrar(self, mensagem):
+        """Acrescenta uma linha às mensagens do job e grava."""
+        self.mensagens = f"{self.mensagens}\n{mensagem}".strip()
+        self.save(update_fields=["mensagens"])
+
+    def finalizar(self, sucesso):
+        self.status = "concluido" if sucesso else "falhou"
+        self.finalizado_em = timezone.now()
+        self.save(update_fields=["status", "finalizado_em"])
+
+    def como_dict(self):
+        return {
+            "id": self.id,
+            "tipo": self.tipo,
+            "tipo_nome": self.get_tipo_display(),
+            "unidade": self.unidade,
+            "status": self.status,
+            "status_nome": self.get_status_display(),
+            "solicitacoes": self.solicitacoes,
+            "mensagens": self.mensagens.splitlines(),
+            "criado_em": self.criado_em.isoformat() if self.criado_em else None,
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "finalizado_em": self.finalizado_em.isoformat() if self.finalizado_em else None,
+        }
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - {self.unidade} ({self.get_status_display()})"
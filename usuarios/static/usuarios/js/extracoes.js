@@ -0,0 +1,42 @@
+// Acompanha os jobs de extração ainda ativos, consultando a API de status
+// até que cada um termine (concluído ou falhou).
+const INTERVALO_CONSULTA_MS = 3000;
+const STATUS_ATIVOS = ["pendente", "executando"];
+
+function atualizarJob(item, job) {
+    item.dataset.status = job.status;
+    item.querySelector(".job-status").innerText = job.status_nome;
+
+    const lista = item.querySelector(".job-mensagens");
+    lista.replaceChildren(...job.mensagens.map(msg => {
+        const li = document.createElement("li");
+        li.innerText = msg;
+        return li;
+    }));
+}
+
+function acompanharJob(item) {
+    const consultar = () => {
+        fetch(item.dataset.url, { headers: { "Accept": "application/json" } })
+            .then(response => response.json())
+            .then(job => {
+                atualizarJob(item, job);
+                if (STATUS_ATIVOS.includes(job.status)) {
+                    setTimeout(consultar, INTERVALO_CONSULTA_MS);
+                }
+            })
+            .catch(err => {
+                console.error("Erro ao consultar o job de extração:", err);
+                setTimeout(consultar, INTERVALO_CONSULTA_MS * 2);
+            });
+    };
+    setTimeout(consultar, INTERVALO_CONSULTA_MS);
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll(".job-extracao").forEach(item => {
+        if (STATUS_ATIVOS.includes(item.dataset.status)) {
+            acompanharJob(item);
+        }
+    });
+});
@@ -28,7 +28,69 @@ function setSpeed(id, targetValue, targetAngle) {
 }
 
 
+const SVG_NS = 'http://www.w3.org/2000/svg';
+
+// Ponto do semicírculo correspondente a um valor entre 0 e o máximo do gauge
+function pontoNoArco(cx, cy, raio, fracao) {
+    const angulo = Math.PI * (1 - Math.min(Math.max(fracao, 0), 1));
+    return [cx + raio * Math.cos(angulo), cy - raio * Math.sin(angulo)];
+}
+
+function arcoSvg(cx, cy, raio, inicio, fim, cor, espessura) {
+    const [x1, y1] = pontoNoArco(cx, cy, raio, inicio);
+    const [x2, y2] = pontoNoArco(cx, cy, raio, fim);
+    const arco = document.createElementNS(SVG_NS, 'path');
+    arco.setAttribute('d', `M ${x1} ${y1} A ${raio} ${raio} 0 0 1 ${x2} ${y2}`);
+    arco.setAttribute('fill', 'none');
+    arco.setAttribute('stroke', cor);
+    arco.setAttribute('stroke-width', espessura);
+    return arco;
+}
+
+function textoSvg(x, y, conteudo, tamanho) {
+    const texto = document.createElementNS(SVG_NS, 'text');
+    texto.setAttribute('x', x);
+    texto.setAttribute('y', y);
+    texto.setAttribute('text-anchor', 'middle');
+    texto.setAttribute('font-size', tamanho);
+    texto.textContent = conteudo;
+    return texto;
+}
+
+// Desenha um gauge semicircular a partir dos números enviados pela view:
+// { id, titulo, valor, maximo, cor, faixas: [[inicio, fim, cor], ...] }
+function desenharGauge(gauge) {
+    const container = document.getElementById(gauge.id);
+    if (!container) {
+        console.error(`Container não encontrado para o gauge: ${gauge.id}`);
+        return;
+    }
+
+    const largura = 400, altura = 300, cx = 200, cy = 220, raio = 150;
+    const maximo = gauge.maximo > 0 ? gauge.maximo : 1;
+    const svg = document.createElementNS(SVG_NS, 'svg');
+    svg.setAttribute('viewBox', `0 0 ${largura} ${altura}`);
+    svg.setAttribute('width', '100%');
+
+    svg.appendChild(textoSvg(cx, 30, gauge.titulo, 18));
+    gauge.faixas.forEach(([inicio, fim, cor]) => {
+        svg.appendChild(arcoSvg(cx, cy, raio, inicio / maximo, fim / maximo, cor, 40));
+    });
+    if (gauge.valor > 0) {
+        svg.appendChild(arcoSvg(cx, cy, raio, 0, gauge.valor / maximo, gauge.cor, 14));
+    }
+    svg.appendChild(textoSvg(cx, cy - 10, gauge.valor, 48));
+    svg.appendChild(textoSvg(cx - raio, cy + 25, 0, 14));
+    svg.appendChild(textoSvg(cx + raio, cy + 25, maximo, 14));
+
+    container.replaceChildren(svg);
+}
+
 function initVelocimetros() {
+    const dados = document.getElementById('dados-gauges');
+    if (dados) {
+        JSON.parse(dados.textContent).forEach(desenharGauge);
+    }
     console.log('Velocímetros inicializados');
 }
 
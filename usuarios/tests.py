@@ -1,3 +1,1044 @@
-from django.test import TestCase
+import gc
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+import weakref
+from datetime import date, datetime, timedelta, timezone as tz
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+from selenium.common.exceptions import NoSuchFrameException, WebDriverException
+
+from Automacoes import SEI_Geral, passivoteste, ritmo, telemetria
+from Automacoes.instrumentacao import instrumentacao, instrumentar_driver
+from Automacoes.SEI_Geral import IframesSei, StatusLogin, gerenciador_frames
+from Automacoes.captura_http import ParserControleProcessos
+from Automacoes.sessao_sei import SessaoSeiPersistida
+from Automacoes.db_processos import (GerenciadorDB, MIGRACOES, _criar_tabela_processos,
+                                     _adicionar_data_conclusao, _criar_indices_painel)
+from usuarios import calendario, metricas
+from usuarios.jobs import proximos_jobs, recuperar_jobs_interrompidos
+from usuarios.config_caixas import RESPONSAVEIS_POR_CAIXA
+from usuarios.metricas import contar_concluidos, invalidar_metricas
+from usuarios.models import JobExtracao
+from usuarios.views import get_dados_panorama
+
+
+def processo(numero, tecnico, caixa="CAIXA"):
+    return {"processo_numero": numero, "email": tecnico, "tecnico": tecnico,
+            "caixa": caixa, "data": "2026-01-05", "hora": "10:00:00"}
+
+
+class GerenciadorDBTestCase(SimpleTestCase):
+    """GerenciadorDB num banco temporário."""
+
+    unidade = "UNIDADE"
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.db = GerenciadorDB(self.pasta, self.unidade)
+
+    def tearDown(self):
+        self.db.fechar()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+    def tecnico(self, numero):
+        return self.db.cursor.execute(
+            "SELECT tecnico FROM processos WHERE processo_numero = ?", (numero,)
+        ).fetchone()[0]
+
+    def capturar(self, *paginas):
+        captura_id, _ = self.db.iniciar_captura("selenium")
+        for indice, processos in enumerate(paginas):
+            self.db.gravar_pagina(captura_id, indice, processos)
+        return captura_id
+
+
+class GravarPaginaTests(GerenciadorDBTestCase):
+
+    def test_pagina_igual_a_captura_concluida_anterior_nao_e_regravada(self):
+        self.db.finalizar_captura(self.capturar([processo("1", "a")]))
+        captura_id, _ = self.db.iniciar_captura("selenium")
+
+        resumo = self.db.gravar_pagina(captura_id, 0, [processo("1", "a")])
+
+        self.assertEqual(resumo, {"inseridos": 0, "atualizados": 0, "inalterados": 1})
+
+    def test_pagina_regravada_depois_de_captura_abandonada(self):
+        self.db.finalizar_captura(self.capturar([processo("1", "a")]))
+        # Uma captura reatribui o processo e é abandonada antes de concluir
+        self.db.abandonar_captura(self.capturar([processo("1", "b")]))
+        self.assertEqual(self.tecnico("1"), "b")
+
+        # A listagem volta ao estado da última captura concluída
+        self.db.finalizar_captura(self.capturar([processo("1", "a")]))
+
+        self.assertEqual(self.tecnico("1"), "a")
+
+
+class MigracoesTests(GerenciadorDBTestCase):
+
+    def test_banco_novo_recebe_todas_as_migracoes(self):
+        versao = self.db.cursor.execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(versao, len(MIGRACOES))
+
+    def test_banco_na_versao_atual_nao_e_migrado_de_novo(self):
+        self.db.fechar()
+        with mock.patch("Automacoes.db_processos.logging.info") as log:
+            self.db = GerenciadorDB(self.pasta, self.unidade)
+
+        self.assertFalse(any("migrado" in str(chamada) for chamada in log.call_args_list))
+
+
+class MarcarConcluidosTests(GerenciadorDBTestCase):
+
+    def test_coleta_vazia_nao_conclui_o_estoque(self):
+        self.db.finalizar_captura(self.capturar([processo("1", "a")]))
+
+        self.assertEqual(self.db.marcar_concluidos([]), 0)
+        self.assertEqual(self.db.cursor.execute(
+            "SELECT concluido FROM processos WHERE processo_numero = '1'"
+        ).fetchone()[0], 0)
+
+    def test_so_os_processos_ausentes_sao_concluidos(self):
+        self.db.finalizar_captura(self.capturar([processo("1", "a"), processo("2", "a"), processo("3", "b")]))
+
+        self.assertEqual(self.db.marcar_concluidos(["1", "3"]), 1)
+        self.assertEqual(self.db.cursor.execute(
+            "SELECT processo_numero FROM processos WHERE concluido = 1 AND data_conclusao IS NOT NULL"
+        ).fetchall(), [("2",)])
+        # Um processo já concluído não tem a data de conclusão sobrescrita
+        self.assertEqual(self.db.marcar_concluidos(["1"]), 1)
+
+
+class FinalizarCapturaTests(GerenciadorDBTestCase):
+
+    def test_processo_ausente_de_todas_as_paginas_e_concluido(self):
+        self.db.finalizar_captura(self.capturar([processo("1", "a")], [processo("2", "a")]))
+
+        marcados = self.db.finalizar_captura(self.capturar([processo("2", "a")], [processo("3", "a")]))
+
+        self.assertEqual(marcados, 1)
+        self.assertEqual(self.db.cursor.execute(
+            "SELECT processo_numero FROM processos WHERE concluido = 1"
+        ).fetchall(), [("1",)])
+
+    def test_captura_retomada_continua_do_checkpoint(self):
+        captura_id = self.capturar([processo("1", "a")])
+        self.db.registrar_falha_captura(captura_id, "queda")
+
+        retomada, checkpoint = self.db.iniciar_captura("selenium")
+
+        self.assertEqual(retomada, captura_id)
+        self.assertEqual(checkpoint["pagina"], 0)
+
+
+class ReaberturaTests(GerenciadorDBTestCase):
+    """Processo concluído que volta à listagem."""
+
+    def situacao(self, numero):
+        return self.db.cursor.execute(
+            "SELECT concluido, data_conclusao FROM processos WHERE processo_numero = ?", (numero,)
+        ).fetchone()
+
+    def intervalos(self, numero):
+        return self.db.cursor.execute("""
+            SELECT tecnico, fim IS NULL, concluido FROM atribuicoes
+            WHERE processo_numero = ? ORDER BY id
+        """, (numero,)).fetchall()
+
+    def concluir_e_reabrir(self, tecnico):
+        self.db.finalizar_captura(self.capturar([processo("1", "a"), processo("2", "a")]))
+        self.db.finalizar_captura(self.capturar([processo("2", "a")]))
+        captura_id = self.capturar([processo("1", tecnico), processo("2", "a")])
+        self.db.finalizar_captura(captura_id)
+        return captura_id
+
+    def test_reaberto_com_a_mesma_atribuicao(self):
+        captura_id = self.concluir_e_reabrir("a")
+
+        self.assertEqual(self.situacao("1"), (0, None))
+        self.assertEqual(self.intervalos("1"), [("a", 0, 1), ("a", 1, 0)])
+        self.assertEqual(self.db.resumo_alteracoes(captura_id)["reaberto"], 1)
+
+    def test_reaberto_com_outro_tecnico_e_concluido_de_novo(self):
+        self.concluir_e_reabrir("b")
+        self.assertEqual(self.situacao("1"), (0, None))
+        self.assertEqual(self.intervalos("1"), [("a", 0, 1), ("b", 1, 0)])
+
+        self.db.finalizar_captura(self.capturar([processo("2", "a")]))
+
+        self.assertEqual(self.situacao("1")[0], 1)
+        self.assertIsNotNone(self.situacao("1")[1])
+        self.assertEqual(self.intervalos("1"), [("a", 0, 1), ("b", 0, 1)])
+        self.assertEqual(self.db.concluidos_no_periodo("2000-01-01", "2100-01-01", tecnico="b"), 1)
+
+
+class ConsultasAtribuicoesTests(GerenciadorDBTestCase):
+    """Consultas por período sobre o histórico de atribuições."""
+
+    def setUp(self):
+        super().setUp()
+        with self.db.conn:
+            self.db.cursor.executemany("""
+                INSERT INTO atribuicoes (processo_numero, email, tecnico, caixa, inicio, fim, concluido)
+                VALUES (?, ?, ?, 'CAIXA', ?, ?, ?)
+            """, [
+                # Reatribuído de a para b, que o concluiu
+                ("1", "a@x", "a", "2026-01-02 09:00:00", "2026-01-05 10:00:00", 0),
+                ("1", "b@x", "b", "2026-01-05 10:00:00", "2026-01-31 23:59:59", 1),
+                ("2", "a@x", "a", "2026-01-02 09:00:00", "2026-02-01 00:00:00", 1),
+                ("3", "a@x", "a", "2026-01-10 09:00:00", None, 0),
+            ])
+
+    def test_concluidos_no_periodo(self):
+        self.assertEqual(self.db.concluidos_no_periodo(date(2026, 1, 1), date(2026, 2, 1)), 1)
+        self.assertEqual(self.db.concluidos_no_periodo("2026-01-01", "2026-03-01"), 2)
+        self.assertEqual(self.db.concluidos_no_periodo("2026-01-01", "2026-03-01", tecnico="a"), 1)
+        self.assertEqual(self.db.concluidos_no_periodo("2026-01-01", "2026-03-01", emails=["b@x"]), 1)
+        self.assertEqual(self.db.concluidos_no_periodo("2026-01-01", "2026-03-01", emails=[]), 0)
+
+    def test_concluidos_por_tecnico_no_periodo(self):
+        self.assertEqual(self.db.concluidos_por_tecnico_no_periodo("2026-01-01", "2026-03-01"), {"a": 1, "b": 1})
+        self.assertEqual(self.db.concluidos_por_tecnico_no_periodo(date(2026, 1, 1), date(2026, 2, 1)), {"b": 1})
+
+    def test_historico_processo(self):
+        historico = self.db.historico_processo("1")
+
+        self.assertEqual([(h["tecnico"], h["concluido"]) for h in historico], [("a", 0), ("b", 1)])
+        self.assertEqual(historico[1]["inicio"], historico[0]["fim"])
+        self.assertEqual(self.db.historico_processo("inexistente"), [])
+
+
+class RelogioFalso:
+    """Substitui o módulo time do ritmo: sleep só avança o relógio."""
+
+    def __init__(self):
+        self.agora = 0.0
+        self.dormido = []
+
+    def monotonic(self):
+        return self.agora
+
+    def sleep(self, segundos):
+        self.dormido.append(segundos)
+        self.agora += segundos
+
+
+class RitmoTests(SimpleTestCase):
+
+    def setUp(self):
+        self.relogio = RelogioFalso()
+        patcher = mock.patch.object(ritmo, "time", self.relogio)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rajada_liberada_sem_espera_e_depois_na_taxa(self):
+        limitador = ritmo.LimitadorTaxa(taxa=2, rajada=3)
+
+        esperas = [limitador.aguardar() for _ in range(5)]
+
+        self.assertEqual(esperas, [0.0, 0.0, 0.0, 0.5, 0.5])
+        self.assertEqual(self.relogio.dormido, [0.5, 0.5])
+
+    def test_fichas_repostas_com_o_tempo_ate_a_rajada(self):
+        limitador = ritmo.LimitadorTaxa(taxa=1, rajada=2)
+        limitador.aguardar()
+        limitador.aguardar()
+
+        self.relogio.agora += 10
+
+        self.assertEqual([limitador.aguardar() for _ in range(3)], [0.0, 0.0, 1.0])
+
+    def test_taxa_zero_desativa_o_limite(self):
+        limitador = ritmo.LimitadorTaxa(taxa=0)
+
+        self.assertEqual([limitador.aguardar() for _ in range(10)], [0.0] * 10)
+        self.assertEqual(self.relogio.dormido, [])
+
+    def test_governador_contabiliza_as_esperas(self):
+        governador = ritmo.GovernadorRequisicoes("sei.teste", taxa=1, rajada=1)
+        for _ in range(3):
+            governador.aguardar()
+
+        self.assertEqual(governador.estatisticas(), {
+            "host": "sei.teste", "taxa": 1, "rajada": 1,
+            "acoes": 3, "acoes_limitadas": 2, "tempo_limitado": 2.0,
+        })
+
+    def test_um_governador_por_host(self):
+        self.addCleanup(ritmo._governadores.clear)
+        ritmo._governadores.clear()
+        with mock.patch.dict(os.environ, {"SEI_REQUISICOES_POR_SEGUNDO": "4", "SEI_RAJADA": "2"}):
+            sei = ritmo.governador()
+            self.assertIs(ritmo.governador(), sei)
+            outro = ritmo.governador("outro.host")
+
+        self.assertIsNot(outro, sei)
+        self.assertEqual((sei.taxa, sei.rajada), (4.0, 2))
+        self.assertEqual([e["host"] for e in ritmo.estatisticas_governadores()],
+                         [ritmo.HOST_SEI, "outro.host"])
+
+
+class MetricasDiariasTests(GerenciadorDBTestCase):
+
+    def test_carga_inicial_so_na_migracao(self):
+        self.db.fechar()
+        with mock.patch.object(GerenciadorDB, "atualizar_metricas_diarias") as atualizar:
+            self.db = GerenciadorDB(self.pasta, self.unidade)
+
+        # A tabela continua vazia (caixa sem atribuições), mas o banco já está na versão atual
+        atualizar.assert_not_called()
+
+    def test_estoque_conta_so_os_dias_em_que_a_atribuicao_estava_aberta(self):
+        with self.db.conn:
+            self.db.cursor.executemany("""
+                INSERT INTO atribuicoes (processo_numero, email, tecnico, caixa, inicio, fim, concluido)
+                VALUES (?, 'a@x', 'a', 'CAIXA', ?, ?, ?)
+            """, [
+                ("1", "2026-01-01 09:00:00", "2026-01-03 15:00:00", 1),
+                ("2", "2026-01-02 09:00:00", None, 0),
+                ("3", "2026-01-02 10:00:00", "2026-01-02 11:00:00", 1),
+            ])
+
+        self.db.atualizar_metricas_diarias(ate=date(2026, 1, 4))
+
+        linhas = self.db.cursor.execute("""
+            SELECT dia, concluidos, atribuidos, estoque FROM metricas_diarias ORDER BY dia
+        """).fetchall()
+        self.assertEqual(linhas, [
+            ("2026-01-01", 0, 1, 1),
+            ("2026-01-02", 1, 2, 2),
+            ("2026-01-03", 1, 0, 1),
+            ("2026-01-04", 0, 0, 1),
+        ])
+
+
+class CalendarioTests(SimpleTestCase):
+
+    def setUp(self):
+        calendario.recarregar()
+        self.addCleanup(calendario.recarregar)
+
+    def test_dias_uteis_contam_o_dia_1(self):
+        # Abril de 2026 começa numa quarta; 22 dias de semana menos o 21 (Tiradentes)
+        self.assertEqual(calendario.dias_uteis_mes(2026, 4), 21)
+        self.assertTrue(calendario.eh_dia_util(date(2026, 4, 1)))
+        self.assertFalse(calendario.eh_dia_util(date(2026, 4, 21)))
+
+    def test_feriados_do_df(self):
+        # Novembro de 2026: 21 dias de semana menos Finados e o Dia do Evangélico (DF)
+        self.assertEqual(calendario.dias_uteis_mes(2026, 11), 19)
+        self.assertFalse(calendario.eh_dia_util(date(2026, 11, 30)))
+
+    def test_pontos_facultativos(self):
+        with mock.patch.object(calendario, "PONTOS_FACULTATIVOS", ["2026-04-20"]):
+            calendario.recarregar()
+            self.assertEqual(calendario.dias_uteis_mes(2026, 4), 20)
+            self.assertFalse(calendario.eh_dia_util(date(2026, 4, 20)))
+
+    def test_mes_fora_da_tabela(self):
+        self.assertEqual(calendario.dias_uteis_mes(date.today().year + 10, 4),
+                         calendario._calcular_mes(date.today().year + 10, 4, set()))
+
+
+class TelemetriaTests(SimpleTestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+        self.caminho = Path(self.pasta) / "telemetria.db"
+        patcher = mock.patch.dict(os.environ, {"TELEMETRIA_DB": str(self.caminho)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def gravar(self, unidade, iniciada_em, duracao, sucesso=1, etapas=()):
+        conn = telemetria._conectar(self.caminho)
+        with conn:
+            run_id = conn.execute("""
+                INSERT INTO capture_runs (unidade, motor, iniciada_em, duracao, sucesso)
+                VALUES (?, 'selenium', ?, ?, ?)
+            """, (unidade, iniciada_em.strftime(telemetria.FORMATO_DATA_HORA), duracao, sucesso)).lastrowid
+            conn.executemany("""
+                INSERT INTO capture_stages (run_id, etapa, duracao, sucesso) VALUES (?, ?, ?, 1)
+            """, [(run_id, nome, segundos) for nome, segundos in etapas])
+        conn.close()
+
+    def test_percentil_pelo_posto_mais_proximo(self):
+        valores = list(range(1, 21))
+        self.assertEqual(telemetria._percentil(valores, 50), 10)
+        self.assertEqual(telemetria._percentil(valores, 95), 19)
+        self.assertEqual(telemetria._percentil([7], 95), 7)
+        self.assertIsNone(telemetria._percentil([], 50))
+
+    def test_etapas_gravadas_com_a_execucao(self):
+        with telemetria.etapa("fora"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with telemetria.execucao("A", "http"):
+                with telemetria.etapa("login"):
+                    pass
+                with telemetria.etapa("pagina", pagina=2):
+                    raise RuntimeError("queda")
+
+        conn = sqlite3.connect(self.caminho)
+        runs = conn.execute("SELECT unidade, motor, sucesso, erro FROM capture_runs").fetchall()
+        etapas = conn.execute("SELECT etapa, pagina, sucesso FROM capture_stages ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual(runs, [("A", "http", 0, "RuntimeError: queda")])
+        # A etapa medida fora de uma execução é descartada
+        self.assertEqual(etapas, [("login", None, 1), ("pagina", 2, 0)])
+
+    def test_resumo_etapas_por_unidade(self):
+        agora = datetime.now()
+        for segundos in (1, 2, 3, 4):
+            self.gravar("A", agora, segundos * 10, etapas=[("login", segundos), ("pagina", segundos * 5)])
+        self.gravar("B", agora, 5, etapas=[("login", 9)])
+        self.gravar("A", agora - timedelta(days=30), 5, etapas=[("login", 100)])
+
+        resumo = telemetria.resumo_etapas(dias=7)
+
+        self.assertEqual([(l["unidade"], l["etapa"]) for l in resumo],
+                         [("A", "pagina"), ("A", "login"), ("B", "login")])
+        self.assertEqual(resumo[1], {"unidade": "A", "etapa": "login", "quantidade": 4,
+                                     "p50": 2, "p95": 4, "total": 10})
+        self.assertEqual([l["unidade"] for l in telemetria.resumo_etapas(dias=7, unidade="B")], ["B"])
+
+    def test_resumo_execucoes_por_dia(self):
+        hoje = datetime.now()
+        ontem = hoje - timedelta(days=1)
+        self.gravar("A", hoje, 10)
+        self.gravar("A", hoje, 30, sucesso=0)
+        self.gravar("A", ontem, 20)
+
+        resumo = telemetria.resumo_execucoes(dias=7)
+
+        self.assertEqual([(l["dia"], l["quantidade"], l["p50"], l["p95"], l["falhas"]) for l in resumo], [
+            (hoje.date().isoformat(), 2, 10, 30, 1),
+            (ontem.date().isoformat(), 1, 20, 20, 0),
+        ])
+
+    def test_sem_banco_resumos_vazios(self):
+        self.assertEqual(telemetria.resumo_etapas(), [])
+        self.assertEqual(telemetria.resumo_execucoes(), [])
+
+
+class ParserControleProcessosTests(SimpleTestCase):
+
+    HTML = """
+        <form id="frmProcedimentoControlar" action="controlador.php?acao=procedimento_controlar">
+          <input type="hidden" name="hdnInfraPaginaAtual" value="0">
+          <input type="submit" name="sbmPesquisar" value="Pesquisar">
+          <input type="checkbox" name="chkDesmarcado" value="S">
+          <select name="selTipo"><option value="1">Um<option value="2" selected>Dois</select>
+          <select name="selSemMarcada"><option>Primeira</option><option>Segunda</option></select>
+          <textarea name="txaObservacao">linha 1
+linha 2</textarea>
+          <a id="lnkInfraProximaPaginaSuperior" href="#"
+             onclick="infraAcaoPaginar('+',0,'Infra', null);">Próxima</a>
+          <table id="tblProcessosDetalhado"><tbody>
+            <tr><td><a>12345.000001/2026-01</a></td><td><a>tecnico</a></td></tr>
+          </tbody></table>
+        </form>
+    """
+
+    def setUp(self):
+        self.pagina = ParserControleProcessos()
+        self.pagina.feed(self.HTML)
+        self.pagina.close()
+
+    def test_paginacao_lida_do_onclick(self):
+        self.assertIn("infraAcaoPaginar", self.pagina.proxima_pagina)
+
+    def test_campos_enviados_pelo_formulario(self):
+        self.assertEqual(self.pagina.form_campos, {
+            "hdnInfraPaginaAtual": "0",
+            "selTipo": "2",
+            "selSemMarcada": "Primeira",
+            "txaObservacao": "linha 1\nlinha 2",
+        })
+
+    def test_linhas_da_tabela(self):
+        self.assertEqual(self.pagina.linhas, [["12345.000001/2026-01", "tecnico"]])
+
+
+class ContarConcluidosTests(SimpleTestCase):
+    """contar_concluidos antes e depois da migração que cria metricas_diarias."""
+
+    caixa = "CAIXA"
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        patcher = mock.patch.object(metricas, "BASE_PATH", Path(self.pasta))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+
+        # Banco legado (versão 3): só a tabela processos
+        hoje = date.today().isoformat()
+        (Path(self.pasta) / self.caixa).mkdir()
+        self.caminho = Path(self.pasta) / self.caixa / f"{self.caixa}.db"
+        conn = sqlite3.connect(self.caminho)
+        for migracao in (_criar_tabela_processos, _adicionar_data_conclusao, _criar_indices_painel):
+            migracao(conn.cursor())
+        conn.executemany("""
+            INSERT INTO processos (processo_numero, email, data, hora, caixa, tecnico, concluido, data_conclusao)
+            VALUES (?, 'a', ?, '08:00:00', ?, 'a', ?, ?)
+        """, [("1", hoje, self.caixa, 1, f"{hoje} 09:00:00"), ("2", hoje, self.caixa, 0, None)])
+        conn.execute("PRAGMA user_version = 3")
+        conn.commit()
+        conn.close()
+
+    def migrar(self):
+        GerenciadorDB(self.pasta, self.caixa).fechar()
+
+    def test_banco_legado(self):
+        self.assertEqual(contar_concluidos(self.caixa, "a"), {"concluidos": 1, "hoje": 1, "estoque": 1})
+
+    def test_banco_das_capturas_tem_preferencia_sobre_o_arquivo_legado(self):
+        legado = Path(self.pasta) / f"{self.caixa}_tecnicos.db"
+        legado.touch()
+
+        self.assertEqual(metricas.caminho_banco(self.caixa), self.caminho)
+        self.caminho.unlink()
+        self.assertEqual(metricas.caminho_banco(self.caixa), legado)
+
+    def test_banco_migrado_le_a_consolidacao_preenchida_na_abertura(self):
+        self.migrar()
+
+        conn = sqlite3.connect(self.caminho)
+        linhas = conn.execute("SELECT COUNT(*) FROM metricas_diarias").fetchone()[0]
+        conn.close()
+        self.assertGreater(linhas, 0)
+        self.assertEqual(contar_concluidos(self.caixa, "a"), {"concluidos": 1, "hoje": 1, "estoque": 1})
+
+    def test_consolidacao_vazia_conta_na_tabela_processos(self):
+        self.migrar()
+        conn = sqlite3.connect(self.caminho)
+        conn.execute("DELETE FROM metricas_diarias")
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(contar_concluidos(self.caixa, "a"), {"concluidos": 1, "hoje": 1, "estoque": 1})
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class PanoramaTests(SimpleTestCase):
+    """panorama_caixas com mais caixas do que cabem num grupo de ATTACH."""
+
+    dia = date(2026, 1, 15)
+    caixas = [f"CAIXA{i}" for i in range(5)]
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+        for patcher in (mock.patch.object(metricas, "BASE_PATH", Path(self.pasta)),
+                        mock.patch.object(metricas, "CAIXAS", self.caixas)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # Três bancos migrados e dois legados, só com a tabela processos
+        for caixa in self.caixas[:3]:
+            db = GerenciadorDB(self.pasta, caixa)
+            with db.conn:
+                db.cursor.executemany("""
+                    INSERT INTO atribuicoes (processo_numero, email, tecnico, caixa, inicio, fim, concluido)
+                    VALUES (?, ?, ?, ?, '2026-01-10 09:00:00', ?, ?)
+                """, [("1", "a@x", "a", caixa, "2026-01-14 10:00:00", 1),
+                      ("2", "b@x", "b", caixa, None, 0)])
+            db.atualizar_metricas_diarias(ate=self.dia)
+            db.fechar()
+        for caixa in self.caixas[3:]:
+            conn = sqlite3.connect(Path(self.pasta) / f"{caixa}_tecnicos.db")
+            for migracao in (_criar_tabela_processos, _adicionar_data_conclusao, _criar_indices_painel):
+                migracao(conn.cursor())
+            conn.executemany("""
+                INSERT INTO processos (processo_numero, email, caixa, tecnico, concluido, data_conclusao)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [("1", "a@x", caixa, "a", 1, "2026-01-14 10:00:00"), ("2", "b@x", caixa, "b", 0, None)])
+            conn.commit()
+            conn.close()
+
+    def test_grupos_de_attach_somados(self):
+        conectar = sqlite3.connect
+
+        def conectar_com_limite(*args, **kwargs):
+            conn = conectar(*args, **kwargs)
+            conn.setlimit(sqlite3.SQLITE_LIMIT_ATTACHED, 2)
+            return conn
+
+        with mock.patch.object(metricas.sqlite3, "connect", conectar_com_limite), \
+                mock.patch.object(metricas, "_anexar_bancos", wraps=metricas._anexar_bancos) as anexar:
+            panorama = metricas.panorama_caixas(self.dia)
+
+        self.assertEqual(anexar.call_count, 3)
+        self.assertEqual(panorama, {
+            "concluidos_ontem_por_caixa": {caixa: 1 for caixa in self.caixas},
+            "concluidos_mes_por_tecnico": {"a": 5},
+            "abertos": 5,
+            "concluidos": 5,
+        })
+
+    def test_cache_do_panorama_renovado_por_qualquer_caixa(self):
+        with mock.patch("usuarios.views.panorama_caixas", return_value={"abertos": 1}) as calcular:
+            get_dados_panorama()
+            self.assertEqual(get_dados_panorama(), {"abertos": 1})
+            self.assertEqual(calcular.call_count, 1)
+
+            invalidar_metricas(self.caixas[-1])
+            get_dados_panorama()
+
+        self.assertEqual(calcular.call_count, 2)
+
+
+class FilaJobsTests(TestCase):
+
+    def test_pedido_repetido_e_juntado_ao_job_ativo(self):
+        job, criado = JobExtracao.enfileirar("captura", "A")
+        repetido, criado_de_novo = JobExtracao.enfileirar("captura", "A")
+
+        self.assertTrue(criado)
+        self.assertFalse(criado_de_novo)
+        self.assertEqual(repetido.pk, job.pk)
+        self.assertEqual(repetido.solicitacoes, 2)
+        self.assertTrue(JobExtracao.enfileirar("passivo", "A")[1])
+
+    def test_pedido_depois_do_fim_cria_outro_job(self):
+        job, _ = JobExtracao.enfileirar("captura", "A")
+        job.finalizar(True)
+
+        novo, criado = JobExtracao.enfileirar("captura", "A")
+
+        self.assertTrue(criado)
+        self.assertNotEqual(novo.pk, job.pk)
+
+    def test_capturas_pendentes_sao_reservadas_no_mesmo_lote(self):
+        for unidade in ("A", "B", "C"):
+            JobExtracao.enfileirar("captura", unidade)
+        JobExtracao.enfileirar("passivo", "A")
+
+        lote = proximos_jobs()
+
+        self.assertEqual(sorted(job.unidade for job in lote), ["A", "B", "C"])
+        self.assertTrue(all(job.status == "executando" for job in lote))
+        self.assertEqual([job.tipo for job in proximos_jobs()], ["passivo"])
+        self.assertEqual(proximos_jobs(), [])
+
+    def executando(self, unidade, worker, horas=0):
+        job, _ = JobExtracao.enfileirar("captura", unidade)
+        JobExtracao.objects.filter(pk=job.pk).update(
+            status="executando", worker=worker, iniciado_em=timezone.now() - timedelta(hours=horas)
+        )
+        return job
+
+    def test_recuperacao_so_atinge_jobs_de_workers_parados(self):
+        host = socket.gethostname()
+        self.executando("A", f"{host}:{os.getppid()}")
+        self.executando("B", f"{host}:{os.getpid()}")
+        self.executando("C", "outra-maquina:1")
+        self.executando("D", "outra-maquina:2", horas=24)
+
+        self.assertEqual(recuperar_jobs_interrompidos(), 2)
+
+        status = dict(JobExtracao.objects.values_list("unidade", "status"))
+        self.assertEqual(status, {"A": "executando", "B": "falhou", "C": "executando", "D": "falhou"})
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ApiMetricasTests(SimpleTestCase):
+
+    caixa = next(iter(RESPONSAVEIS_POR_CAIXA))
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        patcher = mock.patch.object(metricas, "BASE_PATH", Path(self.pasta))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+        self.db = GerenciadorDB(self.pasta, self.caixa)
+        self.addCleanup(self.db.fechar)
+
+    def etag(self):
+        resposta = self.client.get(reverse("api_metricas", args=[self.caixa]))
+        self.assertEqual(resposta.status_code, 200)
+        return resposta["ETag"]
+
+    def test_etag_so_muda_ao_fim_da_captura(self):
+        antes = self.etag()
+
+        # Páginas gravadas por uma captura em andamento mudam o arquivo, não a versão
+        captura_id, _ = self.db.iniciar_captura("selenium")
+        self.db.gravar_pagina(captura_id, 0, [processo("1", "a")])
+        os.utime(self.db.db_path, (0, 4102444800))
+        self.assertEqual(self.etag(), antes)
+
+        self.db.finalizar_captura(captura_id)
+        invalidar_metricas(self.caixa)
+        depois = self.etag()
+
+        self.assertNotEqual(depois, antes)
+        resposta = self.client.get(reverse("api_metricas", args=[self.caixa]), HTTP_IF_NONE_MATCH=depois)
+        self.assertEqual(resposta.status_code, 304)
+
+
+class ApiPanoramaTests(TestCase):
+
+    def test_sem_permissao_recebe_403_mesmo_com_if_modified_since(self):
+        ultima = datetime(2026, 1, 5, 12, 0, tzinfo=tz.utc)
+        with mock.patch("usuarios.views.versao_metricas", return_value=ultima):
+            resposta = self.client.get(reverse("api_panorama"),
+                                       HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 2099 00:00:00 GMT")
+
+        self.assertEqual(resposta.status_code, 403)
+        self.assertNotIn("Last-Modified", resposta)
+
+
+class DriverFalso:
+    """Registra os comandos recebidos; basta para o GerenciadorFrames."""
+
+    def __init__(self):
+        self.comandos = []
+        self.falhas = {}
+        self.switch_to = SwitchTo(self)
+
+    def execute(self, comando, params=None):
+        self.comandos.append(comando)
+        if comando in self.falhas:
+            raise self.falhas[comando]
+        return {"value": None}
+
+    def find_element(self, by, valor):
+        self.execute("findElement", {"using": by, "value": valor})
+        return valor
+
+
+class GerenciadorFramesTests(SimpleTestCase):
+
+    def test_troca_para_o_frame_atual_e_pulada(self):
+        driver = DriverFalso()
+        IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+        comandos = len(driver.comandos)
+
+        IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+
+        self.assertEqual(len(driver.comandos), comandos)
+
+    def test_clique_preserva_o_frame_conhecido(self):
+        driver = DriverFalso()
+        IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+        driver.execute("clickElement", {})
+        driver.execute("w3cExecuteScript", {"script": "return 1;"})
+        comandos = len(driver.comandos)
+
+        IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+
+        self.assertEqual(len(driver.comandos), comandos)
+        self.assertEqual(gerenciador_frames(driver).trocas_evitadas, 1)
+
+    def test_navegacao_e_troca_de_janela_invalidam_o_frame(self):
+        for comando in ("get", "refresh", "switchToWindow"):
+            driver = DriverFalso()
+            IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+            driver.execute(comando, {})
+
+            self.assertIsNone(gerenciador_frames(driver).caminho, comando)
+
+    def test_frame_inexistente_invalida_o_frame(self):
+        driver = DriverFalso()
+        IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+        driver.falhas["findElement"] = NoSuchFrameException("frame removido")
+
+        with self.assertRaises(NoSuchFrameException):
+            driver.execute("findElement", {})
+        self.assertIsNone(gerenciador_frames(driver).caminho)
+
+    def test_instrumentacao_mede_so_os_comandos_enviados(self):
+        # A posição na cadeia não depende da ordem de instalação
+        for instalar in ((instrumentar_driver, gerenciador_frames), (gerenciador_frames, instrumentar_driver)):
+            driver = DriverFalso()
+            for instalador in instalar:
+                instalador(driver)
+            with instrumentacao(exportar=False) as gravador:
+                gerenciador_frames(driver).ir_para(None)
+                driver.switch_to.default_content()
+
+            comandos = [e["name"] for e in gravador.eventos if e["cat"] == "comando"]
+            self.assertEqual(comandos, driver.comandos)
+            self.assertEqual(gerenciador_frames(driver).trocas_evitadas, 1)
+
+    def test_driver_e_coletado_com_o_gerenciador(self):
+        driver = DriverFalso()
+        gerenciador_frames(driver)
+        referencia = weakref.ref(driver)
+
+        del driver
+        gc.collect()
+
+        self.assertIsNone(referencia())
+
+
+class InstrumentacaoTests(SimpleTestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+
+    def test_trace_e_pilhas_dobradas_dos_page_objects(self):
+        driver = instrumentar_driver(DriverFalso())
+        destino = Path(self.pasta) / "trace"
+
+        with instrumentacao(destino) as gravador:
+            IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+            SEI_Geral.time.sleep(0)
+
+        with open(destino.with_suffix(".json"), encoding="utf-8") as arquivo:
+            trace = json.load(arquivo)
+        eventos = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+        self.assertEqual({e["name"] for e in trace["traceEvents"] if e["ph"] == "M"}, {"thread_name"})
+        self.assertIn("IframesSei.navegar_iframes_sei",
+                      {e["name"] for e in eventos if e["cat"] == "metodo"})
+        self.assertEqual([e["name"] for e in eventos if e["cat"] == "comando"], driver.comandos)
+        self.assertIn("until:frame_to_be_available_and_switch_to_it",
+                      {e["name"] for e in eventos if e["cat"] == "espera"})
+        self.assertEqual([e["name"] for e in eventos if e["cat"] == "pausa"], ["sleep"])
+
+        with open(destino.with_suffix(".folded"), encoding="utf-8") as arquivo:
+            pilhas = [linha.rsplit(" ", 1) for linha in arquivo.read().splitlines()]
+        self.assertTrue(pilhas)
+        for pilha, microssegundos in pilhas:
+            self.assertTrue(microssegundos.isdigit())
+        self.assertTrue(any(pilha.startswith("IframesSei.navegar_iframes_sei;") and pilha.endswith(";switchToFrame")
+                            for pilha, _ in pilhas))
+        self.assertEqual(gravador.pilhas_dobradas(), [" ".join(p) for p in pilhas])
+
+    def test_so_mede_drivers_e_threads_instrumentados(self):
+        driver = DriverFalso()
+
+        def outra_thread():
+            SEI_Geral.time.sleep(0)
+
+        with instrumentacao(exportar=False) as gravador:
+            IframesSei(driver, "Arvore documentos").navegar_iframes_sei()
+            thread = threading.Thread(target=outra_thread)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(gravador.eventos, [])
+        self.assertIs(SEI_Geral.time, time)
+
+
+class NavegadorSeiFalso:
+    """Navegador com cookies e o teste de sessão de AutomacaoPassivo.sessao_ativa."""
+
+    def __init__(self, cookies=None, autenticado=False, unidade=None):
+        self.cookies = list(cookies or [])
+        self.autenticado = autenticado
+        self.unidade = unidade
+        self.paginas = []
+        self.switch_to = mock.Mock()
+        self.falha_script = None
+
+    def get(self, url):
+        self.paginas.append(url)
+
+    def get_cookies(self):
+        return [dict(cookie) for cookie in self.cookies]
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def execute_script(self, script, *args):
+        if self.falha_script:
+            raise self.falha_script
+        return self.autenticado
+
+    def find_elements(self, by, valor):
+        if valor != passivoteste.AutomacaoPassivo.SELETOR_UNIDADE_ATUAL or self.unidade is None:
+            return []
+        return [mock.Mock(text=f" {self.unidade} ")]
+
+
+COOKIES_SEI = [{"name": "PHPSESSID", "value": "abc123", "sameSite": "Lax"},
+               {"name": "SIP_ID", "value": "xyz", "sameSite": "desconhecido"}]
+
+
+class SessaoSeiPersistidaTests(SimpleTestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+        ambiente = mock.patch.dict(os.environ, {"SESSAO_SEI_DIR": self.pasta})
+        ambiente.start()
+        self.addCleanup(ambiente.stop)
+        os.environ.pop("SESSAO_SEI_CHAVE", None)
+
+    def sessao(self, senha="senha"):
+        return SessaoSeiPersistida("usuario", senha, pasta=self.pasta)
+
+    def test_cookies_salvos_criptografados_e_restaurados(self):
+        self.sessao().salvar(NavegadorSeiFalso(COOKIES_SEI))
+        with open(self.sessao().arquivo, "rb") as arquivo:
+            self.assertNotIn(b"abc123", arquivo.read())
+
+        navegador = NavegadorSeiFalso([{"name": "antigo", "value": "1"}])
+        self.assertTrue(self.sessao().restaurar_no_driver(navegador))
+
+        self.assertEqual(navegador.cookies, [{"name": "PHPSESSID", "value": "abc123", "sameSite": "Lax"},
+                                             {"name": "SIP_ID", "value": "xyz"}])
+        self.assertEqual(navegador.paginas, [SessaoSeiPersistida.URL_SEI] * 2)
+
+    def test_chave_derivada_do_usuario_e_da_senha(self):
+        chave = SessaoSeiPersistida._chave("usuario", "senha")
+
+        self.assertEqual(chave, SessaoSeiPersistida._chave("usuario", "senha"))
+        self.assertNotEqual(chave, SessaoSeiPersistida._chave("usuario", "outra"))
+        self.assertNotEqual(chave, SessaoSeiPersistida._chave("outro", "senha"))
+        with mock.patch.dict(os.environ, {"SESSAO_SEI_CHAVE": "chave-configurada"}):
+            self.assertEqual(SessaoSeiPersistida._chave("usuario", "senha"), b"chave-configurada")
+
+    def test_sessao_de_outra_senha_e_descartada(self):
+        self.sessao("antiga").salvar(NavegadorSeiFalso(COOKIES_SEI))
+        sessao = self.sessao("nova")
+
+        self.assertIsNone(sessao.carregar())
+        self.assertFalse(os.path.exists(sessao.arquivo))
+
+    def test_arquivo_corrompido_e_descartado(self):
+        sessao = self.sessao()
+        with open(sessao.arquivo, "wb") as arquivo:
+            arquivo.write(b"corrompido")
+
+        self.assertFalse(sessao.restaurar_no_driver(NavegadorSeiFalso()))
+        self.assertFalse(os.path.exists(sessao.arquivo))
+
+
+@mock.patch.object(passivoteste.AutomacaoPassivo, "_configurar_logging", lambda self: None)
+class AutomacaoPassivoTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pasta, True)
+        ambiente = mock.patch.dict(os.environ, {"SESSAO_SEI_DIR": self.pasta, "SESSAO_SEI_PERSISTIR": "1"})
+        ambiente.start()
+        self.addCleanup(ambiente.stop)
+        os.environ.pop("SESSAO_SEI_CHAVE", None)
+
+        self.login = mock.patch.object(passivoteste, "LoginSei").start()
+        self.addCleanup(mock.patch.stopall)
+        self.login.return_value.logar_sei.return_value = StatusLogin.SUCESSO
+        self.login.return_value.verificar_login_bem_sucedido.return_value = True
+
+    def automacao(self, navegador):
+        automacao = passivoteste.AutomacaoPassivo("usuario", "senha", "UNIDADE")
+        automacao.driver = navegador
+        return automacao
+
+
+class LoginPassivoTests(AutomacaoPassivoTestCase):
+
+    def test_sessao_salva_dispensa_o_login(self):
+        self.automacao(NavegadorSeiFalso(COOKIES_SEI, autenticado=True))._salvar_sessao()
+        automacao = self.automacao(NavegadorSeiFalso(autenticado=True))
+
+        self.assertTrue(automacao._realizar_login())
+        self.assertTrue(automacao.sessao_restaurada)
+        self.login.assert_not_called()
+
+    def test_sessao_corrompida_cai_no_login_normal(self):
+        automacao = self.automacao(NavegadorSeiFalso(COOKIES_SEI))
+        with open(automacao.sessao_persistida.arquivo, "wb") as arquivo:
+            arquivo.write(b"corrompido")
+
+        self.assertTrue(automacao._realizar_login())
+
+        self.login.assert_called_once_with(automacao.driver, "usuario", "senha")
+        self.assertFalse(automacao.sessao_restaurada)
+        self.assertEqual(automacao.sessao_persistida.carregar(), COOKIES_SEI)
+
+
+class TrocaUnidadeTests(AutomacaoPassivoTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.navegador = NavegadorSeiFalso(autenticado=True, unidade="ORIGEM")
+        self.selecao = mock.patch.object(passivoteste, "SelecaoUnidade").start()
+        self.selecao.return_value.selecionar_unidade_sei.side_effect = self.selecionar
+        mock.patch.object(passivoteste, "TelaAviso").start()
+        mock.patch.object(passivoteste.time, "sleep").start()
+        self.login.return_value.logar_sei.side_effect = self.logar
+
+    def selecionar(self):
+        self.navegador.unidade = self.selecao.call_args.args[2]
+
+    def logar(self):
+        self.navegador.autenticado = True
+        return StatusLogin.SUCESSO
+
+    def test_sessao_ativa(self):
+        automacao = self.automacao(self.navegador)
+        self.assertTrue(automacao.sessao_ativa())
+
+        self.navegador.autenticado = False
+        self.assertFalse(automacao.sessao_ativa())
+
+        self.navegador.falha_script = WebDriverException("navegador fechado")
+        self.assertFalse(automacao.sessao_ativa())
+        self.assertFalse(self.automacao(None).sessao_ativa())
+
+    def test_unidade_ja_selecionada_nao_e_trocada(self):
+        automacao = self.automacao(self.navegador)
+
+        self.assertTrue(automacao.trocar_unidade("ORIGEM"))
+        self.selecao.assert_not_called()
+        self.login.assert_not_called()
+
+    def test_troca_confirmada_pela_barra_superior(self):
+        automacao = self.automacao(self.navegador)
+
+        self.assertTrue(automacao.trocar_unidade("DESTINO"))
+
+        self.assertEqual(automacao.unidade, "DESTINO")
+        self.assertEqual(automacao.unidade_atual(), "DESTINO")
+        self.navegador.switch_to.default_content.assert_called_once_with()
+
+    def test_troca_nao_confirmada(self):
+        self.selecao.return_value.selecionar_unidade_sei.side_effect = None
+        automacao = self.automacao(self.navegador)
+        automacao.TIMEOUT_TROCA_UNIDADE = 0
+
+        self.assertFalse(automacao.trocar_unidade("DESTINO"))
+        self.assertEqual(automacao.unidade_atual(), "ORIGEM")
+
+    def test_sessao_expirada_refaz_o_login_antes_da_troca(self):
+        self.navegador.autenticado = False
+        automacao = self.automacao(self.navegador)
+
+        self.assertTrue(automacao.trocar_unidade("DESTINO"))
+
+        self.login.assert_called_once_with(self.navegador, "usuario", "senha")
+        passivoteste.TelaAviso.assert_called_once_with(self.navegador)
+        self.assertEqual(self.navegador.unidade, "DESTINO")
+
+    def test_sem_login_nao_troca(self):
+        self.navegador.autenticado = False
+        self.login.return_value.logar_sei.side_effect = None
+        self.login.return_value.logar_sei.return_value = StatusLogin.CREDENCIAIS_INVALIDAS
+        automacao = self.automacao(self.navegador)
+
+        self.assertFalse(automacao.garantir_sessao())
+        self.assertFalse(automacao.trocar_unidade("DESTINO"))
+        self.selecao.assert_not_called()
@@ -1,27 +1,24 @@
 import os
-import sqlite3
-import pandas as pd
-import plotly.graph_objects as go
-import random
+import hashlib
 import json
-import time
 import logging
+from functools import wraps
 from pathlib import Path
-from datetime import date, timedelta
+from datetime import date, datetime, timezone
 
-from django.http import HttpResponseForbidden
+from django.http import HttpResponseForbidden, JsonResponse
+from django.views.decorators.http import condition, require_GET
 from django.shortcuts import render, redirect
 from django.conf import settings
 from django.views import View
 from django.contrib import messages
 from dotenv import load_dotenv
-from workalendar.america import Brazil
 
-from .models import Usuario
-from .config_caixas import RESPONSAVEIS_POR_CAIXA, METAS_POR_CAIXA, BASE_PATH
-from Automacoes.captura_processos import CapturaProcessos
-from Automacoes.db_processos import GerenciadorDB
-from Automacoes.passivoteste import AutomacaoPassivo
+from .models import JobExtracao, Usuario
+from .config_caixas import RESPONSAVEIS_POR_CAIXA, METAS_POR_CAIXA
+from .metricas import contar_concluidos, em_cache, em_cache_global, panorama_caixas, versao_metricas
+from .calendario import dias_uteis_mes
+from Automacoes.telemetria import resumo_etapas, resumo_execucoes
 
 load_dotenv(override=True)
 logging.basicConfig(
@@ -38,74 +35,51 @@ CODIGOS_NIVEL = {
 
 
 def extracoes(request):
-    """View para executar automações de extração de dados."""
-    mensagens = []
+    """
+    View para pedir a execução das automações de extração de dados.
 
-    if request.method == "POST":
-        automacoes_selecionadas = request.POST.getlist("automacoes")
-
-        try:
-            USUARIO = os.getenv("USER_EMAIL")
-            SENHA = os.getenv("USER_PASSWORD")
-            UNIDADE = os.getenv("UNIDADE")
-            BASES_DADOS_DIR = settings.BASES_DADOS_DIR
-
-            db = GerenciadorDB(base_dir=BASES_DADOS_DIR, unidade=UNIDADE)
-
-            automacao_sei = AutomacaoPassivo(
-                usuario=USUARIO,
-                senha=SENHA,
-                unidade=UNIDADE
-            )
-
-            if not automacao_sei._inicializar_navegador():
-                mensagens.append("Erro ao iniciar o navegador.")
-                return render(request, "usuarios/extracoes.html", {
-                    "mensagens": mensagens
-                })
-
-            if not automacao_sei._realizar_login():
-                mensagens.append("Erro no login. Verifique as credenciais.")
-                return render(request, "usuarios/extracoes.html", {
-                    "mensagens": mensagens
-                })
-
-            automacao_sei._fechar_tela_aviso()
-            automacao_sei._selecionar_unidade_mgi()
-            mensagens.append("Login e seleção da unidade realizados com sucesso.")
-
-            driver_logado = automacao_sei.driver
+    O POST só enfileira um JobExtracao por automação escolhida e redireciona;
+    o worker (manage.py processar_extracoes) executa os jobs e a página
+    acompanha o status pela API api_job_extracao.
+    """
+    caixa_escolhida = request.GET.get("caixa", "")
+    unidade = os.getenv("UNIDADE")
 
-            if "passivo" in automacoes_selecionadas:
-                mensagens.append("Automação 'passivo' executada com sucesso!")
-
-            if "captura" in automacoes_selecionadas:
-                captura = CapturaProcessos(driver_logado, db)
-                captura.capturar_caixa('técnicos')
-                mensagens.append(
-                    f"Captura de processos da unidade '{UNIDADE}' finalizada."
-                )
+    if request.method == "POST":
+        usuario_id = request.session.get("usuario_id")
+        usuario = Usuario.objects.filter(id=usuario_id).first() if usuario_id else None
+        tipos_validos = dict(JobExtracao.TIPO_CHOICES)
+
+        if not unidade:
+            messages.error(request, "Nenhuma unidade configurada (UNIDADE no .env).")
+            return redirect(f"{request.path}?caixa={caixa_escolhida}")
+
+        for tipo in request.POST.getlist("automacoes"):
+            if tipo not in tipos_validos:
+                continue
+            job, criado = JobExtracao.enfileirar(tipo, unidade, usuario)
+            if criado:
+                messages.success(request, f"{tipos_validos[tipo]} da unidade '{unidade}' enfileirada.")
+            else:
+                messages.info(request, f"{tipos_validos[tipo]} da unidade '{unidade}' já está "
+                                       f"{job.get_status_display().lower()}; o pedido foi juntado a ela.")
 
-        except Exception as e:
-            mensagens.append(f"Erro durante execução: {e}")
+        return redirect(f"{request.path}?caixa={caixa_escolhida}")
 
-        finally:
-            try:
-                if 'db' in locals() and db:
-                    db.fechar()
-                    mensagens.append("Conexão com o banco fechada.")
-            except Exception:
-                pass
+    jobs = JobExtracao.objects.all()[:10]
+    return render(request, "usuarios/extracoes.html", {
+        "caixa_escolhida": caixa_escolhida,
+        "jobs": jobs,
+    })
 
-            try:
-                if 'driver_logado' in locals() and driver_logado:
-                    time.sleep(2)
-                    driver_logado.quit()
-                    mensagens.append("Navegador fechado com sucesso.")
-            except Exception:
-                pass
 
-    return render(request, "usuarios/extracoes.html", {"mensagens": mensagens})
+@require_GET
+def api_job_extracao(request, job_id):
+    """Status de um job de extração, consultado pela página /extracoes/."""
+    job = JobExtracao.objects.filter(id=job_id).first()
+    if job is None:
+        return JsonResponse({"erro": f"Job {job_id} não encontrado."}, status=404)
+    return JsonResponse(job.como_dict())
 
 
 def login_view(request):
@@ -180,24 +154,37 @@ class HomeView(View):
         }
         return render(request, 'usuarios/home.html', context)
 
-def panorama_view(request):
-    """View para exibir panorama geral dos processos, fornecendo dados para Chart.js."""
+def _pode_ver_panorama(request):
+    """Panorama é restrito a administradores, desenvolvedores e gestores."""
     usuario_id = request.session.get("usuario_id")
     usuario = Usuario.objects.get(id=usuario_id) if usuario_id else None
+    return bool(usuario) and usuario.nivel in ["admin", "dev", "gestor"]
 
-    if not usuario or usuario.nivel not in ["admin", "dev", "gestor"]:
+
+def get_dados_panorama():
+    """Métricas agregadas de todas as caixas, recalculadas a cada nova captura."""
+    return em_cache_global(
+        f"panorama:{date.today().isoformat()}",
+        panorama_caixas
+    )
+
+
+def panorama_view(request):
+    """View para exibir panorama geral dos processos, fornecendo dados para Chart.js."""
+    if not _pode_ver_panorama(request):
         return HttpResponseForbidden(
             "Você não tem permissão para acessar o Panorama."
         )
     
-    caixa_escolhida = request.GET.get("caixa", "DEMO")
-    caixas = ["CGPAG-ANIST", "CGPAG-REPER", "CGPAG-CIVRES", "CGPAG-GERAL"]
-    tecnicos = ["Ana", "Carlos", "Fernanda", "João", "Marcos"]
-
-    passivos = 30
-    concluidos = 50
-    concluidos_por_caixa = {c: random.randint(5, 20) for c in caixas}
-    concluidos_por_tecnico = {t: random.randint(3, 15) for t in tecnicos}
+    caixa_escolhida = request.GET.get("caixa", "")
+    panorama = get_dados_panorama()
+
+    concluidos_por_caixa = panorama["concluidos_ontem_por_caixa"]
+    concluidos_por_tecnico = dict(sorted(
+        panorama["concluidos_mes_por_tecnico"].items(),
+        key=lambda item: item[1],
+        reverse=True
+    ))
 
     # 1. Gráfico de Barras (Caixas)
     dados_barra = {
@@ -210,13 +197,13 @@ def panorama_view(request):
     dados_linha = {
         'labels': list(concluidos_por_tecnico.keys()),
         'data': list(concluidos_por_tecnico.values()),
-        'titulo': 'Desempenho por Técnico (Processos Concluídos)'
+        'titulo': 'Desempenho por Técnico (Processos Concluídos no Mês)'
     }
 
     # 3. Gráfico de Pizza
     dados_pizza = {
         'labels': ["Passivos", "Concluídos"],
-        'data': [passivos, concluidos],
+        'data': [panorama["abertos"], panorama["concluidos"]],
         'titulo': 'Distribuição Geral de Processos'
     }
 
@@ -226,7 +213,7 @@ def panorama_view(request):
     dados_pizza_json = json.dumps(dados_pizza)
     
     return render(request, "usuarios/panorama.html", {
-        "caixas": caixas,
+        "caixas": RESPONSAVEIS_POR_CAIXA.keys(),
         "caixa_escolhida": caixa_escolhida,
         "dados_barra_json": dados_barra_json,
         "dados_linha_json": dados_linha_json,
@@ -234,49 +221,59 @@ def panorama_view(request):
     })
 
 
+OPCOES_DIAS_TELEMETRIA = [1, 7, 30, 90]
+
+
+def telemetria_view(request):
+    """Relatório de p50/p95 por etapa e por unidade das capturas (Automacoes.telemetria)."""
+    if not _pode_ver_panorama(request):
+        return HttpResponseForbidden(
+            "Você não tem permissão para acessar a Telemetria."
+        )
+
+    caixa_escolhida = request.GET.get("caixa", "")
+    try:
+        dias = int(request.GET.get("dias", 7))
+    except ValueError:
+        dias = 7
+    if dias not in OPCOES_DIAS_TELEMETRIA:
+        dias = 7
+
+    return render(request, "usuarios/telemetria.html", {
+        "caixas": RESPONSAVEIS_POR_CAIXA.keys(),
+        "caixa_escolhida": caixa_escolhida,
+        "dias": dias,
+        "opcoes_dias": OPCOES_DIAS_TELEMETRIA,
+        "etapas": resumo_etapas(dias, caixa_escolhida or None),
+        "execucoes": resumo_execucoes(dias, caixa_escolhida or None),
+    })
+
+
 def get_dados_caixa(caixa_escolhida, tecnico_escolhido="Geral"):
     """Função auxiliar para obter dados de uma caixa específica."""
     if not caixa_escolhida:
         return None
 
-    db_path = BASE_PATH / f"{caixa_escolhida}_tecnicos.db"
+    return em_cache(
+        caixa_escolhida,
+        f"dados:{tecnico_escolhido}:{date.today().isoformat()}",
+        lambda: _calcular_dados_caixa(caixa_escolhida, tecnico_escolhido)
+    )
 
-    if not db_path.exists():
-        return None
 
-    try:
-        conn = sqlite3.connect(db_path)
-        df = pd.read_sql_query("SELECT * FROM processos", conn)
-        conn.close()
-    except Exception:
+def _calcular_dados_caixa(caixa_escolhida, tecnico_escolhido):
+    """Calcula as métricas e metas de uma caixa; usado por get_dados_caixa."""
+    contagem = contar_concluidos(caixa_escolhida, tecnico_escolhido)
+    if contagem is None:
         return None
 
-    df['data'] = pd.to_datetime(df['data']).dt.date
-
-    # Filtragem por técnico
     responsaveis = RESPONSAVEIS_POR_CAIXA.get(caixa_escolhida, [])
-    if tecnico_escolhido == "Geral":
-        df_para_analise = df[df['email'].isin(responsaveis)]
-    else:
-        df_para_analise = df[df['tecnico'] == tecnico_escolhido]
-
-    # Cálculo de métricas
-    concluidos = df_para_analise[df_para_analise["concluido"] == 1]
-    processos_concluidos = len(concluidos)
+    processos_concluidos = contagem["concluidos"]
+    processos_hoje = contagem["hoje"]
     hoje = date.today()
-    processos_hoje = len(df_para_analise[
-        (df_para_analise["data"] == hoje) & 
-        (df_para_analise["concluido"] == 1)
-    ])
 
     # Cálculo de dias úteis e metas
-    cal = Brazil()
-    cal.subdiv = "DF"
-    inicio_mes = hoje.replace(day=1)
-    fim_mes = (inicio_mes.replace(
-        month=inicio_mes.month % 12 + 1, day=1
-    ) - timedelta(days=1))
-    dias_uteis = cal.get_working_days_delta(inicio_mes, fim_mes)
+    dias_uteis = dias_uteis_mes(hoje.year, hoje.month)
 
     if tecnico_escolhido == "Geral":
         meta_diaria = METAS_POR_CAIXA.get(caixa_escolhida, 4) * len(responsaveis)
@@ -309,7 +306,22 @@ def get_dados_caixa(caixa_escolhida, tecnico_escolhido="Geral"):
         'percentual_mes': percentual_mes,
         'angulo_mes': angulo_mes,
         'responsaveis': responsaveis,
-        'df_para_analise': df_para_analise
+    }
+
+
+def _dados_gauge(id_gauge, titulo, valor, meta, folga, cor):
+    """Números de um gauge do dashboard: faixas vermelha, laranja e verde em relação à meta."""
+    return {
+        'id': id_gauge,
+        'titulo': titulo,
+        'valor': valor,
+        'maximo': meta + folga,
+        'cor': cor,
+        'faixas': [
+            [0, meta * 0.5, 'red'],
+            [meta * 0.5, meta, 'orange'],
+            [meta, meta + folga, 'green'],
+        ],
     }
 
 
@@ -330,46 +342,19 @@ def dashboard_view(request):
             "erro": f"Arquivo do banco para '{caixa_escolhida}' não encontrado!"
         })
 
-    # Gráfico de processos do dia
-    fig_dia = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=dados['processos_hoje'],
-        title={'text': f"Processos do Dia (Meta: {dados['meta_diaria']})"},
-        gauge={
-            'axis': {'range': [0, dados['meta_diaria'] + 2]},
-            'bar': {'color': 'blue'},
-            'steps': [
-                {'range': [0, dados['meta_diaria']*0.5], 'color': 'red'},
-                {'range': [dados['meta_diaria']*0.5, dados['meta_diaria']], 'color': 'orange'},
-                {'range': [dados['meta_diaria'], dados['meta_diaria']+2], 'color': 'green'}
-            ]
-        }
-    ))
-    fig_dia.update_layout(width=400, height=300)
-
-    # Gráfico de processos do mês
-    fig_mes = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=dados['processos_concluidos'],
-        title={'text': f"Concluídos no Mês (Meta: {dados['meta_mensal']})"},
-        gauge={
-            'axis': {'range': [0, dados['meta_mensal'] + 20]},
-            'bar': {'color': 'black'},
-            'steps': [
-                {'range': [0, dados['meta_mensal']*0.5], 'color': 'red'},
-                {'range': [dados['meta_mensal']*0.5, dados['meta_mensal']], 'color': 'orange'},
-                {'range': [dados['meta_mensal'], dados['meta_mensal']+20], 'color': 'green'}
-            ]
-        }
-    ))
-    fig_mes.update_layout(width=400, height=300)
+    # Os gauges são desenhados no navegador (velocimetro.js); a view só envia os números
+    gauges = [
+        _dados_gauge("gauge-dia", f"Processos do Dia (Meta: {dados['meta_diaria']})",
+                     dados['processos_hoje'], dados['meta_diaria'], 2, 'blue'),
+        _dados_gauge("gauge-mes", f"Concluídos no Mês (Meta: {dados['meta_mensal']})",
+                     dados['processos_concluidos'], dados['meta_mensal'], 20, 'black'),
+    ]
 
     context = {
         "caixas": RESPONSAVEIS_POR_CAIXA.keys(),
         "caixa_escolhida": caixa_escolhida,
         "tecnico_escolhido": tecnico_escolhido,
-        "grafico_dia": fig_dia.to_html(full_html=False),
-        "grafico_mes": fig_mes.to_html(full_html=False),
+        "gauges": gauges,
         "processos_concluidos": dados['processos_concluidos'],
         "dias_uteis": dados['dias_uteis'],
         "meta_mensal": dados['meta_mensal'],
@@ -413,4 +398,80 @@ def desempenho_view(request):
         "meta_mensal": dados['meta_mensal'],
     }
 
-    return render(request, "usuarios/desempenho.html", context)
\ No newline at end of file
+    return render(request, "usuarios/desempenho.html", context)
+
+def _ultima_modificacao_metricas(request, caixa):
+    """
+    Last-Modified da API: a versão das métricas em cache da caixa (trocada ao
+    fim de cada captura completa), ou a meia-noite de hoje se for mais recente
+    (a contagem do dia muda na virada sem nova captura).
+    """
+    versao = versao_metricas(caixa)
+    if versao is None:
+        return None
+    meia_noite = datetime.combine(date.today(), datetime.min.time()).astimezone(timezone.utc)
+    return max(versao, meia_noite)
+
+
+def _etag_metricas(request, caixa):
+    versao = versao_metricas(caixa)
+    if versao is None:
+        return None
+    tecnico = request.GET.get("tecnico", "Geral")
+    chave = f"{caixa}:{tecnico}:{date.today().isoformat()}:{versao.timestamp()}"
+    return hashlib.sha1(chave.encode()).hexdigest()
+
+
+@require_GET
+@condition(etag_func=_etag_metricas, last_modified_func=_ultima_modificacao_metricas)
+def api_metricas(request, caixa):
+    """
+    API somente leitura com as métricas de uma caixa (as mesmas do dashboard
+    e do desempenho). Responde 304 enquanto não houver nova captura
+    completa; páginas gravadas por uma captura em andamento não contam.
+    """
+    tecnico_escolhido = request.GET.get("tecnico", "Geral")
+
+    if caixa not in RESPONSAVEIS_POR_CAIXA:
+        return JsonResponse({"erro": f"Caixa '{caixa}' desconhecida."}, status=404)
+
+    dados = get_dados_caixa(caixa, tecnico_escolhido)
+    if not dados:
+        return JsonResponse({"erro": f"Arquivo do banco para '{caixa}' não encontrado!"}, status=404)
+
+    versao = versao_metricas(caixa)
+    return JsonResponse({
+        "caixa": caixa,
+        "tecnico": tecnico_escolhido,
+        "atualizado_em": versao.isoformat() if versao else None,
+        **dados,
+    })
+
+
+def _ultima_captura_geral(request):
+    versoes = [versao for versao in map(versao_metricas, RESPONSAVEIS_POR_CAIXA) if versao]
+    if not versoes:
+        return None
+    meia_noite = datetime.combine(date.today(), datetime.min.time()).astimezone(timezone.utc)
+    return max(max(versoes), meia_noite)
+
+
+def _restrito_ao_panorama(view):
+    """
+    Nega o acesso antes da validação condicional: sem permissão a resposta é
+    sempre 403, nunca um 304 que revelaria a data da última captura.
+    """
+    @wraps(view)
+    def _view(request, *args, **kwargs):
+        if not _pode_ver_panorama(request):
+            return JsonResponse({"erro": "Você não tem permissão para acessar o Panorama."}, status=403)
+        return view(request, *args, **kwargs)
+    return _view
+
+
+@require_GET
+@_restrito_ao_panorama
+@condition(last_modified_func=_ultima_captura_geral)
+def api_panorama(request):
+    """API somente leitura com as métricas agregadas do Panorama."""
+    return JsonResponse(get_dados_panorama())